@@ -0,0 +1,552 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, TextIO
+
+from app.data.db import Database
+from app.data.entry_repo import EntryRepo
+from app.data.metrics_repo import MetricsRepo
+from app.utils.tracing import Tracer
+
+_EXPORT_FIELDS = [
+    "id", "entry_type", "text", "language", "translation", "phonetic_us", "phonetic_uk",
+    "definition", "part_of_speech", "ipa", "word_roots", "tense_form", "common_meanings",
+    "tags", "related_entry_ids", "grammar_notes", "structure_breakdown", "key_terms",
+    "created_at", "updated_at",
+]
+
+
+def _open_db(path: str) -> Database:
+    db = Database(path)
+    db.initialize()
+    return db
+
+
+def _open_libraries(path: str, attach: list[str]) -> Database:
+    from app.data.db import libraries_from_env, parse_libraries
+
+    db = _open_db(path)
+    for alias, library_path in {**libraries_from_env(), **parse_libraries(",".join(attach))}.items():
+        db.attach(library_path, alias)
+    return db
+
+
+def _pipeline(items: Iterable[Any], work: Callable[[Any], Any], concurrency: int) -> Iterator[Any]:
+    # Results come back in input order; at most 2x concurrency items are in flight.
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        pending: deque = deque()
+        for item in items:
+            pending.append(pool.submit(work, item))
+            if len(pending) >= concurrency * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _read_inputs(paths: list[str], whole_file: bool) -> Iterator[str]:
+    sources = paths or ["-"]
+    for path in sources:
+        handle = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        try:
+            if whole_file:
+                text = handle.read().strip()
+                if text:
+                    yield text
+                continue
+            for line in handle:
+                text = line.strip()
+                if text:
+                    yield text
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+
+
+def _emit(record: dict) -> None:
+    sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+
+def _llm_service():
+    from app.services.llm_service import LlmService
+
+    llm_service = LlmService()
+    if not llm_service.configured:
+        print("LLM is not configured: set ARK_API_KEY or LLM_API_KEY (or LLM_FIXTURE_MODE=replay).", file=sys.stderr)
+        return None
+    return llm_service
+
+
+def cmd_capture(args: argparse.Namespace) -> int:
+    from app.services.capture_service import CaptureService
+
+    llm_service = _llm_service()
+    if llm_service is None and not args.allow_empty:
+        return 2
+    db = _open_libraries(args.db, args.attach)
+    tracer = Tracer(enabled=not args.no_trace)
+    capture_service = CaptureService(EntryRepo(db), llm_service or _NullLlm(), tracer)
+
+    def _work(item: tuple) -> tuple:
+        text, elsewhere = item
+        trace_id = tracer.new_trace()
+        if elsewhere:
+            return text, "", elsewhere, trace_id
+        entry_type = capture_service.classify(text, trace_id)
+        if not entry_type:
+            return text, "", {}, trace_id
+        return text, entry_type, capture_service.enrich(text, entry_type, trace_id), trace_id
+
+    # The lookup runs here on the main thread (the connection is not shared with the
+    # pool), so texts already in the primary file or an attached library never reach the LLM.
+    inputs = ((text, capture_service.find_existing(text)) for text in _read_inputs(args.files, args.whole_file))
+    counts = {"created": 0, "duplicate": 0, "skipped": 0, "failed": 0}
+    started = time.perf_counter()
+    for text, entry_type, enrich, trace_id in _pipeline(inputs, _work, args.concurrency):
+        if not entry_type and enrich:
+            counts["duplicate"] += 1
+            _emit({"status": "duplicate", "id": enrich["id"], "library": enrich["library"], "text": text[:80]})
+            continue
+        if not entry_type:
+            counts["skipped"] += 1
+            _emit({"status": "skipped", "text": text[:80]})
+            continue
+        entry_id, created = capture_service.store(text, entry_type, enrich, trace_id)
+        status = "created" if created else "duplicate"
+        if str(enrich.get("raw_llm", "")).startswith("error:"):
+            counts["failed"] += 1
+        counts[status] += 1
+        _emit({"status": status, "id": entry_id, "entry_type": entry_type, "text": text[:80]})
+    MetricsRepo(db).add_spans(tracer.drain())
+    _summary(counts, started)
+    return 0
+
+
+def cmd_enrich(args: argparse.Namespace) -> int:
+    from app.services.capture_service import CaptureService
+
+    llm_service = _llm_service()
+    if llm_service is None:
+        return 2
+    db = _open_db(args.db)
+    entry_repo = EntryRepo(db)
+    tracer = Tracer(enabled=not args.no_trace)
+    capture_service = CaptureService(entry_repo, llm_service, tracer)
+
+    def _work(row: dict) -> tuple:
+        trace_id = tracer.new_trace()
+        return row, capture_service.enrich(row["text"], row["entry_type"], trace_id), trace_id
+
+    counts = {"enriched": 0, "failed": 0}
+    started = time.perf_counter()
+    rows = entry_repo.list_pending_enrichment(args.limit)
+    for row, enrich, trace_id in _pipeline(rows, _work, args.concurrency):
+        capture_service.refresh(row["id"], row["text"], row["entry_type"], enrich, trace_id)
+        failed = str(enrich.get("raw_llm", "")).startswith("error:")
+        counts["failed" if failed else "enriched"] += 1
+        _emit({"status": "failed" if failed else "enriched", "id": row["id"], "text": row["text"][:80]})
+    MetricsRepo(db).add_spans(tracer.drain())
+    _summary(counts, started)
+    return 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    db = _open_db(args.db)
+    rows = EntryRepo(db).iter_entries(args.type)
+    handle: TextIO = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    count = 0
+    try:
+        if args.format == "csv":
+            writer = csv.DictWriter(handle, fieldnames=_EXPORT_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in rows:
+                handle.write(json.dumps({k: row.get(k) for k in _EXPORT_FIELDS}, ensure_ascii=False) + "\n")
+                count += 1
+    finally:
+        if handle is not sys.stdout:
+            handle.close()
+    print(f"Exported {count} entries.", file=sys.stderr)
+    return 0
+
+
+def cmd_stats(args: argparse.Namespace) -> int:
+    from app.data.stats_repo import StatsRepo
+
+    db = _open_db(args.db)
+    entry_repo = EntryRepo(db)
+    metrics_repo = MetricsRepo(db)
+    stats_repo = StatsRepo(db)
+    if args.rebuild:
+        stats_repo.rebuild()
+    dashboard = stats_repo.dashboard(days=args.days)
+    stats = {
+        "entries": dashboard["by_type"],
+        "library": dashboard,
+        "pending_enrichment": entry_repo.count_pending_enrichment(),
+        "pending_grammar": entry_repo.count_grammar_pending(),
+        "capture_stages": metrics_repo.stage_report(),
+        "prompt_templates": metrics_repo.template_report(),
+    }
+    if args.json:
+        print(json.dumps(stats, ensure_ascii=False, indent=2))
+        return 0
+    from app.metrics_report import print_report, print_template_report
+
+    for entry_type, total in sorted(stats["entries"].items()):
+        print(f"{entry_type:<10}{total:>8}")
+    print(f"pending enrichment: {stats['pending_enrichment']}")
+    print(f"pending grammar:    {stats['pending_grammar']}")
+    for status, total in sorted(dashboard["review_status"].items()):
+        print(f"reviews {status:<11}{total:>8}")
+    streaks = dashboard["streaks"]
+    print(f"review streak:      {streaks['current']} days (longest {streaks['longest']})")
+    captured = sum(item["total"] for item in dashboard["captures_by_day"])
+    print(f"captured in {args.days} days: {captured}")
+    if dashboard["top_tags"]:
+        print("top tags:           " + ", ".join(f"{item['tag']} ({item['count']})" for item in dashboard["top_tags"]))
+    if stats["capture_stages"]:
+        print()
+        print_report(stats["capture_stages"])
+    print_template_report(stats["prompt_templates"])
+    return 0
+
+
+def cmd_backfill(args: argparse.Namespace) -> int:
+    from app.grammar_backfill import run_backfill
+
+    stats = run_backfill(
+        args.db,
+        batch_size=args.batch_size,
+        n_process=args.n_process,
+        chunk_size=args.chunk_size,
+        limit=args.limit,
+    )
+    print(f"Backfilled {stats['done']} entries ({stats['docs_per_sec']:.1f} docs/sec).", file=sys.stderr)
+    return 0 if stats["available"] else 1
+
+
+def cmd_backup(args: argparse.Namespace) -> int:
+    from app.services.backup_service import BackupService
+
+    backup_service = BackupService(args.db, backup_dir=args.dir or None, keep=args.keep)
+    if args.list:
+        for path in backup_service.list_snapshots():
+            print(f"{path}  {os.path.getsize(path):>12}")
+        return 0
+    result = backup_service.backup()
+    print(f"Wrote {result['path']} ({result['bytes']} bytes, {result['steps']} steps, {result['elapsed']:.2f}s).")
+    for path in result["removed"]:
+        print(f"Removed {path}")
+    return 0
+
+
+def cmd_verify(args: argparse.Namespace) -> int:
+    from app.services.backup_service import BackupService
+
+    problems = BackupService(args.db).verify(args.path or None)
+    for problem in problems:
+        print(problem)
+    print("ok" if not problems else f"{len(problems)} problems found.", file=sys.stderr)
+    return 1 if problems else 0
+
+
+def cmd_restore(args: argparse.Namespace) -> int:
+    import sqlite3
+
+    from app.services.backup_service import BackupService
+
+    try:
+        result = BackupService(args.db, backup_dir=args.dir or None).restore(args.snapshot, keep_current=not args.no_save)
+    except sqlite3.DatabaseError as exc:
+        print(f"Restore refused: {exc}", file=sys.stderr)
+        return 1
+    if result["previous"]:
+        print(f"Previous database saved to {result['previous']}.")
+    print(f"Restored {args.db} from {result['restored']}.")
+    return 0
+
+
+def cmd_changes(args: argparse.Namespace) -> int:
+    from app.data.change_repo import ChangeRepo
+
+    change_repo = ChangeRepo(_open_db(args.db))
+    cursor = args.since
+    count = 0
+    while True:
+        batch = change_repo.changes_since(cursor, args.batch_size, snapshot=args.since == 0)
+        if batch["reset"]:
+            print(f"Cursor {cursor} is older than the compacted log (floor {change_repo.floor()}); export from 0.", file=sys.stderr)
+            return 3
+        for change in batch["changes"]:
+            _emit(change)
+            count += 1
+        cursor = batch["cursor"]
+        if not batch["more"]:
+            break
+    print(f"{count} changes; next cursor {cursor}", file=sys.stderr)
+    return 0
+
+
+def cmd_sync(args: argparse.Namespace) -> int:
+    from app.data.change_repo import ChangeRepo
+    from app.services.sync_service import SyncError, SyncService
+
+    sync_service = SyncService(ChangeRepo(_open_db(args.db)), args.url, device=args.device)
+    try:
+        stats = sync_service.push(batch_size=args.batch_size)
+    except SyncError as exc:
+        print(f"Sync failed: {exc}", file=sys.stderr)
+        return 1
+    reset = " after a full reset" if stats["reset"] else ""
+    print(f"Pushed {stats['changes']} changes in {stats['batches']} batches ({stats['elapsed']:.2f}s){reset}; cursor {stats['cursor']}.")
+    return 0
+
+
+def cmd_compact(args: argparse.Namespace) -> int:
+    from app.data.change_repo import ChangeRepo
+
+    stats = ChangeRepo(_open_db(args.db)).compact(tombstone_days=args.tombstone_days)
+    print(f"Folded {stats['folded']} superseded changes, dropped {stats['tombstones']} tombstones; floor {stats['floor']}.")
+    return 0
+
+
+def cmd_audio(args: argparse.Namespace) -> int:
+    from concurrent.futures import wait
+
+    from app.services.audio_cache import AudioCache
+
+    db = _open_db(args.db)
+    audio_cache = AudioCache(db.path, cache_dir=args.cache_dir, workers=args.workers)
+    if args.prefetch:
+        started = time.perf_counter()
+        futures = audio_cache.prefetch_due(EntryRepo(db), horizon_hours=args.hours)
+        wait(futures)
+        fetched = sum(1 for future in futures if future.result())
+        print(f"Prefetched {fetched}/{len(futures)} clips in {time.perf_counter() - started:.2f}s.", file=sys.stderr)
+    audio_cache.evict()
+    _emit(audio_cache.stats())
+    audio_cache.shutdown()
+    return 0
+
+
+def cmd_jobs(args: argparse.Namespace) -> int:
+    from app.services.enrichment_queue import EnrichmentQueue
+
+    db = _open_db(args.db)
+    llm_service = _llm_service() if args.drain or args.follow else None
+    if (args.drain or args.follow) and llm_service is None:
+        return 2
+    queue = EnrichmentQueue(db.path, llm_service, Tracer(enabled=not args.no_trace), workers=args.concurrency)
+    if args.retry_failed:
+        from app.data.job_repo import JobRepo
+
+        print(f"Re-queued {JobRepo(db).retry_failed()} failed jobs.", file=sys.stderr)
+    if args.backfill:
+        print(f"Queued {queue.backfill(args.limit)} entries for background enrichment.", file=sys.stderr)
+    if args.drain:
+        statuses: dict = {}
+        queue.add_listener(lambda entry_id, status: statuses.__setitem__(status, statuses.get(status, 0) + 1))
+        started = time.perf_counter()
+        queue.drain()
+        MetricsRepo(db).add_spans(queue.tracer.drain())
+        _summary(statuses, started)
+    if args.follow:
+        # Keeps running and picks up jobs other processes enqueue (polled every few seconds).
+        followed: dict = {}
+
+        def _on_done(entry_id: int, status: str) -> None:
+            followed[status] = followed.get(status, 0) + 1
+            _emit({"status": status, "id": entry_id})
+
+        queue.add_listener(_on_done)
+        started = time.perf_counter()
+        queue.start()
+        try:
+            while True:
+                time.sleep(60)
+                MetricsRepo(db).add_spans(queue.tracer.drain())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            queue.stop()
+            MetricsRepo(db).add_spans(queue.tracer.drain())
+        _summary(followed, started)
+    _emit(queue.counts())
+    return 0
+
+
+def cmd_libraries(args: argparse.Namespace) -> int:
+    db = _open_libraries(args.db, args.attach)
+    entry_repo = EntryRepo(db)
+    counts = entry_repo.count_by_library()
+    for alias, path in db.libraries().items():
+        _emit({"library": alias, "path": path, "entries": counts.get(alias, 0)})
+    if args.search:
+        for row in entry_repo.search_libraries(args.search, entry_type=args.type, limit=args.limit):
+            _emit(row)
+    if args.recent:
+        for row in entry_repo.list_library_entries(limit=args.limit):
+            _emit(row)
+    if args.duplicates:
+        for row in entry_repo.library_duplicates(limit=args.limit):
+            _emit(row)
+    return 0
+
+
+def cmd_mistakes(args: argparse.Namespace) -> int:
+    from app.data.correction_repo import CorrectionRepo
+
+    repo = CorrectionRepo(_open_db(args.db))
+    if args.rebuild:
+        repo.rebuild_rollups()
+    _emit(
+        {
+            "days": args.days,
+            "error_types": repo.common_mistakes(args.days, args.limit),
+            "rules": repo.common_rules(args.days, args.limit),
+            "daily": repo.daily_counts(args.days),
+        }
+    )
+    return 0
+
+
+class _NullLlm:
+    def enrich(self, text: str, entry_type: str) -> dict:
+        return {"raw_llm": ""}
+
+
+def _summary(counts: dict, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    parts = ", ".join(f"{key}={value}" for key, value in counts.items())
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(f"{total} items in {elapsed:.2f}s ({rate:.1f}/s): {parts}", file=sys.stderr)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Headless capture and library tools.")
+    parser.add_argument("--db", default="data.sqlite")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    capture = sub.add_parser("capture", help="Capture line-delimited text from stdin or files.")
+    capture.add_argument("files", nargs="*", help="Input files ('-' or none for stdin).")
+    capture.add_argument("--whole-file", action="store_true", help="Treat each file as one entry.")
+    capture.add_argument("--concurrency", type=int, default=4)
+    capture.add_argument("--allow-empty", action="store_true", help="Store entries without an LLM.")
+    capture.add_argument("--no-trace", action="store_true")
+    capture.add_argument(
+        "--attach", action="append", default=[], metavar="ALIAS=PATH", help="Skip texts already in this library."
+    )
+    capture.set_defaults(func=cmd_capture)
+
+    enrich = sub.add_parser("enrich", help="Re-run the LLM for entries with empty or failed enrichment.")
+    enrich.add_argument("--limit", type=int, default=0)
+    enrich.add_argument("--concurrency", type=int, default=4)
+    enrich.add_argument("--no-trace", action="store_true")
+    enrich.set_defaults(func=cmd_enrich)
+
+    export = sub.add_parser("export", help="Export entries as JSON lines or CSV.")
+    export.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    export.add_argument("--type", choices=["", "word", "phrase", "article"], default="")
+    export.add_argument("--output", default="")
+    export.set_defaults(func=cmd_export)
+
+    stats = sub.add_parser("stats", help="Library counts and capture latency percentiles.")
+    stats.add_argument("--json", action="store_true")
+    stats.add_argument("--days", type=int, default=30)
+    stats.add_argument("--rebuild", action="store_true", help="Recompute the library counters from the tables.")
+    stats.set_defaults(func=cmd_stats)
+
+    backfill = sub.add_parser("backfill", help="Precompute grammar highlights.")
+    backfill.add_argument("--batch-size", type=int, default=64)
+    backfill.add_argument("--n-process", type=int, default=1)
+    backfill.add_argument("--chunk-size", type=int, default=200)
+    backfill.add_argument("--limit", type=int, default=0)
+    backfill.set_defaults(func=cmd_backfill)
+
+    backup = sub.add_parser("backup", help="Write a snapshot with the SQLite online backup API.")
+    backup.add_argument("--dir", default="", help="Snapshot directory (default: backups/ next to the database).")
+    backup.add_argument("--keep", type=int, default=10, help="Snapshots to retain (0 = keep all).")
+    backup.add_argument("--list", action="store_true", help="List snapshots instead of writing one.")
+    backup.set_defaults(func=cmd_backup)
+
+    verify = sub.add_parser("verify", help="Run PRAGMA integrity_check on the database or a snapshot.")
+    verify.add_argument("path", nargs="?", default="")
+    verify.set_defaults(func=cmd_verify)
+
+    restore = sub.add_parser("restore", help="Replace the database contents with a verified snapshot.")
+    restore.add_argument("snapshot")
+    restore.add_argument("--dir", default="")
+    restore.add_argument("--no-save", action="store_true", help="Do not snapshot the current database first.")
+    restore.set_defaults(func=cmd_restore)
+
+    changes = sub.add_parser("changes", help="Export the change log after a cursor as JSON lines.")
+    changes.add_argument("--since", type=int, default=0)
+    changes.add_argument("--batch-size", type=int, default=500)
+    changes.set_defaults(func=cmd_changes)
+
+    sync = sub.add_parser("sync", help="Push changes since the last acknowledged cursor to a sync endpoint.")
+    sync.add_argument("--url", required=True)
+    sync.add_argument("--device", default="desktop")
+    sync.add_argument("--batch-size", type=int, default=500)
+    sync.set_defaults(func=cmd_sync)
+
+    compact = sub.add_parser("compact", help="Fold superseded change-log rows and expire old tombstones.")
+    compact.add_argument("--tombstone-days", type=int, default=30)
+    compact.set_defaults(func=cmd_compact)
+
+    jobs = sub.add_parser("jobs", help="Inspect and drain the persistent enrichment queue.")
+    jobs.add_argument("--backfill", action="store_true", help="Queue entries with empty or failed enrichment.")
+    jobs.add_argument("--limit", type=int, default=0)
+    jobs.add_argument("--retry-failed", action="store_true")
+    jobs.add_argument("--drain", action="store_true", help="Run queued jobs until none are ready.")
+    jobs.add_argument("--follow", action="store_true", help="Keep working the queue until interrupted (Ctrl+C).")
+    jobs.add_argument("--concurrency", type=int, default=4)
+    jobs.add_argument("--no-trace", action="store_true")
+    jobs.set_defaults(func=cmd_jobs)
+
+    libraries = sub.add_parser("libraries", help="Attach other library files and search or dedupe across them.")
+    libraries.add_argument("--attach", action="append", default=[], metavar="ALIAS=PATH")
+    libraries.add_argument("--search", default="")
+    libraries.add_argument("--type", default="word")
+    libraries.add_argument("--recent", action="store_true")
+    libraries.add_argument("--duplicates", action="store_true", help="Texts stored in more than one library.")
+    libraries.add_argument("--limit", type=int, default=20)
+    libraries.set_defaults(func=cmd_libraries)
+
+    mistakes = sub.add_parser("mistakes", help="Show the most common correction error types and rules.")
+    mistakes.add_argument("--days", type=int, default=30)
+    mistakes.add_argument("--limit", type=int, default=10)
+    mistakes.add_argument("--rebuild", action="store_true", help="Recompute the daily rollups from the cards.")
+    mistakes.set_defaults(func=cmd_mistakes)
+
+    audio = sub.add_parser("audio", help="Show the pronunciation cache and prefetch clips for due reviews.")
+    audio.add_argument("--prefetch", action="store_true")
+    audio.add_argument("--hours", type=float, default=24.0)
+    audio.add_argument("--cache-dir", default=None)
+    audio.add_argument("--workers", type=int, default=4)
+    audio.set_defaults(func=cmd_audio)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    from app.utils.query_profiler import default_profiler
+
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    finally:
+        default_profiler().dump()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
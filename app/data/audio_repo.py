@@ -0,0 +1,71 @@
+import time
+from typing import Any, Dict, List, Optional
+
+from app.data.db import Database
+
+
+class AudioRepo:
+    def __init__(self, db: Database) -> None:
+        self._db = db
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        cursor = self._db.connection.cursor()
+        cursor.execute(
+            """
+            SELECT b.digest, b.ext, b.size
+            FROM audio_urls u
+            JOIN audio_blobs b ON b.digest = u.digest
+            WHERE u.url = ?
+            """,
+            (url,),
+        )
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def touch(self, digest: str) -> None:
+        conn = self._db.connection
+        with conn:
+            conn.execute("UPDATE audio_blobs SET last_access = ? WHERE digest = ?", (time.time(), digest))
+
+    def record(self, url: str, digest: str, ext: str, size: int) -> None:
+        conn = self._db.connection
+        with conn:
+            conn.execute(
+                """
+                INSERT INTO audio_blobs (digest, ext, size, last_access) VALUES (?, ?, ?, ?)
+                ON CONFLICT(digest) DO UPDATE SET last_access = excluded.last_access
+                """,
+                (digest, ext, size, time.time()),
+            )
+            conn.execute(
+                """
+                INSERT INTO audio_urls (url, digest, fetched_at) VALUES (?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET digest = excluded.digest, fetched_at = excluded.fetched_at
+                """,
+                (url, digest, int(time.time())),
+            )
+
+    def total_size(self) -> int:
+        row = self._db.connection.execute("SELECT COALESCE(SUM(size), 0) FROM audio_blobs").fetchone()
+        return int(row[0])
+
+    def count(self) -> int:
+        row = self._db.connection.execute("SELECT COUNT(*) FROM audio_blobs").fetchone()
+        return int(row[0])
+
+    def least_recent(self, limit: int) -> List[Dict[str, Any]]:
+        cursor = self._db.connection.cursor()
+        cursor.execute(
+            "SELECT digest, ext, size FROM audio_blobs ORDER BY last_access LIMIT ?",
+            (limit,),
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def remove(self, digests: List[str]) -> None:
+        if not digests:
+            return
+        placeholders = ",".join("?" for _ in digests)
+        conn = self._db.connection
+        with conn:
+            conn.execute(f"DELETE FROM audio_urls WHERE digest IN ({placeholders})", digests)
+            conn.execute(f"DELETE FROM audio_blobs WHERE digest IN ({placeholders})", digests)
@@ -0,0 +1,135 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from app.data.db import Database
+
+_FLOOR_KEY = "change_log_floor"
+
+
+class ChangeRepo:
+    def __init__(self, db: Database) -> None:
+        self._db = db
+
+    def latest_seq(self) -> int:
+        row = self._db.connection.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()
+        return int(row[0])
+
+    def floor(self) -> int:
+        return int(self._get_setting(_FLOOR_KEY) or 0)
+
+    def changes_since(self, cursor: int, limit: int = 500, snapshot: bool = False) -> Dict[str, Any]:
+        # Compaction keeps the latest change of every live row and only drops tombstones,
+        # so a read that started at 0 is a full snapshot and may continue below the floor
+        # (pass snapshot=True for its later batches); an incremental reader there would
+        # miss deletes and has to start over.
+        if cursor and not snapshot and cursor < self.floor():
+            return {"changes": [], "cursor": cursor, "more": False, "reset": True}
+        rows = self._db.connection.execute(
+            """
+            SELECT seq, entity, entity_id, op, row_version, changed_at
+            FROM change_log
+            WHERE seq > ?
+            ORDER BY seq
+            LIMIT ?
+            """,
+            (cursor, limit),
+        ).fetchall()
+        if not rows:
+            return {"changes": [], "cursor": cursor, "more": False, "reset": False}
+
+        # Fold repeated changes to one entity inside the batch into its latest state.
+        folded: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        for row in rows:
+            key = (row["entity"], int(row["entity_id"]))
+            first = folded.pop(key, None)
+            change = {
+                "seq": int(row["seq"]),
+                "entity": row["entity"],
+                "id": int(row["entity_id"]),
+                "op": row["op"],
+                "version": int(row["row_version"]),
+                "changed_at": int(row["changed_at"]),
+            }
+            if first is not None and first["op"] == "insert":
+                if change["op"] == "delete":
+                    continue
+                change["op"] = "insert"
+            folded[key] = change
+
+        changes = list(folded.values())
+        self._attach_rows(changes)
+        return {
+            "changes": changes,
+            "cursor": int(rows[-1]["seq"]),
+            "more": len(rows) == limit,
+            "reset": False,
+        }
+
+    def compact(self, upto_seq: Optional[int] = None, tombstone_days: int = 30) -> Dict[str, int]:
+        horizon = self.latest_seq() if upto_seq is None else upto_seq
+        conn = self._db.connection
+        with conn:
+            folded = conn.execute(
+                """
+                DELETE FROM change_log
+                WHERE seq <= ?
+                  AND EXISTS (
+                    SELECT 1 FROM change_log AS later
+                    WHERE later.entity = change_log.entity
+                      AND later.entity_id = change_log.entity_id
+                      AND later.row_version > change_log.row_version
+                  )
+                """,
+                (horizon,),
+            ).rowcount
+            cutoff = int(time.time()) - tombstone_days * 86400
+            dropped_floor = conn.execute(
+                "SELECT MAX(seq) FROM change_log WHERE op = 'delete' AND seq <= ? AND changed_at < ?",
+                (horizon, cutoff),
+            ).fetchone()[0]
+            tombstones = 0
+            if dropped_floor is not None:
+                tombstones = conn.execute(
+                    "DELETE FROM change_log WHERE op = 'delete' AND seq <= ?",
+                    (dropped_floor,),
+                ).rowcount
+                # Readers behind a dropped tombstone can no longer see that delete and must resync.
+                self._set_setting(_FLOOR_KEY, str(max(self.floor(), int(dropped_floor))))
+        return {"folded": folded, "tombstones": tombstones, "floor": self.floor()}
+
+    def get_cursor(self, name: str) -> int:
+        return int(self._get_setting(f"sync_cursor:{name}") or 0)
+
+    def set_cursor(self, name: str, cursor: int) -> None:
+        with self._db.connection:
+            self._set_setting(f"sync_cursor:{name}", str(cursor))
+
+    def _attach_rows(self, changes: List[Dict[str, Any]]) -> None:
+        wanted: Dict[str, List[int]] = {}
+        for change in changes:
+            if change["op"] != "delete":
+                wanted.setdefault(change["entity"], []).append(change["id"])
+        rows: Dict[tuple, Dict[str, Any]] = {}
+        for entity, ids in wanted.items():
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                placeholders = ",".join("?" for _ in chunk)
+                cursor = self._db.connection.execute(
+                    f"SELECT * FROM {entity} WHERE id IN ({placeholders})",
+                    chunk,
+                )
+                for row in cursor.fetchall():
+                    rows[(entity, int(row["id"]))] = dict(row)
+        for change in changes:
+            change["row"] = rows.get((change["entity"], change["id"])) if change["op"] != "delete" else None
+
+    def _get_setting(self, key: str) -> Optional[str]:
+        row = self._db.connection.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_setting(self, key: str, value: str) -> None:
+        self._db.connection.execute(
+            "INSERT INTO settings (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
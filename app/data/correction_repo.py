@@ -1,34 +1,146 @@
 import json
 import time
-from typing import Dict, Any
+from typing import Any, Dict, Iterable, List
 
 from app.data.db import Database
 
 
+def _row(card: Dict[str, Any], now: int) -> tuple:
+    rule_ids = card.get("rule_ids") or []
+    if isinstance(rule_ids, str):
+        rule_ids = [rule_ids]
+    return (
+        card["sentence_text"],
+        card.get("source_url", ""),
+        json.dumps(card.get("structure_tags", {})),
+        json.dumps(card.get("hints", [])),
+        json.dumps(list(rule_ids)),
+        card.get("user_paraphrase", ""),
+        card.get("error_type", "structure"),
+        int(card.get("created_at") or now),
+    )
+
+
+_INSERT_SQL = """
+    INSERT INTO correction_cards (
+      sentence_text, source_url, structure_tags, hints, rule_ids,
+      user_paraphrase, error_type, created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
 class CorrectionRepo:
     def __init__(self, db: Database) -> None:
         self._db = db
 
     def add_correction(self, card: Dict[str, Any]) -> int:
-        now = int(time.time())
         cursor = self._db.connection.cursor()
-        cursor.execute(
-            """
-            INSERT INTO correction_cards (
-              sentence_text, source_url, structure_tags, hints, rule_ids,
-              user_paraphrase, error_type, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                card["sentence_text"],
-                card.get("source_url", ""),
-                json.dumps(card.get("structure_tags", {})),
-                json.dumps(card.get("hints", [])),
-                json.dumps(card.get("rule_ids", [])),
-                card.get("user_paraphrase", ""),
-                card.get("error_type", "structure"),
-                now,
-            ),
-        )
+        cursor.execute(_INSERT_SQL, _row(card, int(time.time())))
         self._db.connection.commit()
         return int(cursor.lastrowid)
+
+    def add_corrections(self, cards: Iterable[Dict[str, Any]], batch_size: int = 500) -> int:
+        now = int(time.time())
+        conn = self._db.connection
+        total = 0
+        batch: List[tuple] = []
+        for card in cards:
+            batch.append(_row(card, now))
+            if len(batch) >= batch_size:
+                with conn:
+                    conn.executemany(_INSERT_SQL, batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            with conn:
+                conn.executemany(_INSERT_SQL, batch)
+            total += len(batch)
+        return total
+
+    def delete_correction(self, card_id: int) -> None:
+        conn = self._db.connection
+        with conn:
+            conn.execute("DELETE FROM correction_cards WHERE id = ?", (card_id,))
+
+    def list_corrections(
+        self, error_type: str = "", limit: int = 50, before_created_at: int = 0, before_id: int = 0
+    ) -> List[Dict[str, Any]]:
+        sql = """
+            SELECT id, sentence_text, source_url, structure_tags, hints, rule_ids,
+                   user_paraphrase, error_type, created_at
+            FROM correction_cards
+        """
+        # Built per filter so idx_correction_cards_type serves both the filter and the order.
+        # The (created_at, id) cursor keeps later pages as cheap as the first.
+        where: List[str] = []
+        params: list = []
+        if error_type:
+            where.append("error_type = ?")
+            params.append(error_type)
+        if before_created_at:
+            where.append("(created_at, id) < (?, ?)")
+            params.extend([before_created_at, before_id])
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+        rows = self._db.connection.execute(sql, params).fetchall()
+        cards = []
+        for row in rows:
+            card = dict(row)
+            for key, default in (("structure_tags", {}), ("hints", []), ("rule_ids", [])):
+                try:
+                    card[key] = json.loads(card[key]) if card[key] else default
+                except ValueError:
+                    card[key] = default
+            cards.append(card)
+        return cards
+
+    def common_mistakes(self, days: int = 30, limit: int = 10) -> List[Dict[str, Any]]:
+        rows = self._db.connection.execute(
+            """
+            SELECT error_type, SUM(count) AS total
+            FROM correction_daily
+            WHERE day >= date('now', ?)
+            GROUP BY error_type
+            HAVING total > 0
+            ORDER BY total DESC, error_type
+            LIMIT ?
+            """,
+            (f"-{days} days", limit),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def common_rules(self, days: int = 30, limit: int = 10) -> List[Dict[str, Any]]:
+        rows = self._db.connection.execute(
+            """
+            SELECT rule_id, SUM(count) AS total
+            FROM correction_rule_daily
+            WHERE day >= date('now', ?)
+            GROUP BY rule_id
+            HAVING total > 0
+            ORDER BY total DESC, rule_id
+            LIMIT ?
+            """,
+            (f"-{days} days", limit),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def daily_counts(self, days: int = 30) -> List[Dict[str, Any]]:
+        rows = self._db.connection.execute(
+            """
+            SELECT day, SUM(count) AS total
+            FROM correction_daily
+            WHERE day >= date('now', ?)
+            GROUP BY day
+            HAVING total > 0
+            ORDER BY day
+            """,
+            (f"-{days} days",),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def rebuild_rollups(self) -> None:
+        conn = self._db.connection
+        with conn:
+            self._db.rebuild_correction_rollups()
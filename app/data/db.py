@@ -1,17 +1,113 @@
+import os
+import re
 import sqlite3
+import threading
+from typing import Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+from app.utils.query_profiler import QueryProfiler, default_profiler
+
+CHANGE_TRACKED_TABLES = ("entries", "reviews", "review_logs")
+
+LIBRARY_VIEW = "library_entries"
+_LIBRARY_COLUMNS = "id, entry_type, text, language, translation, tags, created_at"
+_ALIAS_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+T = TypeVar("T")
+
+
+def parse_libraries(spec: str) -> Dict[str, str]:
+    # "ref=shared.sqlite,fr=french.sqlite" -> {"ref": "shared.sqlite", "fr": "french.sqlite"}
+    libraries: Dict[str, str] = {}
+    for item in spec.split(","):
+        alias, sep, path = item.strip().partition("=")
+        if not sep:
+            if item.strip():
+                raise ValueError(f"library must be alias=path, got {item.strip()!r}")
+            continue
+        libraries[alias.strip()] = path.strip()
+    return libraries
+
+
+def libraries_from_env() -> Dict[str, str]:
+    return parse_libraries(os.environ.get("LIBRARY_ATTACH", ""))
+
+
+def _json_array(expr: str) -> str:
+    # Nested CASE so json_type is never evaluated on malformed text.
+    return f"CASE WHEN json_valid({expr}) THEN CASE WHEN json_type({expr}) = 'array' THEN {expr} ELSE '[]' END ELSE '[]' END"
 
 
 class Database:
-    def __init__(self, path: str) -> None:
+    def __init__(self, path: str, profiler: Optional[QueryProfiler] = None) -> None:
         self._path = path
-        self._conn = sqlite3.connect(self._path)
+        # Statement timing is opt-in (SQL_SLOW_MS); without it this is a plain connection.
+        self._conn, self._profile = (profiler or default_profiler()).connect(self._path)
         self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._library_view_ready = False
 
     @property
     def connection(self) -> sqlite3.Connection:
         return self._conn
 
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def data_version(self) -> int:
+        return int(self._conn.execute("PRAGMA data_version").fetchone()[0])
+
+    def attach(self, path: str, alias: str) -> None:
+        if not _ALIAS_RE.match(alias) or alias.lower() in {"main", "temp"}:
+            raise ValueError(f"invalid library alias {alias!r}")
+        if alias in self.libraries():
+            raise ValueError(f"library {alias!r} is already attached")
+        # Each library is a complete database with its own indexes, triggers and counters.
+        library = Database(path)
+        library.initialize()
+        library.connection.close()
+        self._conn.execute("ATTACH DATABASE ? AS " + alias, (path,))
+        self._refresh_library_view()
+
+    def detach(self, alias: str) -> None:
+        if alias not in self.libraries() or alias == "main":
+            raise ValueError(f"library {alias!r} is not attached")
+        self._conn.execute(f"DROP VIEW IF EXISTS temp.{LIBRARY_VIEW}")
+        self._conn.execute("DETACH DATABASE " + alias)
+        self._refresh_library_view()
+
+    def libraries(self) -> Dict[str, str]:
+        rows = self._conn.execute("PRAGMA database_list").fetchall()
+        return {row["name"]: row["file"] for row in rows if row["name"] != "temp"}
+
+    def library_view(self) -> str:
+        if not self._library_view_ready:
+            self._refresh_library_view()
+        return LIBRARY_VIEW
+
+    def _refresh_library_view(self) -> None:
+        # A UNION ALL view lets one statement span every library; SQLite pushes the
+        # WHERE into each branch so lookups still use each file's own indexes.
+        branches = " UNION ALL ".join(
+            f"SELECT '{alias}' AS library, {_LIBRARY_COLUMNS} FROM {alias}.entries" for alias in self.libraries()
+        )
+        self._conn.execute(f"DROP VIEW IF EXISTS temp.{LIBRARY_VIEW}")
+        self._conn.execute(f"CREATE TEMP VIEW {LIBRARY_VIEW} AS {branches}")
+        self._library_view_ready = True
+
+    def explain(self, sql: str, params: tuple = ()) -> List[str]:
+        if self._profile is not None:
+            return self._profile.explain(sql, params)
+        rows = self._conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        return [str(row[3]) for row in rows]
+
+    def flush_profile(self) -> None:
+        if self._profile is not None:
+            self._profile.finish()
+
     def initialize(self) -> None:
+        # WAL lets background readers (search, backups) run without blocking captures.
+        self._conn.execute("PRAGMA journal_mode=WAL")
         cursor = self._conn.cursor()
         cursor.executescript(
             """
@@ -78,6 +174,128 @@ class Database:
               value TEXT NOT NULL
             );
 
+            CREATE TABLE IF NOT EXISTS grammar_analyses (
+              entry_id INTEGER PRIMARY KEY,
+              text_hash TEXT NOT NULL,
+              analysis TEXT NOT NULL,
+              created_at INTEGER NOT NULL,
+              FOREIGN KEY(entry_id) REFERENCES entries(id) ON DELETE CASCADE
+            );
+
+            CREATE TABLE IF NOT EXISTS capture_spans (
+              id INTEGER PRIMARY KEY AUTOINCREMENT,
+              trace_id TEXT NOT NULL,
+              stage TEXT NOT NULL,
+              duration_ms REAL NOT NULL,
+              prompt_tokens INTEGER NOT NULL DEFAULT 0,
+              completion_tokens INTEGER NOT NULL DEFAULT 0,
+              created_at INTEGER NOT NULL
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_capture_spans_stage ON capture_spans(stage);
+
+            CREATE TABLE IF NOT EXISTS change_log (
+              seq INTEGER PRIMARY KEY AUTOINCREMENT,
+              entity TEXT NOT NULL,
+              entity_id INTEGER NOT NULL,
+              op TEXT NOT NULL,
+              row_version INTEGER NOT NULL,
+              changed_at INTEGER NOT NULL
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_change_log_entity ON change_log(entity, entity_id, row_version);
+
+            CREATE TABLE IF NOT EXISTS audio_blobs (
+              digest TEXT PRIMARY KEY,
+              ext TEXT NOT NULL,
+              size INTEGER NOT NULL,
+              last_access REAL NOT NULL
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_audio_blobs_access ON audio_blobs(last_access);
+
+            CREATE TABLE IF NOT EXISTS audio_urls (
+              url TEXT PRIMARY KEY,
+              digest TEXT NOT NULL,
+              fetched_at INTEGER NOT NULL
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_audio_urls_digest ON audio_urls(digest);
+
+            CREATE TABLE IF NOT EXISTS jobs (
+              id INTEGER PRIMARY KEY AUTOINCREMENT,
+              kind TEXT NOT NULL,
+              entry_id INTEGER NOT NULL,
+              priority INTEGER NOT NULL DEFAULT 0,
+              state TEXT NOT NULL DEFAULT 'pending',
+              attempts INTEGER NOT NULL DEFAULT 0,
+              run_after REAL NOT NULL DEFAULT 0,
+              lease_owner TEXT NOT NULL DEFAULT '',
+              lease_until REAL NOT NULL DEFAULT 0,
+              last_error TEXT NOT NULL DEFAULT '',
+              created_at INTEGER NOT NULL,
+              updated_at INTEGER NOT NULL,
+              FOREIGN KEY(entry_id) REFERENCES entries(id) ON DELETE CASCADE
+            );
+
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_entry ON jobs(kind, entry_id);
+            CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs(state, priority DESC, id);
+
+            CREATE TABLE IF NOT EXISTS correction_cards (
+              id INTEGER PRIMARY KEY AUTOINCREMENT,
+              sentence_text TEXT NOT NULL,
+              source_url TEXT DEFAULT '',
+              structure_tags TEXT DEFAULT '{}',
+              hints TEXT DEFAULT '[]',
+              rule_ids TEXT DEFAULT '[]',
+              user_paraphrase TEXT DEFAULT '',
+              error_type TEXT NOT NULL DEFAULT 'structure',
+              created_at INTEGER NOT NULL
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_correction_cards_type ON correction_cards(error_type, created_at);
+            CREATE INDEX IF NOT EXISTS idx_correction_cards_created ON correction_cards(created_at);
+
+            CREATE TABLE IF NOT EXISTS correction_daily (
+              day TEXT NOT NULL,
+              error_type TEXT NOT NULL,
+              count INTEGER NOT NULL DEFAULT 0,
+              PRIMARY KEY (day, error_type)
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS correction_rule_daily (
+              day TEXT NOT NULL,
+              rule_id TEXT NOT NULL,
+              count INTEGER NOT NULL DEFAULT 0,
+              PRIMARY KEY (day, rule_id)
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS stats_counters (
+              name TEXT PRIMARY KEY,
+              value INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS stats_capture_daily (
+              day TEXT NOT NULL,
+              entry_type TEXT NOT NULL,
+              count INTEGER NOT NULL DEFAULT 0,
+              PRIMARY KEY (day, entry_type)
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS stats_tag_counts (
+              tag TEXT PRIMARY KEY,
+              count INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID;
+
+            CREATE INDEX IF NOT EXISTS idx_stats_tag_counts_count ON stats_tag_counts(count);
+
+            CREATE TABLE IF NOT EXISTS stats_review_daily (
+              day TEXT NOT NULL,
+              action TEXT NOT NULL,
+              count INTEGER NOT NULL DEFAULT 0,
+              PRIMARY KEY (day, action)
+            ) WITHOUT ROWID;
+
             """
         )
         self._ensure_column("entries", "part_of_speech", "TEXT DEFAULT ''")
@@ -90,11 +308,247 @@ class Database:
         self._ensure_column("entries", "grammar_notes", "TEXT DEFAULT ''")
         self._ensure_column("entries", "structure_breakdown", "TEXT DEFAULT ''")
         self._ensure_column("entries", "key_terms", "TEXT DEFAULT ''")
+        self._ensure_column("capture_spans", "cached_tokens", "INTEGER NOT NULL DEFAULT 0")
+        self._ensure_column("capture_spans", "template", "TEXT NOT NULL DEFAULT ''")
+        for table in CHANGE_TRACKED_TABLES:
+            self._ensure_change_triggers(table)
+        self._ensure_correction_rollups()
+        self._ensure_stats_triggers()
         self._conn.commit()
 
+    def _ensure_stats_triggers(self) -> None:
+        def _counter(name: str, delta: str) -> str:
+            return f"""
+              INSERT INTO stats_counters (name, value) VALUES ({name}, {delta})
+              ON CONFLICT(name) DO UPDATE SET value = value + ({delta});
+            """
+
+        def _entry(ref: str, delta: str) -> str:
+            return _counter("'entries'", delta) + _counter(f"'type:' || {ref}.entry_type", delta) + f"""
+              INSERT INTO stats_capture_daily (day, entry_type, count)
+              VALUES (date({ref}.created_at, 'unixepoch'), {ref}.entry_type, {delta})
+              ON CONFLICT(day, entry_type) DO UPDATE SET count = count + ({delta});
+              INSERT INTO stats_tag_counts (tag, count)
+              SELECT DISTINCT CAST(value AS TEXT), {delta} FROM json_each({_json_array(f"{ref}.tags")}) WHERE true
+              ON CONFLICT(tag) DO UPDATE SET count = count + ({delta});
+            """
+
+        def _log(ref: str, delta: str) -> str:
+            return f"""
+              INSERT INTO stats_review_daily (day, action, count)
+              VALUES (date({ref}.reviewed_at, 'unixepoch'), {ref}.action, {delta})
+              ON CONFLICT(day, action) DO UPDATE SET count = count + ({delta});
+            """
+
+        cursor = self._conn.cursor()
+        cursor.executescript(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_entries_insert_stats AFTER INSERT ON entries
+            BEGIN {_entry("NEW", "1")} END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_entries_delete_stats AFTER DELETE ON entries
+            BEGIN {_entry("OLD", "-1")} END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_entries_update_stats
+            AFTER UPDATE OF entry_type, created_at, tags ON entries
+            WHEN OLD.entry_type IS NOT NEW.entry_type OR OLD.created_at IS NOT NEW.created_at OR OLD.tags IS NOT NEW.tags
+            BEGIN {_entry("OLD", "-1")} {_entry("NEW", "1")} END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_reviews_insert_stats AFTER INSERT ON reviews
+            BEGIN {_counter("'status:' || NEW.status", "1")} END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_reviews_delete_stats AFTER DELETE ON reviews
+            BEGIN {_counter("'status:' || OLD.status", "-1")} END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_reviews_update_stats AFTER UPDATE OF status ON reviews
+            WHEN OLD.status IS NOT NEW.status
+            BEGIN {_counter("'status:' || OLD.status", "-1")} {_counter("'status:' || NEW.status", "1")} END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_review_logs_insert_stats AFTER INSERT ON review_logs
+            BEGIN {_log("NEW", "1")} END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_review_logs_delete_stats AFTER DELETE ON review_logs
+            BEGIN {_log("OLD", "-1")} END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_review_logs_update_stats AFTER UPDATE OF action, reviewed_at ON review_logs
+            BEGIN {_log("OLD", "-1")} {_log("NEW", "1")} END;
+            """
+        )
+        # Libraries created before the summary tables existed are counted once.
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM stats_counters WHERE name = 'entries')")
+        if not cursor.fetchone()[0]:
+            self.rebuild_stats()
+
+    def rebuild_stats(self) -> None:
+        cursor = self._conn.cursor()
+        for table in ("stats_counters", "stats_capture_daily", "stats_tag_counts", "stats_review_daily"):
+            cursor.execute(f"DELETE FROM {table}")
+        cursor.execute("INSERT INTO stats_counters (name, value) SELECT 'entries', COUNT(*) FROM entries")
+        cursor.execute(
+            "INSERT INTO stats_counters (name, value) SELECT 'type:' || entry_type, COUNT(*) FROM entries GROUP BY entry_type"
+        )
+        cursor.execute(
+            "INSERT INTO stats_counters (name, value) SELECT 'status:' || status, COUNT(*) FROM reviews GROUP BY status"
+        )
+        cursor.execute(
+            """
+            INSERT INTO stats_capture_daily (day, entry_type, count)
+            SELECT date(created_at, 'unixepoch'), entry_type, COUNT(*)
+            FROM entries
+            GROUP BY 1, 2
+            """
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO stats_tag_counts (tag, count)
+            SELECT CAST(t.value AS TEXT), COUNT(DISTINCT e.id)
+            FROM entries e, json_each({_json_array("e.tags")}) t
+            GROUP BY 1
+            """
+        )
+        cursor.execute(
+            """
+            INSERT INTO stats_review_daily (day, action, count)
+            SELECT date(reviewed_at, 'unixepoch'), action, COUNT(*)
+            FROM review_logs
+            GROUP BY 1, 2
+            """
+        )
+
+    def _ensure_correction_rollups(self) -> None:
+        # Day buckets are UTC dates; rule ids are expanded from the JSON array with json_each.
+        day = "date({ref}.created_at, 'unixepoch')"
+        rules = "json_each(CASE WHEN json_valid({ref}.rule_ids) THEN {ref}.rule_ids ELSE '[]' END)"
+
+        def _apply(ref: str, delta: str) -> str:
+            return f"""
+              INSERT INTO correction_daily (day, error_type, count)
+              VALUES ({day.format(ref=ref)}, {ref}.error_type, {delta})
+              ON CONFLICT(day, error_type) DO UPDATE SET count = count + ({delta});
+              INSERT INTO correction_rule_daily (day, rule_id, count)
+              SELECT {day.format(ref=ref)}, CAST(value AS TEXT), {delta} FROM {rules.format(ref=ref)} WHERE true
+              ON CONFLICT(day, rule_id) DO UPDATE SET count = count + ({delta});
+            """
+
+        cursor = self._conn.cursor()
+        cursor.executescript(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_correction_cards_insert_rollup AFTER INSERT ON correction_cards
+            BEGIN {_apply("NEW", "1")} END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_correction_cards_delete_rollup AFTER DELETE ON correction_cards
+            BEGIN {_apply("OLD", "-1")} END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_correction_cards_update_rollup
+            AFTER UPDATE OF error_type, rule_ids, created_at ON correction_cards
+            BEGIN {_apply("OLD", "-1")} {_apply("NEW", "1")} END;
+            """
+        )
+        # Cards written before the triggers existed are folded in once.
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM correction_cards) AND NOT EXISTS (SELECT 1 FROM correction_daily)"
+        )
+        if cursor.fetchone()[0]:
+            self.rebuild_correction_rollups()
+
+    def rebuild_correction_rollups(self) -> None:
+        cursor = self._conn.cursor()
+        cursor.execute("DELETE FROM correction_daily")
+        cursor.execute("DELETE FROM correction_rule_daily")
+        cursor.execute(
+            """
+            INSERT INTO correction_daily (day, error_type, count)
+            SELECT date(created_at, 'unixepoch'), error_type, COUNT(*)
+            FROM correction_cards
+            GROUP BY 1, 2
+            """
+        )
+        cursor.execute(
+            """
+            INSERT INTO correction_rule_daily (day, rule_id, count)
+            SELECT date(c.created_at, 'unixepoch'), CAST(r.value AS TEXT), COUNT(*)
+            FROM correction_cards c,
+                 json_each(CASE WHEN json_valid(c.rule_ids) THEN c.rule_ids ELSE '[]' END) r
+            GROUP BY 1, 2
+            """
+        )
+
+    def _ensure_change_triggers(self, table: str) -> None:
+        cursor = self._conn.cursor()
+        cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE ?",
+            (f"trg_{table}_%_log",),
+        )
+        if cursor.fetchone()[0] == 3:
+            return
+        for op, ref in (("insert", "NEW"), ("update", "NEW"), ("delete", "OLD")):
+            cursor.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{op}_log AFTER {op.upper()} ON {table}
+                BEGIN
+                  INSERT INTO change_log (entity, entity_id, op, row_version, changed_at)
+                  VALUES (
+                    '{table}', {ref}.id, '{op}',
+                    COALESCE((
+                      SELECT MAX(row_version) FROM change_log
+                      WHERE entity = '{table}' AND entity_id = {ref}.id
+                    ), 0) + 1,
+                    CAST(strftime('%s', 'now') AS INTEGER)
+                  );
+                END
+                """
+            )
+        # Rows written before the triggers existed enter the log once, as inserts.
+        cursor.execute(
+            f"""
+            INSERT INTO change_log (entity, entity_id, op, row_version, changed_at)
+            SELECT '{table}', t.id, 'insert', 1, CAST(strftime('%s', 'now') AS INTEGER)
+            FROM {table} t
+            WHERE NOT EXISTS (
+              SELECT 1 FROM change_log c WHERE c.entity = '{table}' AND c.entity_id = t.id
+            )
+            ORDER BY t.id
+            """
+        )
+
     def _ensure_column(self, table: str, column: str, ddl: str) -> None:
         cursor = self._conn.cursor()
         cursor.execute(f"PRAGMA table_info({table})")
         columns = {row["name"] for row in cursor.fetchall()}
         if column not in columns:
             cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+
+class ThreadLocalDatabase(Generic[T]):
+    # sqlite3 connections are bound to the thread that opened them, so each thread gets
+    # its own Database and whatever `build` makes from it (usually repos). Keyed by thread
+    # id rather than threading.local: a QThread gets a fresh Python thread state for every
+    # slot call, which would drop threading.local data and reconnect each time.
+    def __init__(self, path: str, build: Callable[[Database], T]) -> None:
+        self._path = path
+        self._build = build
+        self._lock = threading.Lock()
+        self._slots: Dict[int, Tuple[threading.Thread, Database, T]] = {}
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def get(self) -> T:
+        key = threading.get_ident()
+        with self._lock:
+            slot = self._slots.get(key)
+        # A dead owner means the id was reused by a new thread; its connection is not ours.
+        if slot is None or not slot[0].is_alive():
+            db = Database(self._path)
+            slot = (threading.current_thread(), db, self._build(db))
+            with self._lock:
+                self._slots[key] = slot
+        return slot[2]
+
+    def close(self) -> None:
+        # Must run on the thread that called get(); the next get() there reopens.
+        with self._lock:
+            slot = self._slots.pop(threading.get_ident(), None)
+        if slot is not None:
+            slot[1].connection.close()
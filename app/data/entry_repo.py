@@ -1,55 +1,70 @@
 import sqlite3
 import time
-from typing import List, Dict, Any
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
+from app.data.change_repo import ChangeRepo
 from app.data.db import Database
 
 
+_INSERT_ENTRY_SQL = """
+    INSERT INTO entries (
+      entry_type, text, language, translation, phonetic_us, phonetic_uk,
+      definition, part_of_speech, ipa, word_roots, tense_form,
+      common_meanings, tags, related_entry_ids, grammar_notes,
+      structure_breakdown, key_terms, audio_us_url, audio_uk_url,
+      source_app, raw_llm,
+      created_at, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _entry_row(entry: Dict[str, Any], now: int) -> tuple:
+    return (
+        entry["entry_type"],
+        entry["text"],
+        entry.get("language", "en"),
+        entry.get("translation", ""),
+        entry.get("phonetic_us", ""),
+        entry.get("phonetic_uk", ""),
+        entry.get("definition", ""),
+        entry.get("part_of_speech", ""),
+        entry.get("ipa", ""),
+        entry.get("word_roots", ""),
+        entry.get("tense_form", ""),
+        entry.get("common_meanings", ""),
+        entry.get("tags", ""),
+        entry.get("related_entry_ids", ""),
+        entry.get("grammar_notes", ""),
+        entry.get("structure_breakdown", ""),
+        entry.get("key_terms", ""),
+        entry.get("audio_us_url", ""),
+        entry.get("audio_uk_url", ""),
+        entry.get("source_app", ""),
+        entry.get("raw_llm", ""),
+        now,
+        now,
+    )
+
+
 class EntryRepo:
-    def __init__(self, db: Database) -> None:
+    def __init__(self, db: Database, detail_cache_size: int = 256) -> None:
         self._db = db
+        self._detail_cache: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._detail_cache_size = detail_cache_size
+        self._detail_cache_version: Optional[int] = None
+
+    @property
+    def db_path(self) -> str:
+        return self._db.path
+
+    def data_version(self) -> int:
+        return self._db.data_version()
 
     def add_entry(self, entry: Dict[str, Any]) -> tuple[int, bool]:
-        now = int(time.time())
         cursor = self._db.connection.cursor()
         try:
-            cursor.execute(
-                """
-                INSERT INTO entries (
-                  entry_type, text, language, translation, phonetic_us, phonetic_uk,
-                  definition, part_of_speech, ipa, word_roots, tense_form,
-                  common_meanings, tags, related_entry_ids, grammar_notes,
-                  structure_breakdown, key_terms, audio_us_url, audio_uk_url,
-                  source_app, raw_llm,
-                  created_at, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    entry["entry_type"],
-                    entry["text"],
-                    entry.get("language", "en"),
-                    entry.get("translation", ""),
-                    entry.get("phonetic_us", ""),
-                    entry.get("phonetic_uk", ""),
-                    entry.get("definition", ""),
-                    entry.get("part_of_speech", ""),
-                    entry.get("ipa", ""),
-                    entry.get("word_roots", ""),
-                    entry.get("tense_form", ""),
-                    entry.get("common_meanings", ""),
-                    entry.get("tags", ""),
-                    entry.get("related_entry_ids", ""),
-                    entry.get("grammar_notes", ""),
-                    entry.get("structure_breakdown", ""),
-                    entry.get("key_terms", ""),
-                    entry.get("audio_us_url", ""),
-                    entry.get("audio_uk_url", ""),
-                    entry.get("source_app", ""),
-                    entry.get("raw_llm", ""),
-                    now,
-                    now,
-                ),
-            )
+            cursor.execute(_INSERT_ENTRY_SQL, _entry_row(entry, int(time.time())))
             self._db.connection.commit()
             return int(cursor.lastrowid), True
         except sqlite3.IntegrityError:
@@ -57,8 +72,37 @@ class EntryRepo:
             row = cursor.fetchone()
             return (int(row["id"]) if row else 0), False
 
+    def add_entries(self, entries: List[Dict[str, Any]]) -> int:
+        now = int(time.time())
+        with self._db.connection as connection:
+            cursor = connection.executemany(
+                _INSERT_ENTRY_SQL.replace("INSERT INTO", "INSERT OR IGNORE INTO", 1),
+                [_entry_row(entry, now) for entry in entries],
+            )
+        return cursor.rowcount
+
     def list_entries(self) -> List[Dict[str, Any]]:
         cursor = self._db.connection.cursor()
+        cursor.execute(
+            """
+            SELECT id, entry_type, text, created_at
+            FROM entries
+            ORDER BY created_at DESC
+            """
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_entry(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        # Writes from other connections bump data_version; our own writes evict by id.
+        version = self._db.data_version()
+        if version != self._detail_cache_version:
+            self._detail_cache.clear()
+            self._detail_cache_version = version
+        cached = self._detail_cache.get(entry_id)
+        if cached is not None:
+            self._detail_cache.move_to_end(entry_id)
+            return dict(cached)
+        cursor = self._db.connection.cursor()
         cursor.execute(
             """
             SELECT id, entry_type, text, translation, phonetic_us, phonetic_uk, definition,
@@ -66,10 +110,18 @@ class EntryRepo:
                    related_entry_ids, grammar_notes, structure_breakdown, key_terms,
                    created_at
             FROM entries
-            ORDER BY created_at DESC
-            """
+            WHERE id = ?
+            """,
+            (entry_id,),
         )
-        return [dict(row) for row in cursor.fetchall()]
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        entry = dict(row)
+        self._detail_cache[entry_id] = entry
+        while len(self._detail_cache) > self._detail_cache_size:
+            self._detail_cache.popitem(last=False)
+        return dict(entry)
 
     def list_word_entries(self) -> List[Dict[str, Any]]:
         cursor = self._db.connection.cursor()
@@ -83,6 +135,152 @@ class EntryRepo:
         )
         return [dict(row) for row in cursor.fetchall()]
 
+    def list_word_entries_since(self, after_id: int) -> List[Dict[str, Any]]:
+        cursor = self._db.connection.cursor()
+        cursor.execute(
+            """
+            SELECT id, text, translation
+            FROM entries
+            WHERE entry_type = 'word' AND id > ?
+            ORDER BY id
+            """,
+            (after_id,),
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def word_changes_since(self, seq: int, limit: int = 5000) -> Dict[str, Any]:
+        # Entry changes from the change log, joined to the row's current state; a
+        # missing row (or one that is no longer a word) means it left the word list.
+        if seq and seq < ChangeRepo(self._db).floor():
+            return {"changes": [], "cursor": seq, "more": False, "reset": True}
+        cursor = self._db.connection.cursor()
+        cursor.execute(
+            """
+            SELECT c.seq, c.entity_id AS id, e.entry_type, e.text, e.translation
+            FROM change_log c
+            LEFT JOIN entries e ON e.id = c.entity_id
+            WHERE c.entity = 'entries' AND c.seq > ?
+            ORDER BY c.seq
+            LIMIT ?
+            """,
+            (seq, limit),
+        )
+        rows = [dict(row) for row in cursor.fetchall()]
+        return {
+            "changes": rows,
+            "cursor": rows[-1]["seq"] if rows else seq,
+            "more": len(rows) == limit,
+            "reset": False,
+        }
+
+    def latest_change_seq(self) -> int:
+        row = self._db.connection.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()
+        return int(row[0])
+
+    def list_vocabulary_since(self, after_id: int) -> List[Dict[str, Any]]:
+        cursor = self._db.connection.cursor()
+        cursor.execute(
+            """
+            SELECT id, text
+            FROM entries
+            WHERE entry_type IN ('word', 'phrase') AND id > ?
+            ORDER BY id
+            """,
+            (after_id,),
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def list_pending_enrichment(self, limit: int = 0) -> List[Dict[str, Any]]:
+        cursor = self._db.connection.cursor()
+        sql = """
+            SELECT id, entry_type, text
+            FROM entries
+            WHERE raw_llm = '' OR raw_llm IS NULL OR raw_llm LIKE 'error:%'
+            ORDER BY id
+        """
+        params: list = []
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        cursor.execute(sql, params)
+        return [dict(row) for row in cursor.fetchall()]
+
+    def count_pending_enrichment(self) -> int:
+        row = self._db.connection.execute(
+            "SELECT COUNT(*) FROM entries WHERE raw_llm = '' OR raw_llm IS NULL OR raw_llm LIKE 'error:%'"
+        ).fetchone()
+        return int(row[0])
+
+    def update_enrichment(self, entry_id: int, entry: Dict[str, Any]) -> None:
+        cursor = self._db.connection.cursor()
+        cursor.execute(
+            """
+            UPDATE entries
+            SET translation = ?, phonetic_us = ?, phonetic_uk = ?, definition = ?,
+                part_of_speech = ?, ipa = ?, word_roots = ?, tense_form = ?,
+                common_meanings = ?, grammar_notes = ?, structure_breakdown = ?,
+                key_terms = ?, raw_llm = ?, updated_at = ?,
+                related_entry_ids = CASE WHEN ? IN ('', '[]') THEN related_entry_ids ELSE ? END
+            WHERE id = ?
+            """,
+            (
+                entry.get("translation", ""),
+                entry.get("phonetic_us", ""),
+                entry.get("phonetic_uk", ""),
+                entry.get("definition", ""),
+                entry.get("part_of_speech", ""),
+                entry.get("ipa", ""),
+                entry.get("word_roots", ""),
+                entry.get("tense_form", ""),
+                entry.get("common_meanings", ""),
+                entry.get("grammar_notes", ""),
+                entry.get("structure_breakdown", ""),
+                entry.get("key_terms", ""),
+                entry.get("raw_llm", ""),
+                int(time.time()),
+                entry.get("related_entry_ids", ""),
+                entry.get("related_entry_ids", ""),
+                entry_id,
+            ),
+        )
+        self._db.connection.commit()
+        self._detail_cache.pop(entry_id, None)
+
+    def iter_entries(self, entry_type: str = "") -> Iterator[Dict[str, Any]]:
+        cursor = self._db.connection.cursor()
+        sql = "SELECT * FROM entries"
+        params: list = []
+        if entry_type:
+            sql += " WHERE entry_type = ?"
+            params.append(entry_type)
+        sql += " ORDER BY id"
+        cursor.execute(sql, params)
+        for row in cursor:
+            yield dict(row)
+
+    def count_by_type(self) -> Dict[str, int]:
+        cursor = self._db.connection.cursor()
+        cursor.execute("SELECT entry_type, COUNT(*) AS total FROM entries GROUP BY entry_type")
+        return {row["entry_type"]: int(row["total"]) for row in cursor.fetchall()}
+
+    def list_due_entries(self, until: int, limit: int = 200) -> List[Dict[str, Any]]:
+        cursor = self._db.connection.cursor()
+        # CROSS JOIN keeps reviews as the outer loop so the due range on idx_reviews_next
+        # drives the query instead of a walk over every word.
+        cursor.execute(
+            """
+            SELECT e.id, e.entry_type, e.text, e.audio_us_url, e.audio_uk_url, MIN(r.next_review_at) AS due_at
+            FROM reviews r
+            CROSS JOIN entries e ON e.id = r.entry_id
+            WHERE r.next_review_at <= ? AND e.entry_type = 'word'
+            GROUP BY e.id
+            ORDER BY due_at
+            LIMIT ?
+            """,
+            (until, limit),
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
     def update_tags(self, entry_id: int, tags: str) -> None:
         cursor = self._db.connection.cursor()
         cursor.execute(
@@ -94,6 +292,7 @@ class EntryRepo:
             (tags, int(time.time()), entry_id),
         )
         self._db.connection.commit()
+        self._detail_cache.pop(entry_id, None)
 
     def update_related(self, entry_id: int, related_entry_ids: str) -> None:
         cursor = self._db.connection.cursor()
@@ -106,6 +305,7 @@ class EntryRepo:
             (related_entry_ids, int(time.time()), entry_id),
         )
         self._db.connection.commit()
+        self._detail_cache.pop(entry_id, None)
 
     def search_words(self, query: str, exclude_ids: list[int]) -> List[Dict[str, Any]]:
         cursor = self._db.connection.cursor()
@@ -123,6 +323,111 @@ class EntryRepo:
         cursor.execute(sql, params)
         return [dict(row) for row in cursor.fetchall()]
 
+    def list_library_entries(self, entry_type: str = "", limit: int = 500) -> List[Dict[str, Any]]:
+        sql = f"SELECT library, id, entry_type, text, created_at FROM {self._db.library_view()}"
+        params: list = []
+        if entry_type:
+            sql += " WHERE entry_type = ?"
+            params.append(entry_type)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self._db.connection.execute(sql, params).fetchall()]
+
+    def search_libraries(self, query: str, entry_type: str = "word", limit: int = 20) -> List[Dict[str, Any]]:
+        # Through the view the planner filters on idx_entries_type and sorts everything;
+        # per-library branches walk idx_entries_created and stop after `limit` hits each.
+        branch = """
+            SELECT * FROM (
+              SELECT '{alias}' AS library, id, entry_type, text, translation, created_at
+              FROM {alias}.entries
+              WHERE entry_type = ? AND text LIKE ?
+              ORDER BY created_at DESC
+              LIMIT ?
+            )
+        """
+        aliases = list(self._db.libraries())
+        sql = " UNION ALL ".join(branch.format(alias=alias) for alias in aliases) + " ORDER BY created_at DESC LIMIT ?"
+        params = [entry_type, "%{}%".format(query), limit] * len(aliases) + [limit]
+        rows = self._db.connection.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def find_id_by_text(self, text: str) -> int:
+        row = self._db.connection.execute("SELECT id FROM entries WHERE text = ?", (text,)).fetchone()
+        return int(row["id"]) if row else 0
+
+    def find_in_libraries(self, text: str) -> List[Dict[str, Any]]:
+        rows = self._db.connection.execute(
+            f"SELECT library, id, entry_type FROM {self._db.library_view()} WHERE text = ?",
+            (text,),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def texts_in_other_libraries(self, texts: List[str]) -> Dict[str, Dict[str, Any]]:
+        # Texts already kept in an attached library but not in the primary file.
+        if not texts or len(self._db.libraries()) < 2:
+            return {}
+        found: Dict[str, Dict[str, Any]] = {}
+        view = self._db.library_view()
+        for start in range(0, len(texts), 500):
+            chunk = texts[start:start + 500]
+            placeholders = ",".join("?" for _ in chunk)
+            rows = self._db.connection.execute(
+                f"SELECT library, id, entry_type, text FROM {view} WHERE text IN ({placeholders})",
+                chunk,
+            ).fetchall()
+            in_main = {row["text"] for row in rows if row["library"] == "main"}
+            for row in rows:
+                if row["text"] not in in_main:
+                    found.setdefault(row["text"], dict(row))
+        return found
+
+    def library_names(self) -> List[str]:
+        return list(self._db.libraries())
+
+    def libraries(self) -> Dict[str, str]:
+        return self._db.libraries()
+
+    def get_library_entry(self, library: str, entry_id: int) -> Optional[Dict[str, Any]]:
+        if library == "main":
+            return self.get_entry(entry_id)
+        if library not in self._db.libraries():
+            return None
+        row = self._db.connection.execute(
+            f"""
+            SELECT id, entry_type, text, translation, phonetic_us, phonetic_uk, definition,
+                   part_of_speech, ipa, word_roots, tense_form, common_meanings, tags,
+                   related_entry_ids, grammar_notes, structure_breakdown, key_terms,
+                   created_at
+            FROM {library}.entries
+            WHERE id = ?
+            """,
+            (entry_id,),
+        ).fetchone()
+        return {**dict(row), "library": library} if row else None
+
+    def library_duplicates(self, limit: int = 100) -> List[Dict[str, Any]]:
+        aliases = list(self._db.libraries())
+        pairs = [
+            f"""
+            SELECT a.text, '{left}' AS library, a.id, '{right}' AS other_library, b.id AS other_id
+            FROM {left}.entries a JOIN {right}.entries b ON b.text = a.text
+            """
+            for i, left in enumerate(aliases)
+            for right in aliases[i + 1 :]
+        ]
+        if not pairs:
+            return []
+        rows = self._db.connection.execute(" UNION ALL ".join(pairs) + " LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def count_by_library(self) -> Dict[str, int]:
+        # Read from each library's trigger-maintained counters rather than counting rows.
+        branches = " UNION ALL ".join(
+            f"SELECT '{alias}', COALESCE((SELECT value FROM {alias}.stats_counters WHERE name = 'entries'), 0)"
+            for alias in self._db.libraries()
+        )
+        return {row[0]: int(row[1]) for row in self._db.connection.execute(branches).fetchall()}
+
     def get_entry_texts(self, ids: list[int]) -> Dict[int, str]:
         if not ids:
             return {}
@@ -133,3 +438,39 @@ class EntryRepo:
             ids,
         )
         return {int(row["id"]): row["text"] for row in cursor.fetchall()}
+
+    def iter_grammar_pending(self, batch_size: int = 500) -> Iterator[Tuple[str, int]]:
+        last_id = 0
+        while True:
+            cursor = self._db.connection.cursor()
+            cursor.execute(
+                """
+                SELECT e.id, e.text
+                FROM entries e
+                LEFT JOIN grammar_analyses g ON g.entry_id = e.id
+                WHERE e.entry_type IN ('phrase', 'article')
+                  AND g.entry_id IS NULL
+                  AND e.id > ?
+                ORDER BY e.id
+                LIMIT ?
+                """,
+                (last_id, batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield row["text"], int(row["id"])
+            last_id = int(rows[-1]["id"])
+
+    def count_grammar_pending(self) -> int:
+        cursor = self._db.connection.cursor()
+        cursor.execute(
+            """
+            SELECT COUNT(*) AS total
+            FROM entries e
+            LEFT JOIN grammar_analyses g ON g.entry_id = e.id
+            WHERE e.entry_type IN ('phrase', 'article') AND g.entry_id IS NULL
+            """
+        )
+        return int(cursor.fetchone()["total"])
@@ -0,0 +1,55 @@
+import hashlib
+import json
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.data.db import Database
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class GrammarRepo:
+    def __init__(self, db: Database) -> None:
+        self._db = db
+
+    def get_analysis(self, entry_id: int, text: str) -> Optional[Dict[str, Any]]:
+        cursor = self._db.connection.cursor()
+        cursor.execute(
+            "SELECT text_hash, analysis FROM grammar_analyses WHERE entry_id = ?",
+            (entry_id,),
+        )
+        row = cursor.fetchone()
+        if not row or row["text_hash"] != text_hash(text):
+            return None
+        try:
+            return json.loads(row["analysis"])
+        except Exception:
+            return None
+
+    def save_analysis(self, entry_id: int, text: str, analysis: Dict[str, Any]) -> None:
+        self.save_analyses([(entry_id, text, analysis)])
+
+    def save_analyses(self, rows: Iterable[Tuple[int, str, Dict[str, Any]]]) -> int:
+        now = int(time.time())
+        params = [
+            (entry_id, text_hash(text), json.dumps(analysis, ensure_ascii=True), now)
+            for entry_id, text, analysis in rows
+        ]
+        if not params:
+            return 0
+        conn = self._db.connection
+        with conn:
+            conn.executemany(
+                """
+                INSERT INTO grammar_analyses (entry_id, text_hash, analysis, created_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(entry_id) DO UPDATE SET
+                  text_hash = excluded.text_hash,
+                  analysis = excluded.analysis,
+                  created_at = excluded.created_at
+                """,
+                params,
+            )
+        return len(params)
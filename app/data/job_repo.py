@@ -0,0 +1,133 @@
+import time
+from typing import Any, Dict, Optional
+
+from app.data.db import Database
+
+PRIORITY_INTERACTIVE = 10
+PRIORITY_BACKGROUND = 0
+
+
+class JobRepo:
+    def __init__(self, db: Database) -> None:
+        self._db = db
+
+    def enqueue(self, entry_id: int, priority: int = PRIORITY_INTERACTIVE, kind: str = "enrich") -> int:
+        now = int(time.time())
+        conn = self._db.connection
+        with conn:
+            row = conn.execute(
+                """
+                INSERT INTO jobs (kind, entry_id, priority, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(kind, entry_id) DO UPDATE SET
+                  priority = MAX(priority, excluded.priority),
+                  attempts = CASE WHEN state IN ('done', 'failed') THEN 0 ELSE attempts END,
+                  state = CASE WHEN state = 'running' THEN state ELSE 'pending' END,
+                  run_after = 0,
+                  updated_at = excluded.updated_at
+                RETURNING id
+                """,
+                (kind, entry_id, priority, now, now),
+            ).fetchone()
+        return int(row[0])
+
+    def enqueue_backfill(self, limit: int = 0, kind: str = "enrich") -> int:
+        now = int(time.time())
+        sql = """
+            INSERT INTO jobs (kind, entry_id, priority, created_at, updated_at)
+            SELECT ?, e.id, ?, ?, ?
+            FROM entries e
+            WHERE (e.raw_llm = '' OR e.raw_llm IS NULL OR e.raw_llm LIKE 'error:%')
+              AND NOT EXISTS (SELECT 1 FROM jobs j WHERE j.kind = ? AND j.entry_id = e.id)
+            ORDER BY e.id DESC
+        """
+        params: list = [kind, PRIORITY_BACKGROUND, now, now, kind]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        conn = self._db.connection
+        with conn:
+            return conn.execute(sql + " ON CONFLICT DO NOTHING", params).rowcount
+
+    def claim(self, owner: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        conn = self._db.connection
+        with conn:
+            row = conn.execute(
+                """
+                UPDATE jobs
+                SET state = 'running', attempts = attempts + 1, lease_owner = ?, lease_until = ?, updated_at = ?
+                WHERE id = (
+                  SELECT id FROM jobs
+                  WHERE state = 'pending' AND run_after <= ?
+                  ORDER BY priority DESC, id
+                  LIMIT 1
+                )
+                RETURNING id, kind, entry_id, priority, attempts
+                """,
+                (owner, now + lease_seconds, int(now), now),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def reclaim_expired(self) -> int:
+        # Jobs whose worker died (crash, kill, power loss) go back to the queue.
+        conn = self._db.connection
+        with conn:
+            return conn.execute(
+                """
+                UPDATE jobs SET state = 'pending', lease_owner = '', updated_at = ?
+                WHERE state = 'running' AND lease_until < ?
+                """,
+                (int(time.time()), time.time()),
+            ).rowcount
+
+    def release_owner(self, owner: str) -> int:
+        conn = self._db.connection
+        with conn:
+            return conn.execute(
+                """
+                UPDATE jobs SET state = 'pending', attempts = MAX(attempts - 1, 0), lease_owner = '', updated_at = ?
+                WHERE state = 'running' AND lease_owner = ?
+                """,
+                (int(time.time()), owner),
+            ).rowcount
+
+    def complete(self, job_id: int, owner: str) -> bool:
+        conn = self._db.connection
+        with conn:
+            return conn.execute(
+                """
+                UPDATE jobs SET state = 'done', lease_owner = '', last_error = '', updated_at = ?
+                WHERE id = ? AND state = 'running' AND lease_owner = ?
+                """,
+                (int(time.time()), job_id, owner),
+            ).rowcount > 0
+
+    def fail(self, job_id: int, owner: str, error: str, retry_delay: float, max_attempts: int) -> str:
+        conn = self._db.connection
+        with conn:
+            row = conn.execute(
+                """
+                UPDATE jobs
+                SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                    run_after = ?, lease_owner = '', last_error = ?, updated_at = ?
+                WHERE id = ? AND state = 'running' AND lease_owner = ?
+                RETURNING state
+                """,
+                (max_attempts, time.time() + retry_delay, error[:500], int(time.time()), job_id, owner),
+            ).fetchone()
+        return row[0] if row else ""
+
+    def retry_failed(self) -> int:
+        conn = self._db.connection
+        with conn:
+            return conn.execute(
+                "UPDATE jobs SET state = 'pending', attempts = 0, run_after = 0, updated_at = ? WHERE state = 'failed'",
+                (int(time.time()),),
+            ).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._db.connection.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = {"pending": 0, "running": 0, "done": 0, "failed": 0}
+        counts.update({row[0]: int(row[1]) for row in rows})
+        return counts
@@ -0,0 +1,120 @@
+from typing import Any, Dict, Iterable, List
+
+from app.data.db import Database
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class MetricsRepo:
+    def __init__(self, db: Database, retention: int = 5000) -> None:
+        self._db = db
+        self._retention = retention
+
+    def add_spans(self, spans: Iterable[Dict[str, Any]]) -> int:
+        params = [
+            (
+                span["trace_id"],
+                span["stage"],
+                float(span["duration_ms"]),
+                int(span.get("prompt_tokens", 0)),
+                int(span.get("completion_tokens", 0)),
+                int(span.get("cached_tokens", 0)),
+                str(span.get("template", "")),
+                int(span["created_at"]),
+            )
+            for span in spans
+        ]
+        if not params:
+            return 0
+        conn = self._db.connection
+        with conn:
+            cursor = conn.executemany(
+                """
+                INSERT INTO capture_spans (
+                  trace_id, stage, duration_ms, prompt_tokens, completion_tokens,
+                  cached_tokens, template, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                params,
+            )
+            # Ring buffer: ids are monotonic, so trimming is a primary-key range delete.
+            conn.execute(
+                "DELETE FROM capture_spans WHERE id <= (SELECT MAX(id) FROM capture_spans) - ?",
+                (self._retention,),
+            )
+        return len(params)
+
+    def stage_report(self) -> List[Dict[str, Any]]:
+        cursor = self._db.connection.cursor()
+        cursor.execute(
+            """
+            SELECT stage, duration_ms, prompt_tokens, completion_tokens
+            FROM capture_spans
+            ORDER BY stage, duration_ms
+            """
+        )
+        grouped: Dict[str, Dict[str, Any]] = {}
+        for row in cursor.fetchall():
+            item = grouped.setdefault(
+                row["stage"],
+                {"durations": [], "prompt_tokens": 0, "completion_tokens": 0},
+            )
+            item["durations"].append(float(row["duration_ms"]))
+            item["prompt_tokens"] += int(row["prompt_tokens"])
+            item["completion_tokens"] += int(row["completion_tokens"])
+        report = []
+        for stage, item in grouped.items():
+            durations = item["durations"]
+            report.append(
+                {
+                    "stage": stage,
+                    "count": len(durations),
+                    "p50_ms": _percentile(durations, 50),
+                    "p95_ms": _percentile(durations, 95),
+                    "max_ms": durations[-1],
+                    "avg_prompt_tokens": item["prompt_tokens"] / len(durations),
+                    "avg_completion_tokens": item["completion_tokens"] / len(durations),
+                }
+            )
+        return report
+
+    def template_report(self) -> List[Dict[str, Any]]:
+        cursor = self._db.connection.cursor()
+        cursor.execute(
+            """
+            SELECT template, duration_ms, prompt_tokens, completion_tokens, cached_tokens
+            FROM capture_spans
+            WHERE stage = 'llm' AND template != ''
+            ORDER BY template, duration_ms
+            """
+        )
+        grouped: Dict[str, Dict[str, Any]] = {}
+        for row in cursor.fetchall():
+            item = grouped.setdefault(
+                row["template"],
+                {"durations": [], "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0},
+            )
+            item["durations"].append(float(row["duration_ms"]))
+            item["prompt_tokens"] += int(row["prompt_tokens"])
+            item["completion_tokens"] += int(row["completion_tokens"])
+            item["cached_tokens"] += int(row["cached_tokens"])
+        report = []
+        for template, item in grouped.items():
+            durations = item["durations"]
+            report.append(
+                {
+                    "template": template,
+                    "count": len(durations),
+                    "p50_ms": _percentile(durations, 50),
+                    "p95_ms": _percentile(durations, 95),
+                    "avg_prompt_tokens": item["prompt_tokens"] / len(durations),
+                    "avg_completion_tokens": item["completion_tokens"] / len(durations),
+                    "cached_ratio": item["cached_tokens"] / item["prompt_tokens"] if item["prompt_tokens"] else 0.0,
+                }
+            )
+        return report
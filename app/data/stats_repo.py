@@ -0,0 +1,104 @@
+import time
+from typing import Any, Dict, List
+
+from app.data.db import Database
+
+
+class StatsRepo:
+    def __init__(self, db: Database) -> None:
+        self._db = db
+
+    def totals(self) -> Dict[str, Any]:
+        rows = self._db.connection.execute("SELECT name, value FROM stats_counters WHERE value != 0").fetchall()
+        totals: Dict[str, Any] = {"entries": 0, "by_type": {}, "review_status": {}}
+        for row in rows:
+            name, value = row["name"], int(row["value"])
+            if name == "entries":
+                totals["entries"] = value
+            elif name.startswith("type:"):
+                totals["by_type"][name[5:]] = value
+            elif name.startswith("status:"):
+                totals["review_status"][name[7:]] = value
+        return totals
+
+    def captures_by_day(self, days: int = 30) -> List[Dict[str, Any]]:
+        rows = self._db.connection.execute(
+            """
+            SELECT day, entry_type, count
+            FROM stats_capture_daily
+            WHERE day >= date('now', ?) AND count > 0
+            ORDER BY day
+            """,
+            (f"-{days} days",),
+        ).fetchall()
+        by_day: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            item = by_day.setdefault(row["day"], {"day": row["day"], "total": 0, "by_type": {}})
+            item["by_type"][row["entry_type"]] = int(row["count"])
+            item["total"] += int(row["count"])
+        return list(by_day.values())
+
+    def top_tags(self, limit: int = 20) -> List[Dict[str, Any]]:
+        rows = self._db.connection.execute(
+            "SELECT tag, count FROM stats_tag_counts WHERE count > 0 ORDER BY count DESC, tag LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def tag_count(self, tag: str) -> int:
+        row = self._db.connection.execute("SELECT count FROM stats_tag_counts WHERE tag = ?", (tag,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def review_activity(self, days: int = 30) -> List[Dict[str, Any]]:
+        rows = self._db.connection.execute(
+            """
+            SELECT day, action, count
+            FROM stats_review_daily
+            WHERE day >= date('now', ?) AND count > 0
+            ORDER BY day
+            """,
+            (f"-{days} days",),
+        ).fetchall()
+        by_day: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            item = by_day.setdefault(row["day"], {"day": row["day"], "total": 0, "by_action": {}})
+            item["by_action"][row["action"]] = int(row["count"])
+            item["total"] += int(row["count"])
+        return list(by_day.values())
+
+    def streaks(self, today: str = "") -> Dict[str, Any]:
+        # One row per active day, so this is bounded by days studied, not by library size.
+        today = today or time.strftime("%Y-%m-%d", time.gmtime())
+        rows = self._db.connection.execute(
+            """
+            SELECT day, julianday(day) - ROW_NUMBER() OVER (ORDER BY day) AS island
+            FROM (SELECT day FROM stats_review_daily GROUP BY day HAVING SUM(count) > 0)
+            ORDER BY day
+            """
+        ).fetchall()
+        if not rows:
+            return {"current": 0, "longest": 0, "last_day": ""}
+        lengths: Dict[float, int] = {}
+        for row in rows:
+            lengths[row["island"]] = lengths.get(row["island"], 0) + 1
+        last_day, last_island = rows[-1]["day"], rows[-1]["island"]
+        gap = int(
+            self._db.connection.execute("SELECT julianday(?) - julianday(?)", (today, last_day)).fetchone()[0]
+        )
+        # A streak survives until the end of the day after the last review.
+        current = lengths[last_island] if gap <= 1 else 0
+        return {"current": current, "longest": max(lengths.values()), "last_day": last_day}
+
+    def dashboard(self, days: int = 30, tags: int = 10) -> Dict[str, Any]:
+        return {
+            **self.totals(),
+            "captures_by_day": self.captures_by_day(days),
+            "top_tags": self.top_tags(tags),
+            "review_activity": self.review_activity(days),
+            "streaks": self.streaks(),
+        }
+
+    def rebuild(self) -> None:
+        conn = self._db.connection
+        with conn:
+            self._db.rebuild_stats()
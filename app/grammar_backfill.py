@@ -0,0 +1,84 @@
+import argparse
+import sys
+
+from app.data.db import Database
+from app.data.entry_repo import EntryRepo
+from app.data.grammar_repo import GrammarRepo
+from app.services.grammar_service import GrammarService
+
+
+def run_backfill(
+    db_path: str,
+    batch_size: int = 64,
+    n_process: int = 1,
+    chunk_size: int = 200,
+    limit: int = 0,
+    quiet: bool = False,
+) -> dict:
+    db = Database(db_path)
+    db.initialize()
+    entry_repo = EntryRepo(db)
+    grammar_repo = GrammarRepo(db)
+    grammar_service = GrammarService()
+    if not grammar_service.available:
+        print("Parser unavailable. Install spaCy and en_core_web_sm.", file=sys.stderr)
+        return {"done": 0, "elapsed": 0.0, "docs_per_sec": 0.0, "available": False}
+
+    total = entry_repo.count_grammar_pending()
+    if limit:
+        total = min(total, limit)
+
+    def _report(stats: dict) -> None:
+        if quiet:
+            return
+        print(
+            f"\r{stats['done']}/{total} docs  {stats['docs_per_sec']:.1f} docs/sec",
+            end="",
+            file=sys.stderr,
+            flush=True,
+        )
+
+    stats = grammar_service.backfill(
+        entry_repo,
+        grammar_repo,
+        batch_size=batch_size,
+        n_process=n_process,
+        chunk_size=chunk_size,
+        limit=limit,
+        progress=_report,
+    )
+    if not quiet:
+        print(file=sys.stderr)
+    return stats
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Precompute grammar highlights for phrases and articles.")
+    parser.add_argument("--db", default="data.sqlite")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--n-process", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=200, help="Rows per write transaction.")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after this many entries (0 = all).")
+    parser.add_argument("--quiet", action="store_true")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    stats = run_backfill(
+        args.db,
+        batch_size=args.batch_size,
+        n_process=args.n_process,
+        chunk_size=args.chunk_size,
+        limit=args.limit,
+        quiet=args.quiet,
+    )
+    print(
+        f"Backfilled {stats['done']} entries in {stats['elapsed']:.2f}s "
+        f"({stats['docs_per_sec']:.1f} docs/sec)."
+    )
+    return 0 if stats["available"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,38 +1,108 @@
+import os
 import sys
-import time
-from PySide6 import QtCore, QtGui, QtWidgets
+import threading
 
-from app.data.db import Database
-from app.data.entry_repo import EntryRepo
-from app.services.clipboard_service import ClipboardService
-from app.services.grammar_service import GrammarService
-from app.services.selection_service import SelectionService
-from app.services.llm_service import LlmService
-from app.ui.main_window import MainWindow
+from app.utils.startup import StartupProfiler
+
+# Only Qt, the window and the database are needed before the first paint; spaCy
+# and the OpenAI client are loaded on a background thread once the window is up.
 
 
 def main() -> int:
-    app = QtWidgets.QApplication(sys.argv)
-
-    db = Database("data.sqlite")
-    db.initialize()
-
-    entry_repo = EntryRepo(db)
-
-    selection_service = SelectionService()
-    clipboard_service = ClipboardService(app.clipboard())
-    grammar_service = GrammarService()
-    llm_service = LlmService()
-
-    window = MainWindow(
-        entry_repo=entry_repo,
-        selection_service=selection_service,
-        clipboard_service=clipboard_service,
-        grammar_service=grammar_service,
-        llm_service=llm_service,
-    )
-    window.resize(1000, 600)
-    window.show()
+    profiler = StartupProfiler.from_env()
+    with profiler.phase("import_qt"):
+        from PySide6 import QtCore, QtWidgets
+
+    with profiler.phase("import_app"):
+        from app.data.db import Database, libraries_from_env
+        from app.data.entry_repo import EntryRepo
+        from app.data.grammar_repo import GrammarRepo
+        from app.data.metrics_repo import MetricsRepo
+        from app.services.audio_cache import AudioCache
+        from app.services.backup_service import BackupService
+        from app.services.clipboard_service import ClipboardService
+        from app.services.enrichment_queue import EnrichmentQueue
+        from app.services.grammar_service import GrammarService
+        from app.services.selection_service import SelectionService
+        from app.services.llm_service import LlmService
+        from app.ui.main_window import MainWindow
+        from app.utils.tracing import Tracer
+
+    with profiler.phase("qapplication"):
+        app = QtWidgets.QApplication(sys.argv)
+
+    with profiler.phase("database"):
+        db = Database(os.environ.get("LIBRARY_DB", "data.sqlite"))
+        db.initialize()
+        # Extra libraries (a shared reference deck, another language) are attached; captures
+        # still go to the primary file, but the duplicate check spans all of them.
+        for alias, path in libraries_from_env().items():
+            db.attach(path, alias)
+
+        entry_repo = EntryRepo(db)
+        grammar_repo = GrammarRepo(db)
+        metrics_repo = MetricsRepo(db, retention=int(os.environ.get("CAPTURE_METRICS_RETENTION", "5000")))
+        tracer = Tracer(enabled=os.environ.get("CAPTURE_TRACING", "1") != "0")
+
+    with profiler.phase("services"):
+        selection_service = SelectionService()
+        clipboard_service = ClipboardService(app.clipboard())
+        grammar_service = GrammarService()
+        llm_service = LlmService()
+        backup_service = BackupService(db.path, keep=int(os.environ.get("BACKUP_KEEP", "10")))
+        audio_cache = AudioCache(db.path)
+        enrichment_queue = EnrichmentQueue(db.path, llm_service, tracer)
+
+    with profiler.phase("window"):
+        window = MainWindow(
+            entry_repo=entry_repo,
+            grammar_repo=grammar_repo,
+            selection_service=selection_service,
+            clipboard_service=clipboard_service,
+            grammar_service=grammar_service,
+            llm_service=llm_service,
+            metrics_repo=metrics_repo,
+            tracer=tracer,
+            enrichment_queue=enrichment_queue,
+        )
+        window.resize(1000, 600)
+        window.show()
+
+    exit_after_paint = os.environ.get("STARTUP_PROFILE_EXIT", "") == "1"
+
+    def _warm_up() -> None:
+        with profiler.phase("warm_up_grammar"):
+            grammar_service.load()
+        with profiler.phase("warm_up_llm"):
+            llm_service.warm_up()
+        profiler.mark("warm_up_done")
+        if not exit_after_paint:
+            profiler.dump()
+
+    def _after_first_paint() -> None:
+        profiler.mark("first_paint")
+        with profiler.phase("load_entries"):
+            window.load_entries()
+        profiler.mark("entries_loaded")
+        if exit_after_paint:
+            _warm_up()
+            profiler.dump()
+            app.quit()
+            return
+        threading.Thread(target=_warm_up, name="warm-up", daemon=True).start()
+        backup_service.start(float(os.environ.get("BACKUP_INTERVAL_MIN", "30")) * 60.0)
+        audio_cache.prefetch_due(entry_repo)
+        # Jobs left by a previous run (quit or crash mid-request) are picked up here;
+        # failed or never-enriched entries queue behind interactive captures.
+        enrichment_queue.backfill(int(os.environ.get("ENRICH_BACKFILL_LIMIT", "200")))
+        if llm_service.configured:
+            enrichment_queue.start()
+
+    app.aboutToQuit.connect(backup_service.stop)
+    app.aboutToQuit.connect(audio_cache.shutdown)
+    app.aboutToQuit.connect(enrichment_queue.stop)
+
+    window.first_painted.connect(_after_first_paint, QtCore.Qt.ConnectionType.QueuedConnection)
 
     return app.exec()
 
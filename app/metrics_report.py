@@ -0,0 +1,57 @@
+import argparse
+import json
+
+from app.data.db import Database
+from app.data.metrics_repo import MetricsRepo
+
+_STAGE_ORDER = ["selection", "detect", "llm", "auto_tags", "add_entry", "refresh"]
+
+
+def print_report(report: list) -> None:
+    order = {stage: i for i, stage in enumerate(_STAGE_ORDER)}
+    report = sorted(report, key=lambda item: (order.get(item["stage"], len(order)), item["stage"]))
+    print(f"{'stage':<12}{'count':>8}{'p50 ms':>12}{'p95 ms':>12}{'max ms':>12}{'tokens in/out':>18}")
+    for item in report:
+        tokens = ""
+        if item["avg_prompt_tokens"] or item["avg_completion_tokens"]:
+            tokens = f"{item['avg_prompt_tokens']:.0f}/{item['avg_completion_tokens']:.0f}"
+        print(
+            f"{item['stage']:<12}{item['count']:>8}{item['p50_ms']:>12.1f}"
+            f"{item['p95_ms']:>12.1f}{item['max_ms']:>12.1f}{tokens:>18}"
+        )
+
+
+def print_template_report(report: list) -> None:
+    if not report:
+        return
+    print()
+    print(f"{'template':<18}{'count':>8}{'p50 ms':>12}{'p95 ms':>12}{'tokens in/out':>18}{'cached':>10}")
+    for item in report:
+        tokens = f"{item['avg_prompt_tokens']:.0f}/{item['avg_completion_tokens']:.0f}"
+        print(
+            f"{item['template']:<18}{item['count']:>8}{item['p50_ms']:>12.1f}"
+            f"{item['p95_ms']:>12.1f}{tokens:>18}{item['cached_ratio']:>10.0%}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Per-stage capture latency and per-template token report.")
+    parser.add_argument("--db", default="data.sqlite")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    db = Database(args.db)
+    db.initialize()
+    metrics_repo = MetricsRepo(db)
+    report = metrics_repo.stage_report()
+    templates = metrics_repo.template_report()
+    if args.json:
+        print(json.dumps({"stages": report, "templates": templates}, indent=2))
+    else:
+        print_report(report)
+        print_template_report(templates)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,164 @@
+import hashlib
+import os
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from app.data.audio_repo import AudioRepo
+from app.data.db import ThreadLocalDatabase
+
+_EXTENSIONS = {"audio/mpeg": ".mp3", "audio/mp3": ".mp3", "audio/wav": ".wav", "audio/x-wav": ".wav", "audio/ogg": ".ogg"}
+
+
+def audio_urls(entry: Dict[str, Any], template: str = "") -> Dict[str, str]:
+    urls = {}
+    for accent in ("us", "uk"):
+        url = entry.get(f"audio_{accent}_url") or ""
+        if not url and template and entry.get("entry_type", "word") == "word":
+            url = template.format(text=urllib.parse.quote(entry.get("text", "")), accent=accent)
+        if url:
+            urls[accent] = url
+    return urls
+
+
+class AudioCache:
+    def __init__(
+        self,
+        db_path: str,
+        cache_dir: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        workers: int = 4,
+        url_template: Optional[str] = None,
+        timeout: float = 10.0,
+    ) -> None:
+        self._repos = ThreadLocalDatabase(db_path, AudioRepo)
+        self._cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(db_path)), "audio_cache")
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get("AUDIO_CACHE_MAX_MB", "200")) * 1024 * 1024)
+        self._max_bytes = max_bytes
+        self._workers = workers
+        self._url_template = url_template if url_template is not None else os.environ.get("AUDIO_URL_TEMPLATE", "")
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def cache_dir(self) -> str:
+        return self._cache_dir
+
+    def urls_for(self, entry: Dict[str, Any]) -> Dict[str, str]:
+        return audio_urls(entry, self._url_template)
+
+    def get(self, url: str) -> Optional[str]:
+        repo = self._repo()
+        row = repo.lookup(url)
+        if row is None:
+            return None
+        path = self._blob_path(row["digest"], row["ext"])
+        if not os.path.exists(path):
+            repo.remove([row["digest"]])
+            return None
+        repo.touch(row["digest"])
+        return path
+
+    def fetch(self, url: str) -> str:
+        cached = self.get(url)
+        if cached:
+            return cached
+        request = urllib.request.Request(url, headers={"User-Agent": "desktop-capture/1.0"})
+        with urllib.request.urlopen(request, timeout=self._timeout) as response:
+            data = response.read()
+            content_type = (response.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if not data:
+            raise ValueError(f"empty audio response for {url}")
+        digest = hashlib.sha256(data).hexdigest()
+        ext = _EXTENSIONS.get(content_type) or os.path.splitext(urllib.parse.urlparse(url).path)[1] or ".mp3"
+        path = self._blob_path(digest, ext)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            partial = f"{path}.{threading.get_ident()}.partial"
+            with open(partial, "wb") as handle:
+                handle.write(data)
+            os.replace(partial, path)
+        self._repo().record(url, digest, ext, len(data))
+        self.evict()
+        return path
+
+    def fetch_async(self, url: str, callback: Optional[Callable[[str, Optional[str]], None]] = None) -> Future:
+        with self._lock:
+            future = self._inflight.get(url)
+            if future is None:
+                future = self._executor().submit(self._fetch_quietly, url)
+                self._inflight[url] = future
+        if callback:
+            future.add_done_callback(lambda done: callback(url, done.result()))
+        return future
+
+    def prefetch(self, entries: Iterable[Dict[str, Any]]) -> List[Future]:
+        futures = []
+        for entry in entries:
+            for url in self.urls_for(entry).values():
+                futures.append(self.fetch_async(url))
+        return futures
+
+    def prefetch_due(self, entry_repo, horizon_hours: float = 24.0, limit: int = 200) -> List[Future]:
+        until = int(time.time() + horizon_hours * 3600)
+        return self.prefetch(entry_repo.list_due_entries(until, limit))
+
+    def evict(self) -> List[str]:
+        repo = self._repo()
+        if self._max_bytes <= 0:
+            return []
+        removed: List[str] = []
+        with self._lock:
+            excess = repo.total_size() - self._max_bytes
+            while excess > 0:
+                batch = repo.least_recent(64)
+                if not batch:
+                    break
+                victims = []
+                for row in batch:
+                    if excess <= 0:
+                        break
+                    try:
+                        os.remove(self._blob_path(row["digest"], row["ext"]))
+                    except FileNotFoundError:
+                        pass
+                    victims.append(row["digest"])
+                    excess -= int(row["size"])
+                repo.remove(victims)
+                removed.extend(victims)
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        repo = self._repo()
+        return {"blobs": repo.count(), "bytes": repo.total_size(), "max_bytes": self._max_bytes}
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _fetch_quietly(self, url: str) -> Optional[str]:
+        try:
+            return self.fetch(url)
+        except Exception:
+            return None
+        finally:
+            with self._lock:
+                self._inflight.pop(url, None)
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="audio")
+        return self._pool
+
+    def _repo(self) -> AudioRepo:
+        return self._repos.get()
+
+    def _blob_path(self, digest: str, ext: str) -> str:
+        return os.path.join(self._cache_dir, digest[:2], digest + ext)
@@ -0,0 +1,176 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class BackupService:
+    def __init__(
+        self,
+        db_path: str,
+        backup_dir: Optional[str] = None,
+        keep: int = 10,
+        pages_per_step: int = 128,
+        step_pause: float = 0.002,
+    ) -> None:
+        self._db_path = db_path
+        self._backup_dir = backup_dir or os.path.join(os.path.dirname(os.path.abspath(db_path)), "backups")
+        self._keep = keep
+        self._pages_per_step = pages_per_step
+        self._step_pause = step_pause
+        self._stem = os.path.splitext(os.path.basename(db_path))[0]
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def backup_dir(self) -> str:
+        return self._backup_dir
+
+    def list_snapshots(self) -> List[str]:
+        if not os.path.isdir(self._backup_dir):
+            return []
+        names = [
+            name
+            for name in os.listdir(self._backup_dir)
+            if name.startswith(self._stem + "-") and name.endswith(".sqlite")
+        ]
+        return [os.path.join(self._backup_dir, name) for name in sorted(names)]
+
+    def backup(self, progress: Optional[Callable[[int, int], None]] = None, protect: str = "") -> Dict[str, Any]:
+        with self._lock:
+            os.makedirs(self._backup_dir, exist_ok=True)
+            target = self._next_path()
+            partial = target + ".partial"
+            started = time.perf_counter()
+            steps = 0
+
+            def _step(status: int, remaining: int, total: int) -> None:
+                nonlocal steps
+                steps += 1
+                if self._stop.is_set() and self._thread is threading.current_thread():
+                    raise InterruptedError("backup cancelled")
+                if progress:
+                    progress(total - remaining, total)
+                # The source is only read-locked inside a step; pausing here lets writers in.
+                if remaining and self._step_pause:
+                    time.sleep(self._step_pause)
+
+            source = sqlite3.connect(self._db_path)
+            dest = sqlite3.connect(partial)
+            try:
+                if source.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+                    # Pin one WAL snapshot so commits from other connections do not restart the copy.
+                    source.execute("BEGIN")
+                    source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+                source.backup(dest, pages=self._pages_per_step, progress=_step)
+                problems = self._integrity_problems(dest, quick=True)
+            except BaseException:
+                dest.close()
+                os.remove(partial)
+                raise
+            finally:
+                dest.close()
+                source.close()
+            if problems:
+                os.remove(partial)
+                raise sqlite3.DatabaseError(f"snapshot failed integrity check: {problems[0]}")
+            os.replace(partial, target)
+            removed = self._rotate(protect)
+            return {
+                "path": target,
+                "bytes": os.path.getsize(target),
+                "steps": steps,
+                "elapsed": time.perf_counter() - started,
+                "removed": removed,
+            }
+
+    def verify(self, path: Optional[str] = None) -> List[str]:
+        conn = sqlite3.connect(f"file:{path or self._db_path}?mode=ro", uri=True)
+        try:
+            return self._integrity_problems(conn, quick=False)
+        finally:
+            conn.close()
+
+    def restore(self, snapshot: str, keep_current: bool = True) -> Dict[str, Any]:
+        problems = self.verify(snapshot)
+        if problems:
+            raise sqlite3.DatabaseError(f"{snapshot} failed integrity check: {problems[0]}")
+        saved = ""
+        if keep_current and os.path.exists(self._db_path):
+            # The snapshot being restored may be the oldest; rotation must not delete it first.
+            saved = self.backup(protect=os.path.abspath(snapshot))["path"]
+        source = sqlite3.connect(f"file:{snapshot}?mode=ro", uri=True)
+        dest = sqlite3.connect(self._db_path)
+        try:
+            source.backup(dest, pages=self._pages_per_step)
+        finally:
+            dest.close()
+            source.close()
+        return {"restored": snapshot, "previous": saved}
+
+    def start(self, interval: float) -> None:
+        if interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="backup", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self, interval: float) -> None:
+        # data_version on a long-lived connection moves only when another connection commits.
+        watcher = sqlite3.connect(self._db_path)
+        last_version: Optional[int] = None
+        delay = min(interval, 60.0)
+        try:
+            while not self._stop.wait(delay):
+                delay = interval
+                version = int(watcher.execute("PRAGMA data_version").fetchone()[0])
+                if version == last_version:
+                    continue
+                if last_version is None and os.path.getmtime(self._db_path) <= self._latest_snapshot_mtime():
+                    last_version = version
+                    continue
+                try:
+                    self.backup()
+                except (sqlite3.Error, OSError):
+                    # InterruptedError is an OSError: a cancelled run simply ends on the next wait.
+                    continue
+                last_version = version
+        finally:
+            watcher.close()
+
+    def _latest_snapshot_mtime(self) -> float:
+        snapshots = self.list_snapshots()
+        return os.path.getmtime(snapshots[-1]) if snapshots else 0.0
+
+    def _next_path(self) -> str:
+        now = time.time()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f"{int(now * 1000) % 1000:03d}"
+        path = os.path.join(self._backup_dir, f"{self._stem}-{stamp}.sqlite")
+        counter = 1
+        while os.path.exists(path):
+            path = os.path.join(self._backup_dir, f"{self._stem}-{stamp}-{counter}.sqlite")
+            counter += 1
+        return path
+
+    def _rotate(self, protect: str = "") -> List[str]:
+        snapshots = self.list_snapshots()
+        if self._keep <= 0 or len(snapshots) <= self._keep:
+            return []
+        candidates = [path for path in snapshots if os.path.abspath(path) != protect]
+        stale = candidates[: len(snapshots) - self._keep]
+        for path in stale:
+            os.remove(path)
+        return stale
+
+    def _integrity_problems(self, conn: sqlite3.Connection, quick: bool) -> List[str]:
+        pragma = "quick_check" if quick else "integrity_check"
+        rows = [row[0] for row in conn.execute(f"PRAGMA {pragma}").fetchall()]
+        return [] if rows == ["ok"] else rows
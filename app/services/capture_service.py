@@ -0,0 +1,153 @@
+import json
+from typing import Any, Dict, List, Optional
+
+from app.data.entry_repo import EntryRepo
+from app.services.llm_service import LlmService
+from app.utils.auto_tags import build_auto_tags
+from app.utils.text_detect import classify_text
+from app.utils.tracing import Tracer
+
+
+def to_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=True)
+    return str(value)
+
+
+def parse_tags(value: str) -> List[str]:
+    try:
+        tags = json.loads(value) if value else []
+    except ValueError:
+        return [item.strip() for item in value.split(",") if item.strip()]
+    return [str(item) for item in tags] if isinstance(tags, list) else []
+
+
+class CaptureService:
+    def __init__(
+        self,
+        entry_repo: EntryRepo,
+        llm_service: LlmService,
+        tracer: Optional[Tracer] = None,
+    ) -> None:
+        self._entry_repo = entry_repo
+        self._llm_service = llm_service
+        self._tracer = tracer or Tracer(enabled=False)
+
+    def classify(self, text: str, trace_id: str = "") -> str:
+        with self._tracer.span(trace_id, "detect"):
+            return classify_text(text)
+
+    def enrich(self, text: str, entry_type: str, trace_id: str = "") -> Dict[str, Any]:
+        with self._tracer.span(trace_id, "llm") as span:
+            result = self._llm_service.enrich(text, entry_type)
+            span.update(result.get("usage") or {})
+            span["template"] = result.get("template", "")
+        return result
+
+    def find_elsewhere(self, text: str) -> Optional[Dict[str, Any]]:
+        # Captures go to the primary file; a text another attached library already
+        # holds is not copied into it.
+        return self._entry_repo.texts_in_other_libraries([text]).get(text)
+
+    def find_existing(self, text: str) -> Optional[Dict[str, Any]]:
+        # Looked up before enrichment so a known text never costs an LLM call.
+        entry_id = self._entry_repo.find_id_by_text(text)
+        if entry_id:
+            return {"id": entry_id, "library": "main"}
+        return self.find_elsewhere(text)
+
+    def store(self, text: str, entry_type: str, enrich: Dict[str, Any], trace_id: str = "") -> tuple[int, bool]:
+        elsewhere = self.find_elsewhere(text)
+        if elsewhere:
+            return elsewhere["id"], False
+        auto_tags = []
+        if entry_type == "word":
+            with self._tracer.span(trace_id, "auto_tags"):
+                existing_words = self._entry_repo.list_word_entries()
+                auto_tags = build_auto_tags(
+                    text,
+                    to_text(enrich.get("translation", "")),
+                    existing_words,
+                )
+        payload = self.build_payload(text, entry_type, enrich, auto_tags)
+        with self._tracer.span(trace_id, "add_entry"):
+            return self._entry_repo.add_entry(payload)
+
+    def store_pending(self, text: str, entry_type: str, trace_id: str = "") -> tuple[int, bool]:
+        elsewhere = self.find_elsewhere(text)
+        if elsewhere:
+            return elsewhere["id"], False
+        payload = self.build_payload(text, entry_type, {}, [])
+        with self._tracer.span(trace_id, "add_entry"):
+            return self._entry_repo.add_entry(payload)
+
+    def refresh(self, entry_id: int, text: str, entry_type: str, enrich: Dict[str, Any], trace_id: str = "") -> None:
+        payload = self.build_payload(text, entry_type, enrich, [])
+        with self._tracer.span(trace_id, "add_entry"):
+            self._entry_repo.update_enrichment(entry_id, payload)
+
+    def finish(self, entry_id: int, text: str, entry_type: str, enrich: Dict[str, Any], trace_id: str = "") -> None:
+        auto_tags = []
+        if entry_type == "word" and not str(enrich.get("raw_llm", "")).startswith("error:"):
+            # The pending row is already stored; leave it out so it cannot tag itself.
+            with self._tracer.span(trace_id, "auto_tags"):
+                existing_words = [item for item in self._entry_repo.list_word_entries() if item["id"] != entry_id]
+                auto_tags = build_auto_tags(text, to_text(enrich.get("translation", "")), existing_words)
+        self.refresh(entry_id, text, entry_type, enrich, trace_id)
+        if auto_tags:
+            # Tags set by hand while the entry was pending are kept; auto tags are appended.
+            tags = parse_tags((self._entry_repo.get_entry(entry_id) or {}).get("tags", ""))
+            merged = tags + [tag for tag in auto_tags if tag not in tags]
+            if merged != tags:
+                self._entry_repo.update_tags(entry_id, json.dumps(merged, ensure_ascii=True))
+
+    def capture(self, text: str, trace_id: str = "") -> Dict[str, Any]:
+        entry_type = self.classify(text, trace_id)
+        if not entry_type:
+            return {"status": "skipped", "entry_id": 0, "entry_type": ""}
+        existing = self.find_existing(text)
+        if existing:
+            return {"status": "duplicate", "entry_id": existing["id"], "entry_type": entry_type, "library": existing["library"]}
+        enrich = self.enrich(text, entry_type, trace_id)
+        entry_id, created = self.store(text, entry_type, enrich, trace_id)
+        return {
+            "status": "created" if created else "duplicate",
+            "entry_id": entry_id,
+            "entry_type": entry_type,
+        }
+
+    def capture_pending(self, texts: List[str], entry_type: str = "word") -> int:
+        # Stored without enrichment; `python -m app.cli enrich` fills them in later.
+        texts = [text for text in dict.fromkeys(texts) if text]
+        elsewhere = self._entry_repo.texts_in_other_libraries(texts)
+        payloads = [self.build_payload(text, entry_type, {}, []) for text in texts if text not in elsewhere]
+        return self._entry_repo.add_entries(payloads) if payloads else 0
+
+    def build_payload(
+        self,
+        text: str,
+        entry_type: str,
+        enrich: Dict[str, Any],
+        auto_tags: list,
+    ) -> Dict[str, Any]:
+        return {
+            "entry_type": entry_type,
+            "text": text,
+            "translation": to_text(enrich.get("translation", "")),
+            "phonetic_us": to_text(enrich.get("phonetic_us", "")),
+            "phonetic_uk": to_text(enrich.get("phonetic_uk", "")),
+            "definition": to_text(enrich.get("definition", "")),
+            "part_of_speech": to_text(enrich.get("part_of_speech", "")),
+            "ipa": to_text(enrich.get("ipa", "")),
+            "word_roots": json.dumps(enrich.get("word_roots", []), ensure_ascii=True),
+            "tense_form": json.dumps(enrich.get("tense_form", []), ensure_ascii=True),
+            "common_meanings": json.dumps(enrich.get("common_meanings", []), ensure_ascii=True),
+            "related_entry_ids": json.dumps(enrich.get("related_terms", []), ensure_ascii=True),
+            "tags": json.dumps(auto_tags, ensure_ascii=True),
+            "grammar_notes": to_text(enrich.get("grammar_notes", "")),
+            "structure_breakdown": json.dumps(enrich.get("structure_breakdown", []), ensure_ascii=True),
+            "key_terms": json.dumps(enrich.get("key_terms", []), ensure_ascii=True),
+            "raw_llm": to_text(enrich.get("raw_llm", "")),
+        }
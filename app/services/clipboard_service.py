@@ -1,18 +1,62 @@
+import os
+from typing import Optional
+
 from PySide6 import QtCore, QtGui
 
 
 class ClipboardService(QtCore.QObject):
     text_copied = QtCore.Signal(str)
+    text_skipped = QtCore.Signal(str)
 
-    def __init__(self, clipboard: QtGui.QClipboard) -> None:
+    def __init__(
+        self,
+        clipboard: QtGui.QClipboard,
+        debounce_ms: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
         super().__init__()
         self._clipboard = clipboard
+        if debounce_ms is None:
+            debounce_ms = int(os.environ.get("CLIPBOARD_DEBOUNCE_MS", "150"))
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("CLIPBOARD_MAX_BYTES", str(64 * 1024)))
+        self._max_bytes = max_bytes
+        self._last_hash: Optional[int] = None
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._ingest)
         self._clipboard.dataChanged.connect(self._on_change)
 
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
     def get_text(self) -> str:
         return self._clipboard.text().strip()
 
+    def within_cap(self, text: str) -> bool:
+        if self._max_bytes <= 0:
+            return True
+        # A str never has more characters than UTF-8 bytes, so oversize text is rejected without encoding it.
+        if len(text) > self._max_bytes:
+            return False
+        return len(text.encode("utf-8")) <= self._max_bytes
+
     def _on_change(self) -> None:
-        text = self.get_text()
-        if text:
-            self.text_copied.emit(text)
+        self._timer.start()
+
+    def _ingest(self) -> None:
+        text = self._clipboard.text()
+        if not self.within_cap(text):
+            self._last_hash = None
+            self.text_skipped.emit(f"Clipboard content too large ({len(text) // 1024} KB), ignored.")
+            return
+        text = text.strip()
+        if not text:
+            return
+        digest = hash(text)
+        if digest == self._last_hash:
+            return
+        self._last_hash = digest
+        self.text_copied.emit(text)
@@ -0,0 +1,192 @@
+import os
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.data.db import Database, ThreadLocalDatabase
+from app.data.entry_repo import EntryRepo
+from app.data.job_repo import PRIORITY_INTERACTIVE, JobRepo
+from app.services.capture_service import CaptureService
+from app.utils.tracing import Tracer
+
+
+class EnrichmentQueue:
+    def __init__(
+        self,
+        db_path: str,
+        llm_service,
+        tracer: Optional[Tracer] = None,
+        workers: Optional[int] = None,
+        lease_seconds: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        retry_base: Optional[float] = None,
+        poll_interval: float = 5.0,
+    ) -> None:
+        self._llm_service = llm_service
+        self._tracer = tracer or Tracer(enabled=False)
+        self._workers = workers or int(os.environ.get("ENRICH_WORKERS", "2"))
+        self._lease_seconds = lease_seconds or float(os.environ.get("ENRICH_LEASE_SEC", "300"))
+        self._max_attempts = max_attempts or int(os.environ.get("ENRICH_MAX_ATTEMPTS", "5"))
+        self._retry_base = retry_base if retry_base is not None else float(os.environ.get("ENRICH_RETRY_BASE_SEC", "30"))
+        self._poll_interval = poll_interval
+        self._owner = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self._repos = ThreadLocalDatabase(db_path, self._build_repos)
+        self._wake = threading.Condition()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._listeners: List[Callable[[int, str], None]] = []
+        self._next_reclaim = 0.0
+
+    @property
+    def owner(self) -> str:
+        return self._owner
+
+    @property
+    def tracer(self) -> Tracer:
+        return self._tracer
+
+    def add_listener(self, callback: Callable[[int, str], None]) -> None:
+        self._listeners.append(callback)
+
+    def submit(self, entry_id: int, priority: int = PRIORITY_INTERACTIVE) -> int:
+        job_id = self._jobs().enqueue(entry_id, priority)
+        with self._wake:
+            self._wake.notify()
+        return job_id
+
+    def backfill(self, limit: int = 0) -> int:
+        added = self._jobs().enqueue_backfill(limit)
+        if added:
+            with self._wake:
+                self._wake.notify_all()
+        return added
+
+    def counts(self) -> Dict[str, int]:
+        return self._jobs().counts()
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stopping.clear()
+        self._jobs().reclaim_expired()
+        for i in range(self._workers):
+            thread = threading.Thread(target=self._loop, args=(False,), name=f"enrich-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stopping.set()
+        with self._wake:
+            self._wake.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        # Anything still in flight is handed back now instead of waiting for its lease.
+        self._jobs().release_owner(self._owner)
+
+    def drain(self) -> Dict[str, int]:
+        self._jobs().reclaim_expired()
+        threads = [
+            threading.Thread(target=self._loop, args=(True,), name=f"enrich-drain-{i}", daemon=True)
+            for i in range(self._workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.counts()
+
+    def _loop(self, until_idle: bool) -> None:
+        try:
+            self._work(until_idle)
+        finally:
+            self._repos.close()
+
+    def _work(self, until_idle: bool) -> None:
+        jobs = self._jobs()
+        while not self._stopping.is_set():
+            try:
+                self._reclaim_due(jobs)
+                job = jobs.claim(self._owner, self._lease_seconds)
+            except Exception:
+                # A locked or busy database is retried on the next poll rather than ending the worker.
+                job = None
+            if job is None:
+                if until_idle:
+                    return
+                with self._wake:
+                    self._wake.wait(self._poll_interval)
+                continue
+            status = self._run(job)
+            for callback in self._listeners:
+                try:
+                    callback(job["entry_id"], status)
+                except Exception:
+                    pass
+
+    def _reclaim_due(self, jobs: JobRepo) -> None:
+        # Leases of workers in other processes that died while this one keeps running
+        # expire too; check for them about twice per lease period.
+        now = time.monotonic()
+        if now < self._next_reclaim:
+            return
+        self._next_reclaim = now + self._lease_seconds / 2
+        if jobs.reclaim_expired():
+            with self._wake:
+                self._wake.notify_all()
+
+    def _run(self, job: Dict[str, Any]) -> str:
+        try:
+            return self._process(job)
+        except Exception as exc:
+            try:
+                return self._retry(job, f"error: {exc}")
+            except Exception:
+                # The lease runs out and the job is reclaimed.
+                return "retry"
+
+    def _retry(self, job: Dict[str, Any], error: str) -> str:
+        delay = self._retry_base * (2 ** (job["attempts"] - 1))
+        state = self._jobs().fail(job["id"], self._owner, error, delay, self._max_attempts)
+        return "failed" if state == "failed" else "retry"
+
+    def _process(self, job: Dict[str, Any]) -> str:
+        jobs = self._jobs()
+        entry_repo, capture_service = self._capture()
+        entry = entry_repo.get_entry(job["entry_id"])
+        if entry is None:
+            jobs.complete(job["id"], self._owner)
+            return "missing"
+        trace_id = self._tracer.new_trace()
+        enrich: Optional[Dict[str, Any]] = None
+        try:
+            enrich = capture_service.enrich(entry["text"], entry["entry_type"], trace_id)
+            error = str(enrich.get("raw_llm", ""))
+            if not error.startswith("error:"):
+                error = ""
+        except Exception as exc:
+            error = f"error: {exc}"
+        if not error:
+            capture_service.finish(entry["id"], entry["text"], entry["entry_type"], enrich, trace_id)
+            jobs.complete(job["id"], self._owner)
+            return "done"
+        status = self._retry(job, error)
+        if status == "failed":
+            # Out of attempts: keep the error on the entry so it stays visible and retryable.
+            capture_service.refresh(entry["id"], entry["text"], entry["entry_type"], enrich or {"raw_llm": error}, trace_id)
+        return status
+
+    def _jobs(self) -> JobRepo:
+        return self._local_repos()[0]
+
+    def _capture(self):
+        _, entry_repo, capture_service = self._local_repos()
+        return entry_repo, capture_service
+
+    def _local_repos(self):
+        return self._repos.get()
+
+    def _build_repos(self, db: Database):
+        entry_repo = EntryRepo(db)
+        return JobRepo(db), entry_repo, CaptureService(entry_repo, self._llm_service, self._tracer)
@@ -1,29 +1,221 @@
 import html
-from typing import Dict, Any, Optional
+import importlib.util
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable, Iterator, List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.data.entry_repo import EntryRepo
+    from app.data.grammar_repo import GrammarRepo
+
+
+_MODELS = ("en_core_web_sm", "en_core_web_trf")
+_SENTENCE_BREAK_RE = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"'\u201d\u2019)\]]))\s+|\n\s*\n")
 
 
 class GrammarService:
-    def __init__(self) -> None:
-        self._nlp = self._load_spacy()
+    def __init__(self, sentence_cache_size: int = 4096) -> None:
+        self._nlp_model = None
+        self._loaded = False
+        self._installed: Optional[bool] = None
+        self._load_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._sentence_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._sentence_cache_size = sentence_cache_size
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def available(self) -> bool:
+        if self._loaded:
+            return self._nlp_model is not None
+        # Until the warm-up has loaded spaCy, answer from the installed packages rather
+        # than importing it (seconds) on the caller's thread.
+        if self._installed is None:
+            self._installed = importlib.util.find_spec("spacy") is not None and any(
+                importlib.util.find_spec(model) is not None for model in _MODELS
+            )
+        return self._installed
+
+    @property
+    def _nlp(self) -> Optional["spacy.language.Language"]:
+        if not self._loaded:
+            with self._load_lock:
+                if not self._loaded:
+                    self._nlp_model = self._load_spacy()
+                    self._loaded = True
+        return self._nlp_model
+
+    def load(self) -> bool:
+        return self._nlp is not None
 
     def analyze(self, sentence: str) -> Dict[str, Any]:
         if not self._nlp:
-            return {
-                "structure_tags": {
-                    "subject": "",
-                    "verb": "",
-                    "object": "",
-                    "clause_type": "unknown",
-                },
-                "hints": [
-                    "Parser unavailable. Install spaCy and en_core_web_sm.",
-                    "Identify the main subject and verb first.",
-                ],
-                "rule_ids": ["parser-missing-01"],
-                "summary": "Parser not available.",
+            return self._parser_missing()
+        with self._lock:
+            doc = self._nlp(sentence)
+        return self._analyze_doc(doc)
+
+    def split_sentences(self, text: str) -> List[Tuple[str, str]]:
+        pieces: List[Tuple[str, str]] = []
+        start = 0
+        for match in _SENTENCE_BREAK_RE.finditer(text):
+            self._append_piece(pieces, text[start:match.start()], match.group())
+            start = match.end()
+        self._append_piece(pieces, text[start:], "")
+        return pieces
+
+    def analyze_sentence(self, sentence: str) -> Dict[str, Any]:
+        cached = self._cache_get(sentence)
+        if cached is not None:
+            return cached
+        analysis = self.analyze(sentence)
+        if self._nlp:
+            self._cache_put(sentence, analysis)
+        return analysis
+
+    def iter_sentence_analyses(self, text: str) -> Iterator[Dict[str, Any]]:
+        for index, (sentence, separator) in enumerate(self.split_sentences(text)):
+            analysis = self.analyze_sentence(sentence)
+            yield {
+                "index": index,
+                "text": sentence,
+                "separator": separator,
+                "analysis": analysis,
+                "html": self.sentence_html(analysis, sentence, separator),
             }
 
-        doc = self._nlp(sentence)
+    def analyze_text(self, text: str) -> Dict[str, Any]:
+        return self.combine_sentences(list(self.iter_sentence_analyses(text)))
+
+    def combine_sentences(self, sentences: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "sentences": [
+                {"text": item["text"], "separator": item["separator"], **item["analysis"]}
+                for item in sentences
+            ],
+            "highlighted_html": "".join(item["html"] for item in sentences),
+        }
+
+    def sentence_html(self, analysis: Dict[str, Any], sentence: str, separator: str) -> str:
+        body = analysis.get("highlighted_html") or html.escape(sentence)
+        breaks = separator.count("\n")
+        if breaks:
+            return body + "<br>" * min(breaks, 2)
+        return body + (" " if separator else "")
+
+    def backfill(
+        self,
+        entry_repo: "EntryRepo",
+        grammar_repo: "GrammarRepo",
+        batch_size: int = 64,
+        n_process: int = 1,
+        chunk_size: int = 200,
+        limit: int = 0,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        started = time.perf_counter()
+        stats = {"done": 0, "elapsed": 0.0, "docs_per_sec": 0.0, "available": self.available}
+        if not self._nlp:
+            return stats
+
+        def _sentences():
+            for count, (text, entry_id) in enumerate(entry_repo.iter_grammar_pending(), start=1):
+                pieces = self.split_sentences(text)
+                if not pieces:
+                    # Whitespace-only entries ride through the pipe as a placeholder so
+                    # they are saved in read order, in the same batch as their neighbours.
+                    yield "", (entry_id, text, 0, 0, "")
+                for index, (sentence, separator) in enumerate(pieces):
+                    yield sentence, (entry_id, text, index, len(pieces), separator)
+                if limit and count >= limit:
+                    return
+
+        pending = []
+        collected: List[Dict[str, Any]] = []
+        docs = self._nlp.pipe(
+            _sentences(),
+            as_tuples=True,
+            batch_size=batch_size,
+            n_process=n_process,
+        )
+        for doc, (entry_id, text, index, total, separator) in docs:
+            if not total:
+                pending.append((entry_id, text, self.combine_sentences([])))
+                continue
+            analysis = self._analyze_doc(doc)
+            collected.append(
+                {
+                    "text": doc.text,
+                    "separator": separator,
+                    "analysis": analysis,
+                    "html": self.sentence_html(analysis, doc.text, separator),
+                }
+            )
+            if index + 1 < total:
+                continue
+            pending.append((entry_id, text, self.combine_sentences(collected)))
+            collected = []
+            if len(pending) >= chunk_size:
+                stats["done"] += grammar_repo.save_analyses(pending)
+                pending = []
+                self._update_rate(stats, started)
+                if progress:
+                    progress(stats)
+        if pending:
+            stats["done"] += grammar_repo.save_analyses(pending)
+        self._update_rate(stats, started)
+        if progress:
+            progress(stats)
+        return stats
+
+    def _append_piece(self, pieces: List[Tuple[str, str]], sentence: str, separator: str) -> None:
+        if sentence.strip():
+            pieces.append((sentence.strip(), separator))
+        elif pieces and separator:
+            last, last_separator = pieces[-1]
+            pieces[-1] = (last, last_separator + separator)
+
+    def _cache_get(self, sentence: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            cached = self._sentence_cache.get(sentence)
+            if cached is not None:
+                self._sentence_cache.move_to_end(sentence)
+            return cached
+
+    def _cache_put(self, sentence: str, analysis: Dict[str, Any]) -> None:
+        with self._lock:
+            self._sentence_cache[sentence] = analysis
+            self._sentence_cache.move_to_end(sentence)
+            while len(self._sentence_cache) > self._sentence_cache_size:
+                self._sentence_cache.popitem(last=False)
+
+    def _update_rate(self, stats: Dict[str, Any], started: float) -> None:
+        elapsed = time.perf_counter() - started
+        stats["elapsed"] = elapsed
+        stats["docs_per_sec"] = stats["done"] / elapsed if elapsed > 0 else 0.0
+
+    def _parser_missing(self) -> Dict[str, Any]:
+        return {
+            "structure_tags": {
+                "subject": "",
+                "verb": "",
+                "object": "",
+                "clause_type": "unknown",
+            },
+            "hints": [
+                "Parser unavailable. Install spaCy and en_core_web_sm.",
+                "Identify the main subject and verb first.",
+            ],
+            "rule_ids": ["parser-missing-01"],
+            "summary": "Parser not available.",
+        }
+
+    def _analyze_doc(self, doc) -> Dict[str, Any]:
         root = self._find_root(doc)
         subject = self._find_dep(doc, {"nsubj", "nsubjpass"})
         obj = self._find_dep(doc, {"dobj", "obj", "pobj"})
@@ -41,6 +233,7 @@ class GrammarService:
             "hints": hints,
             "rule_ids": [f"clause-{clause_type}"],
             "summary": f"S:{subject.text if subject else '-'} V:{root.text if root else '-'} O:{obj.text if obj else '-'}",
+            "clause_spans": self._clause_spans(doc),
             "highlighted_html": self._highlight_html(doc, subject, root, obj, clause_tokens),
         }
 
@@ -49,7 +242,7 @@ class GrammarService:
             import spacy
         except Exception:
             return None
-        for model in ("en_core_web_sm", "en_core_web_trf"):
+        for model in _MODELS:
             try:
                 return spacy.load(model)
             except Exception:
@@ -85,6 +278,17 @@ class GrammarService:
             tokens.update(list(head.subtree))
         return tokens
 
+    def _clause_spans(self, doc) -> list:
+        spans = []
+        for head in doc:
+            if head.dep_ not in {"relcl", "advcl", "ccomp", "xcomp"}:
+                continue
+            subtree = list(head.subtree)
+            start = subtree[0].idx
+            end = subtree[-1].idx + len(subtree[-1].text)
+            spans.append({"dep": head.dep_, "start": start, "end": end, "text": doc.text[start:end]})
+        return spans
+
     def _highlight_html(self, doc, subject, root, obj, clause_tokens: set) -> str:
         subject_id = subject.i if subject else -1
         root_id = root.i if root else -1
@@ -0,0 +1,47 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+
+class LlmFixtureStore:
+    def __init__(self, directory: str, mode: str) -> None:
+        self._directory = directory
+        self._mode = mode
+
+    @property
+    def recording(self) -> bool:
+        return self._mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self._mode == "replay"
+
+    def key(self, payload: Dict[str, Any]) -> str:
+        stable = {k: v for k, v in payload.items() if k not in {"reasoning_effort"}}
+        encoded = json.dumps(stable, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def load(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        path = self._path(payload)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)
+
+    def save(self, payload: Dict[str, Any], content: str, usage: Dict[str, int], elapsed: float) -> None:
+        os.makedirs(self._directory, exist_ok=True)
+        path = self._path(payload)
+        record = {
+            "request": payload,
+            "content": content,
+            "usage": usage,
+            "elapsed": elapsed,
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(record, handle, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def _path(self, payload: Dict[str, Any]) -> str:
+        return os.path.join(self._directory, f"{self.key(payload)}.json")
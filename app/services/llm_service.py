@@ -1,88 +1,190 @@
+import importlib.util
 import json
 import os
-from typing import Dict, Any, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from app.services.llm_fixtures import LlmFixtureStore
+from app.services.prompt_templates import template_for
+from app.utils.chunking import estimate_tokens, split_chunks
 
 
 class LlmService:
-    def __init__(self) -> None:
-        self._base_url = os.environ.get("LLM_BASE_URL", "https://ark.cn-beijing.volces.com/api/v3")
-        self._api_key = os.environ.get("ARK_API_KEY", "") or os.environ.get("LLM_API_KEY", "")
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        fixture_mode: Optional[str] = None,
+    ) -> None:
+        self._base_url = base_url or os.environ.get("LLM_BASE_URL", "https://ark.cn-beijing.volces.com/api/v3")
+        if api_key is None:
+            api_key = os.environ.get("ARK_API_KEY", "") or os.environ.get("LLM_API_KEY", "")
+        self._api_key = api_key
         self._model = os.environ.get("LLM_MODEL", "doubao-seed-1-6-lite-251015")
         self._timeout = float(os.environ.get("LLM_TIMEOUT", "60"))
+        self._max_retries = int(os.environ.get("LLM_MAX_RETRIES", "2"))
         self._reasoning_effort = os.environ.get("LLM_REASONING_EFFORT", "")
-        self._client = self._init_client()
+        self._chunk_tokens = int(os.environ.get("LLM_CHUNK_TOKENS", "600"))
+        self._chunk_concurrency = int(os.environ.get("LLM_CHUNK_CONCURRENCY", "4"))
+        self._prompt_version = int(os.environ.get("LLM_PROMPT_VERSION", "2"))
+        self._fixtures = self._init_fixtures(fixture_mode)
+        self._client_instance: Optional["OpenAI"] = None
+        self._client_ready = False
+        self._client_lock = threading.Lock()
+
+    @property
+    def configured(self) -> bool:
+        if self._fixtures is not None and self._fixtures.replaying:
+            return True
+        return bool(self._api_key) and importlib.util.find_spec("openai") is not None
+
+    @property
+    def _client(self) -> Optional["OpenAI"]:
+        if not self._client_ready:
+            with self._client_lock:
+                if not self._client_ready:
+                    self._client_instance = self._init_client()
+                    self._client_ready = True
+        return self._client_instance
+
+    def warm_up(self) -> bool:
+        return self._client is not None
 
     def _init_client(self) -> Optional["OpenAI"]:
+        if not self._api_key:
+            return None
         try:
             from openai import OpenAI
         except Exception:
             return None
-        return OpenAI(base_url=self._base_url, api_key=self._api_key, timeout=self._timeout)
+        return OpenAI(
+            base_url=self._base_url,
+            api_key=self._api_key,
+            timeout=self._timeout,
+            max_retries=self._max_retries,
+        )
+
+    def _init_fixtures(self, mode: Optional[str]) -> Optional[LlmFixtureStore]:
+        mode = (mode if mode is not None else os.environ.get("LLM_FIXTURE_MODE", "")).lower()
+        if mode not in {"record", "replay"}:
+            return None
+        return LlmFixtureStore(os.environ.get("LLM_FIXTURE_DIR", "llm_fixtures"), mode)
 
     def enrich(self, text: str, entry_type: str) -> Dict[str, Any]:
-        if not self._api_key:
+        replaying = self._fixtures is not None and self._fixtures.replaying
+        if not self._api_key and not replaying:
             fallback = self._apply_defaults({}, entry_type)
             fallback["raw_llm"] = ""
             return fallback
-
-        if entry_type == "word":
-            schema = (
-                "translation, part_of_speech, ipa, phonetic_us, phonetic_uk, "
-                "word_roots (array), tense_form (array), common_meanings (array), "
-                "related_terms (array), definition"
-            )
-        else:
-            schema = (
-                "translation, structure_breakdown (array of {span, role}), "
-                "grammar_notes, key_terms (array of {term, definition})"
-            )
-        prompt = (
-            "You are a bilingual dictionary assistant. "
-            "Return valid JSON only. "
-            "The 'translation' field must include part-of-speech grouped Chinese meanings. "
-            "Format must be multi-line: "
-            "v. ...\\n"
-            "n. ...\\n"
-            "adj. ... "
-            "Include only the POS that apply. "
-            "The 'ipa' field must be formatted as: "
-            "'UK: /.../; US: /.../' if IPA is available. "
-            "The 'tense_form' field must be an array of Chinese-labeled forms, e.g. "
-            "['复数: ...', '第三人称单数: ...', '现在分词: ...', '过去式: ...', '过去分词: ...']. "
-            f"Return JSON with keys: {schema}. "
-            f"Entry type: {entry_type}. Text: {text}"
-        )
-        if not self._client:
+        if not self._client and not replaying:
             fallback = self._apply_defaults({}, entry_type)
             fallback["raw_llm"] = "error: openai sdk not installed"
             return fallback
 
-        return self._enrich_via_sdk(prompt, entry_type)
+        if entry_type == "article" and self._chunk_tokens > 0 and estimate_tokens(text) > self._chunk_tokens:
+            chunks = split_chunks(text, self._chunk_tokens)
+            if len(chunks) > 1:
+                return self._enrich_chunks(chunks)
+        return self._enrich_via_sdk(text, entry_type)
+
+    def _enrich_chunks(self, chunks: List[str]) -> Dict[str, Any]:
+        workers = max(1, min(self._chunk_concurrency, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda chunk: self._enrich_via_sdk(chunk, "article"), chunks))
+        return self._merge_chunks(results)
+
+    def _merge_chunks(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        merged = self._apply_defaults({}, "article")
+        translations, notes, breakdown, key_terms = [], [], [], []
+        seen_spans, seen_terms = set(), set()
+        usage = {"prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+        raws, errors = [], []
+        for result in results:
+            raw = str(result.get("raw_llm", ""))
+            if raw.startswith("error:"):
+                errors.append(raw)
+                continue
+            raws.append(raw)
+            for key in usage:
+                usage[key] += int((result.get("usage") or {}).get(key, 0) or 0)
+            if result.get("translation"):
+                translations.append(str(result["translation"]).strip())
+            note = str(result.get("grammar_notes") or "").strip()
+            if note and note not in notes:
+                notes.append(note)
+            for item in result.get("structure_breakdown") or []:
+                key = json.dumps(item, ensure_ascii=False, sort_keys=True) if isinstance(item, dict) else str(item)
+                if key not in seen_spans:
+                    seen_spans.add(key)
+                    breakdown.append(item)
+            for item in result.get("key_terms") or []:
+                term = item.get("term", "") if isinstance(item, dict) else item
+                key = str(term).strip().lower()
+                if key and key not in seen_terms:
+                    seen_terms.add(key)
+                    key_terms.append(item)
+        merged.update(
+            {
+                "translation": "\n".join(translations),
+                "structure_breakdown": breakdown,
+                "grammar_notes": "\n".join(notes),
+                "key_terms": key_terms,
+            }
+        )
+        # Any failed chunk marks the entry for a later re-enrichment pass.
+        if errors:
+            merged["raw_llm"] = f"error: {len(errors)}/{len(results)} chunks failed: {errors[0][len('error: '):]}"
+        else:
+            merged["raw_llm"] = json.dumps(raws, ensure_ascii=False)
+        merged["usage"] = usage
+        merged["template"] = template_for("article", self._prompt_version).id
+        return merged
 
-    def _enrich_via_sdk(self, prompt: str, entry_type: str) -> Dict[str, Any]:
+    def _enrich_via_sdk(self, text: str, entry_type: str) -> Dict[str, Any]:
+        template = template_for(entry_type, self._prompt_version)
         try:
             payload = {
                 "model": self._model,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [{"type": "text", "text": prompt}],
-                    }
-                ],
+                "messages": template.messages(text, entry_type),
                 "temperature": 0.2,
             }
             if self._reasoning_effort:
                 payload["reasoning_effort"] = self._reasoning_effort
-            completion = self._client.chat.completions.create(**payload)
-            content = completion.choices[0].message.content or ""
+            content, usage = self._complete(payload)
             parsed = json.loads(content)
             parsed = self._apply_defaults(parsed, entry_type)
             parsed["raw_llm"] = content
-            return parsed
+            parsed["usage"] = usage
         except Exception as exc:
-            fallback = self._apply_defaults({}, entry_type)
-            fallback["raw_llm"] = f"error: {exc}"
-            return fallback
+            parsed = self._apply_defaults({}, entry_type)
+            parsed["raw_llm"] = f"error: {exc}"
+        parsed["template"] = template.id
+        return parsed
+
+    def _complete(self, payload: Dict[str, Any]) -> tuple[str, Dict[str, int]]:
+        if self._fixtures and self._fixtures.replaying:
+            record = self._fixtures.load(payload)
+            if record is None:
+                raise LookupError(f"no fixture for request {self._fixtures.key(payload)[:12]}")
+            return record["content"], record.get("usage", {})
+        started = time.perf_counter()
+        completion = self._client.chat.completions.create(**payload)
+        content = completion.choices[0].message.content or ""
+        usage = self._usage(completion)
+        if self._fixtures and self._fixtures.recording:
+            self._fixtures.save(payload, content, usage, time.perf_counter() - started)
+        return content, usage
+
+    def _usage(self, completion) -> Dict[str, int]:
+        usage = getattr(completion, "usage", None)
+        details = getattr(usage, "prompt_tokens_details", None)
+        return {
+            "prompt_tokens": int(getattr(usage, "prompt_tokens", 0) or 0),
+            "completion_tokens": int(getattr(usage, "completion_tokens", 0) or 0),
+            "cached_tokens": int(getattr(details, "cached_tokens", 0) or 0),
+        }
 
     def _apply_defaults(self, data: Dict[str, Any], entry_type: str) -> Dict[str, Any]:
         if entry_type == "word":
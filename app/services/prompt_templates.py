@@ -0,0 +1,374 @@
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+_WORD_SCHEMA = (
+    "translation, part_of_speech, ipa, phonetic_us, phonetic_uk, "
+    "word_roots (array), tense_form (array), common_meanings (array), "
+    "related_terms (array), definition"
+)
+_TEXT_SCHEMA = (
+    "translation, structure_breakdown (array of {span, role}), "
+    "grammar_notes, key_terms (array of {term, definition})"
+)
+_LEGACY_RULES = (
+    "You are a bilingual dictionary assistant. "
+    "Return valid JSON only. "
+    "The 'translation' field must include part-of-speech grouped Chinese meanings. "
+    "Format must be multi-line: "
+    "v. ...\\n"
+    "n. ...\\n"
+    "adj. ... "
+    "Include only the POS that apply. "
+    "The 'ipa' field must be formatted as: "
+    "'UK: /.../; US: /.../' if IPA is available. "
+    "The 'tense_form' field must be an array of Chinese-labeled forms, e.g. "
+    "['复数: ...', '第三人称单数: ...', '现在分词: ...', '过去式: ...', '过去分词: ...']. "
+)
+
+
+class PromptTemplate:
+    def __init__(self, name: str, version: int, system: str, legacy_schema: str = "") -> None:
+        self.name = name
+        self.version = version
+        self.system = system
+        self._legacy_schema = legacy_schema
+
+    @property
+    def id(self) -> str:
+        return f"{self.name}@v{self.version}"
+
+    def messages(self, text: str, entry_type: str) -> List[Dict[str, Any]]:
+        # The user turn carries only the entry so the system prefix is byte-identical
+        # across calls. Providers cache prefixes only from about 1024 tokens: v2 is
+        # short of that, v3 adds worked examples to get past it.
+        payload = f"Entry type: {entry_type}. Text: {text}"
+        if self._legacy_schema:
+            content = f"{_LEGACY_RULES}Return JSON with keys: {self._legacy_schema}. {payload}"
+            return [{"role": "user", "content": [{"type": "text", "text": content}]}]
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": payload},
+        ]
+
+
+_TEMPLATES: Dict[str, PromptTemplate] = {}
+
+
+def register(template: PromptTemplate) -> PromptTemplate:
+    _TEMPLATES[template.id] = template
+    return template
+
+
+def templates() -> List[PromptTemplate]:
+    return list(_TEMPLATES.values())
+
+
+def template_for(entry_type: str, version: Optional[int] = None) -> PromptTemplate:
+    if version is None:
+        version = int(os.environ.get("LLM_PROMPT_VERSION", "2"))
+    name = "enrich_word" if entry_type == "word" else "enrich_text"
+    template = _TEMPLATES.get(f"{name}@v{version}")
+    if template is None:
+        raise KeyError(f"no prompt template {name}@v{version}")
+    return template
+
+
+# v1 is the original single user message, kept for comparison runs.
+register(PromptTemplate("enrich_word", 1, "", legacy_schema=_WORD_SCHEMA))
+register(PromptTemplate("enrich_text", 1, "", legacy_schema=_TEXT_SCHEMA))
+register(
+    PromptTemplate(
+        "enrich_word",
+        2,
+        "You are a bilingual English-Chinese dictionary assistant. "
+        "Reply with one JSON object only.\n"
+        f"Keys: {_WORD_SCHEMA}.\n"
+        "translation: Chinese meanings grouped by part of speech, one line each, e.g. \"v. ...\\nn. ...\"; "
+        "include only the parts of speech that apply.\n"
+        "ipa: \"UK: /.../; US: /.../\" when available.\n"
+        "tense_form: Chinese-labeled forms, e.g. [\"复数: ...\", \"第三人称单数: ...\", "
+        "\"现在分词: ...\", \"过去式: ...\", \"过去分词: ...\"].\n"
+        "The user message gives the entry type and the text.",
+    )
+)
+register(
+    PromptTemplate(
+        "enrich_text",
+        2,
+        "You are a bilingual English-Chinese grammar assistant. "
+        "Reply with one JSON object only.\n"
+        f"Keys: {_TEXT_SCHEMA}.\n"
+        "translation: natural Chinese translation of the whole text.\n"
+        "structure_breakdown: the main clauses and phrases in order, each with its grammatical role.\n"
+        "The user message gives the entry type (phrase or article) and the text.",
+    )
+)
+
+
+_WORD_EXAMPLES = [
+    {
+        "text": "run",
+        "translation": "v. 跑；运行；经营\nn. 跑步；一段时间；连续",
+        "part_of_speech": "v., n.",
+        "ipa": "UK: /rʌn/; US: /rʌn/",
+        "phonetic_us": "/rʌn/",
+        "phonetic_uk": "/rʌn/",
+        "word_roots": ["Old English rinnan: to flow, to run"],
+        "tense_form": ["第三人称单数: runs", "现在分词: running", "过去式: ran", "过去分词: run"],
+        "common_meanings": ["run a business 经营生意", "in the long run 从长远来看", "run out of 用完"],
+        "related_terms": ["runner", "running", "rerun", "outrun"],
+        "definition": "To move quickly on foot; to operate or manage something; a period of continuous activity.",
+    },
+    {
+        "text": "transportation",
+        "translation": "n. 运输；交通工具；运输系统",
+        "part_of_speech": "n.",
+        "ipa": "UK: /ˌtrænspɔːˈteɪʃn/; US: /ˌtrænspərˈteɪʃn/",
+        "phonetic_us": "/ˌtrænspərˈteɪʃn/",
+        "phonetic_uk": "/ˌtrænspɔːˈteɪʃn/",
+        "word_roots": ["trans-: across", "port: carry", "-ation: noun of action"],
+        "tense_form": ["复数: transportations"],
+        "common_meanings": ["public transportation 公共交通", "means of transportation 交通方式"],
+        "related_terms": ["transport", "portable", "import", "export"],
+        "definition": "The act or system of carrying people or goods from one place to another.",
+    },
+    {
+        "text": "reluctant",
+        "translation": "adj. 不情愿的；勉强的",
+        "part_of_speech": "adj.",
+        "ipa": "UK: /rɪˈlʌktənt/; US: /rɪˈlʌktənt/",
+        "phonetic_us": "/rɪˈlʌktənt/",
+        "phonetic_uk": "/rɪˈlʌktənt/",
+        "word_roots": ["re-: back, against", "luct: struggle", "-ant: adjective suffix"],
+        "tense_form": [],
+        "common_meanings": ["be reluctant to do sth 不情愿做某事", "a reluctant hero 勉强的英雄"],
+        "related_terms": ["reluctance", "reluctantly", "unwilling", "hesitant"],
+        "definition": "Unwilling and hesitant; not wanting to do something.",
+    },
+    {
+        "text": "mouse",
+        "translation": "n. 老鼠；鼠标；胆小的人",
+        "part_of_speech": "n.",
+        "ipa": "UK: /maʊs/; US: /maʊs/",
+        "phonetic_us": "/maʊs/",
+        "phonetic_uk": "/maʊs/",
+        "word_roots": ["Old English mus"],
+        "tense_form": ["复数: mice"],
+        "common_meanings": ["computer mouse 电脑鼠标", "as quiet as a mouse 非常安静"],
+        "related_terms": ["mice", "mousetrap", "rodent"],
+        "definition": "A small rodent with a pointed nose and a long tail; a hand-held device that moves a cursor.",
+    },
+    {
+        "text": "undermine",
+        "translation": "v. 逐渐削弱；暗中破坏；在……下挖",
+        "part_of_speech": "v.",
+        "ipa": "UK: /ˌʌndəˈmaɪn/; US: /ˌʌndərˈmaɪn/",
+        "phonetic_us": "/ˌʌndərˈmaɪn/",
+        "phonetic_uk": "/ˌʌndəˈmaɪn/",
+        "word_roots": ["under-: beneath", "mine: dig"],
+        "tense_form": ["第三人称单数: undermines", "现在分词: undermining", "过去式: undermined", "过去分词: undermined"],
+        "common_meanings": ["undermine confidence 削弱信心", "undermine authority 破坏权威"],
+        "related_terms": ["weaken", "sabotage", "erode"],
+        "definition": "To weaken something gradually, especially by working secretly against it.",
+    },
+    {
+        "text": "analysis",
+        "translation": "n. 分析；分析报告；解析",
+        "part_of_speech": "n.",
+        "ipa": "UK: /əˈnæləsɪs/; US: /əˈnæləsɪs/",
+        "phonetic_us": "/əˈnæləsɪs/",
+        "phonetic_uk": "/əˈnæləsɪs/",
+        "word_roots": ["ana-: up, throughout", "lysis: loosening"],
+        "tense_form": ["复数: analyses"],
+        "common_meanings": ["data analysis 数据分析", "in the final analysis 归根结底"],
+        "related_terms": ["analyze", "analyst", "analytical", "paralysis"],
+        "definition": "A detailed examination of the elements or structure of something.",
+    },
+    {
+        "text": "bright",
+        "translation": "adj. 明亮的；聪明的；鲜艳的；充满希望的\nadv. 明亮地",
+        "part_of_speech": "adj., adv.",
+        "ipa": "UK: /braɪt/; US: /braɪt/",
+        "phonetic_us": "/braɪt/",
+        "phonetic_uk": "/braɪt/",
+        "word_roots": ["Old English beorht: shining"],
+        "tense_form": ["比较级: brighter", "最高级: brightest"],
+        "common_meanings": ["a bright future 光明的未来", "bright colours 鲜艳的颜色", "a bright student 聪明的学生"],
+        "related_terms": ["brightness", "brighten", "brilliant"],
+        "definition": "Giving out or reflecting a lot of light; intelligent and quick to learn.",
+    },
+    {
+        "text": "forgive",
+        "translation": "v. 原谅；宽恕；免除（债务）",
+        "part_of_speech": "v.",
+        "ipa": "UK: /fəˈɡɪv/; US: /fərˈɡɪv/",
+        "phonetic_us": "/fərˈɡɪv/",
+        "phonetic_uk": "/fəˈɡɪv/",
+        "word_roots": ["for-: completely", "give: grant"],
+        "tense_form": ["第三人称单数: forgives", "现在分词: forgiving", "过去式: forgave", "过去分词: forgiven"],
+        "common_meanings": ["forgive sb for sth 因某事原谅某人", "forgive a debt 免除债务"],
+        "related_terms": ["forgiveness", "forgivable", "pardon"],
+        "definition": "To stop feeling angry with someone who has done something wrong; to cancel a debt.",
+    },
+    {
+        "text": "sheep",
+        "translation": "n. 羊；绵羊；盲从的人",
+        "part_of_speech": "n.",
+        "ipa": "UK: /ʃiːp/; US: /ʃiːp/",
+        "phonetic_us": "/ʃiːp/",
+        "phonetic_uk": "/ʃiːp/",
+        "word_roots": ["Old English sceap"],
+        "tense_form": ["复数: sheep"],
+        "common_meanings": ["a flock of sheep 一群羊", "black sheep 害群之马"],
+        "related_terms": ["lamb", "shepherd", "sheepish"],
+        "definition": "A farm animal with a thick woolly coat, kept for its wool and meat.",
+    },
+]
+
+_TEXT_EXAMPLES = [
+    {
+        "entry_type": "phrase",
+        "text": "take into account",
+        "translation": "考虑到；把……考虑在内",
+        "structure_breakdown": [
+            {"span": "take", "role": "verb"},
+            {"span": "into account", "role": "prepositional phrase completing the idiom"},
+        ],
+        "grammar_notes": "及物短语动词；宾语较长时常放在 account 之后：take into account the cost。",
+        "key_terms": [{"term": "account", "definition": "考虑，重视（在此习语中）"}],
+    },
+    {
+        "entry_type": "article",
+        "text": "Although the plan was expensive, the council approved it because it would reduce traffic.",
+        "translation": "尽管这个计划代价高昂，议会还是批准了它，因为它能减少交通拥堵。",
+        "structure_breakdown": [
+            {"span": "Although the plan was expensive", "role": "concessive adverbial clause"},
+            {"span": "the council", "role": "subject"},
+            {"span": "approved", "role": "predicate verb"},
+            {"span": "it", "role": "object"},
+            {"span": "because it would reduce traffic", "role": "causal adverbial clause"},
+        ],
+        "grammar_notes": "although 引导让步状语从句，不与 but 连用；would 表示过去将来的推测结果。",
+        "key_terms": [
+            {"term": "council", "definition": "议会，委员会"},
+            {"term": "approve", "definition": "批准，同意"},
+        ],
+    },
+    {
+        "entry_type": "article",
+        "text": "The book that she recommended has been translated into twenty languages.",
+        "translation": "她推荐的那本书已被翻译成二十种语言。",
+        "structure_breakdown": [
+            {"span": "The book", "role": "subject"},
+            {"span": "that she recommended", "role": "restrictive relative clause modifying the subject"},
+            {"span": "has been translated", "role": "predicate verb, present perfect passive"},
+            {"span": "into twenty languages", "role": "prepositional phrase of result"},
+        ],
+        "grammar_notes": "that 在定语从句中作宾语，可省略；现在完成时被动语态 has been done 强调结果。",
+        "key_terms": [
+            {"term": "recommend", "definition": "推荐，建议"},
+            {"term": "translate into", "definition": "翻译成"},
+        ],
+    },
+    {
+        "entry_type": "phrase",
+        "text": "on the verge of",
+        "translation": "濒临；即将；在……的边缘",
+        "structure_breakdown": [
+            {"span": "on", "role": "preposition"},
+            {"span": "the verge", "role": "noun phrase, object of the preposition"},
+            {"span": "of", "role": "preposition introducing the complement"},
+        ],
+        "grammar_notes": "后接名词或动名词：on the verge of tears / on the verge of collapsing。",
+        "key_terms": [{"term": "verge", "definition": "边缘，边界"}],
+    },
+    {
+        "entry_type": "article",
+        "text": "If I had known about the meeting, I would have come earlier.",
+        "translation": "如果我早知道有这个会议，我就会早点来了。",
+        "structure_breakdown": [
+            {"span": "If I had known about the meeting", "role": "conditional clause, past perfect"},
+            {"span": "I", "role": "subject"},
+            {"span": "would have come", "role": "predicate verb, past conditional"},
+            {"span": "earlier", "role": "adverbial of time"},
+        ],
+        "grammar_notes": "与过去事实相反的虚拟条件句：从句用 had done，主句用 would have done。",
+        "key_terms": [{"term": "meeting", "definition": "会议"}],
+    },
+    {
+        "entry_type": "article",
+        "text": "Not only did the team finish early, but they also stayed under budget.",
+        "translation": "这个团队不仅提前完成了任务，而且还没有超出预算。",
+        "structure_breakdown": [
+            {"span": "Not only did the team finish early", "role": "first coordinate clause with inverted word order"},
+            {"span": "but they also stayed under budget", "role": "second coordinate clause"},
+        ],
+        "grammar_notes": "not only 置于句首时前半句部分倒装（助动词 did 提前）；but also 连接并列成分。",
+        "key_terms": [
+            {"term": "under budget", "definition": "未超出预算"},
+            {"term": "finish early", "definition": "提前完成"},
+        ],
+    },
+    {
+        "entry_type": "phrase",
+        "text": "as a matter of fact",
+        "translation": "事实上；其实",
+        "structure_breakdown": [
+            {"span": "as", "role": "preposition"},
+            {"span": "a matter of fact", "role": "noun phrase with of-complement"},
+        ],
+        "grammar_notes": "用作插入语或句首状语，常用来补充或纠正前面的说法，后面常接逗号。",
+        "key_terms": [{"term": "matter", "definition": "事情，问题"}],
+    },
+    {
+        "entry_type": "article",
+        "text": "What surprised everyone was how quickly the new policy was accepted by the public.",
+        "translation": "让所有人惊讶的是，这项新政策这么快就被公众接受了。",
+        "structure_breakdown": [
+            {"span": "What surprised everyone", "role": "subject clause introduced by what"},
+            {"span": "was", "role": "linking verb"},
+            {"span": "how quickly the new policy was accepted", "role": "predicative clause"},
+            {"span": "by the public", "role": "agent of the passive verb"},
+        ],
+        "grammar_notes": "what 引导主语从句并在从句中作主语；how quickly 引导表语从句，从句用陈述语序和被动语态。",
+        "key_terms": [
+            {"term": "policy", "definition": "政策，方针"},
+            {"term": "the public", "definition": "公众，民众"},
+        ],
+    },
+]
+
+
+def _examples(items: List[Dict[str, Any]]) -> str:
+    # Inputs are written exactly like the user turn that messages() sends.
+    lines = []
+    for item in items:
+        reply = {key: value for key, value in item.items() if key not in {"entry_type", "text"}}
+        lines.append(
+            f"Input: Entry type: {item.get('entry_type', 'word')}. Text: {item['text']}\n"
+            f"Output: {json.dumps(reply, ensure_ascii=False)}"
+        )
+    return "\n\n".join(lines)
+
+
+# v3 keeps the v2 rules and appends worked examples; the longer fixed prefix is what
+# lets providers serve it from their prompt cache (they only cache from ~1024 tokens).
+register(
+    PromptTemplate(
+        "enrich_word",
+        3,
+        _TEMPLATES["enrich_word@v2"].system
+        + "\n\nExamples:\n\n"
+        + _examples(_WORD_EXAMPLES),
+    )
+)
+register(
+    PromptTemplate(
+        "enrich_text",
+        3,
+        _TEMPLATES["enrich_text@v2"].system
+        + "\n\nExamples:\n\n"
+        + _examples(_TEXT_EXAMPLES),
+    )
+)
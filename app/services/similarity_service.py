@@ -0,0 +1,320 @@
+import os
+import re
+import threading
+import zlib
+from typing import Any, Dict, Iterable, List, Tuple, TYPE_CHECKING
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+if TYPE_CHECKING:
+    from app.data.entry_repo import EntryRepo
+
+
+_DIM_BITS = 20
+_DIM = 1 << _DIM_BITS
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]+")
+_WORD_RE = re.compile(r"[a-z]+")
+_MERGE_THRESHOLD = 4096
+_IDF_REFRESH_RATIO = 0.01
+
+
+def index_path_for(db_path: str) -> str:
+    return os.path.splitext(db_path)[0] + ".similarity.npz"
+
+
+def _features(text: str, translation: str) -> Dict[int, int]:
+    counts: Dict[int, int] = {}
+
+    def _add(key: str) -> None:
+        feature = zlib.crc32(key.encode("utf-8")) & (_DIM - 1)
+        counts[feature] = counts.get(feature, 0) + 1
+
+    for word in _WORD_RE.findall(text.lower()):
+        padded = f"#{word}#"
+        for size in (2, 3, 4):
+            for i in range(len(padded) - size + 1):
+                _add(f"e{size}:{padded[i:i + size]}")
+    for run in _CJK_RE.findall(translation or ""):
+        for char in run:
+            _add(f"z1:{char}")
+        for i in range(len(run) - 1):
+            _add(f"z2:{run[i:i + 2]}")
+    return counts
+
+
+class SimilarityIndex:
+    def __init__(self, path: str = "") -> None:
+        self._path = path
+        self._lock = threading.Lock()
+        self._change_seq = 0
+        if np is None:
+            return
+        self._clear()
+
+    def _clear(self) -> None:
+        self._doc_ids = np.zeros(0, dtype=np.int64)
+        self._alive = np.zeros(0, dtype=bool)
+        self._feat = np.zeros(0, dtype=np.int32)
+        self._row = np.zeros(0, dtype=np.int32)
+        self._tf = np.zeros(0, dtype=np.uint8)
+        self._delta_feat: List[int] = []
+        self._delta_row: List[int] = []
+        self._delta_tf: List[int] = []
+        self._row_by_id: Dict[int, int] = {}
+        self._df = np.zeros(_DIM, dtype=np.int32)
+        self._idf = None
+        self._idf_docs = 0
+        self._norms = np.zeros(0, dtype=np.float64)
+
+    @property
+    def available(self) -> bool:
+        return np is not None
+
+    def __len__(self) -> int:
+        if np is None:
+            return 0
+        return len(self._row_by_id)
+
+    def load(self) -> bool:
+        if np is None or not self._path or not os.path.exists(self._path):
+            return False
+        try:
+            with np.load(self._path) as data:
+                doc_ids = data["doc_ids"].astype(np.int64)
+                feat = np.repeat(data["feat_keys"].astype(np.int32), data["feat_counts"])
+                row = data["row"].astype(np.int32)
+                tf = data["tf"].astype(np.uint8)
+                # Files written before change tracking have no cursor and are rebuilt.
+                change_seq = int(data["change_seq"]) if "change_seq" in data.files else 0
+        except Exception:
+            return False
+        with self._lock:
+            self._doc_ids = doc_ids
+            self._alive = np.ones(len(doc_ids), dtype=bool)
+            self._feat, self._row, self._tf = feat, row, tf
+            self._delta_feat, self._delta_row, self._delta_tf = [], [], []
+            self._row_by_id = {int(entry_id): i for i, entry_id in enumerate(doc_ids)}
+            self._df = np.bincount(feat, minlength=_DIM).astype(np.int32)
+            self._change_seq = change_seq
+            self._idf = None
+        return True
+
+    def save(self) -> None:
+        if np is None or not self._path:
+            return
+        with self._lock:
+            self._merge_delta()
+            keep = self._alive
+            remap = np.cumsum(keep, dtype=np.int64) - 1
+            row_keep = keep[self._row]
+            feat_keys, feat_counts = np.unique(self._feat[row_keep], return_counts=True)
+            payload = {
+                "doc_ids": self._doc_ids[keep],
+                "feat_keys": feat_keys.astype(np.int32),
+                "feat_counts": feat_counts.astype(np.int32),
+                "row": remap[self._row[row_keep]].astype(np.int32),
+                "tf": self._tf[row_keep],
+                "change_seq": np.int64(self._change_seq),
+            }
+        tmp_path = self._path + ".tmp.npz"
+        np.savez(tmp_path, **payload)
+        os.replace(tmp_path, self._path)
+
+    def sync(self, entry_repo: "EntryRepo", save: bool = True) -> int:
+        if np is None:
+            return 0
+        # Follows the change log, so edited translations are re-indexed and deleted
+        # entries dropped; with no usable cursor the index is rebuilt from the table.
+        changed = 0
+        page = entry_repo.word_changes_since(self._change_seq) if self._change_seq else {"reset": True}
+        if page["reset"]:
+            latest = entry_repo.latest_change_seq()
+            rows = entry_repo.list_word_entries_since(0)
+            with self._lock:
+                self._clear()
+            changed = self.add_many((row["id"], row["text"], row.get("translation", "")) for row in rows)
+            self._change_seq = latest
+            page = entry_repo.word_changes_since(latest)
+        while page["changes"]:
+            latest_rows: Dict[int, Dict[str, Any]] = {}
+            for row in page["changes"]:
+                latest_rows.pop(int(row["id"]), None)
+                latest_rows[int(row["id"])] = row
+            words = [row for row in latest_rows.values() if row["entry_type"] == "word"]
+            changed += self.remove_many([entry_id for entry_id, row in latest_rows.items() if row["entry_type"] != "word"])
+            changed += self.add_many((row["id"], row["text"], row["translation"] or "") for row in words)
+            self._change_seq = page["cursor"]
+            if not page["more"]:
+                break
+            page = entry_repo.word_changes_since(self._change_seq)
+        if changed and save:
+            self.save()
+        return changed
+
+    def add(self, entry_id: int, text: str, translation: str = "") -> None:
+        self.add_many([(entry_id, text, translation)])
+
+    def add_many(self, rows: Iterable[Tuple[int, str, str]]) -> int:
+        if np is None:
+            return 0
+        with self._lock:
+            new_ids = []
+            retired = []
+            for entry_id, text, translation in rows:
+                entry_id = int(entry_id)
+                old_row = self._row_by_id.get(entry_id)
+                if old_row is not None:
+                    retired.append(old_row)
+                row = len(self._doc_ids) + len(new_ids)
+                new_ids.append(entry_id)
+                self._row_by_id[entry_id] = row
+                for feature, count in _features(text, translation).items():
+                    self._delta_feat.append(feature)
+                    self._delta_row.append(row)
+                    self._delta_tf.append(min(count, 255))
+                    self._df[feature] += 1
+            if new_ids:
+                self._doc_ids = np.concatenate([self._doc_ids, np.array(new_ids, dtype=np.int64)])
+                self._alive = np.concatenate([self._alive, np.ones(len(new_ids), dtype=bool)])
+            # Retired after the batch so an id repeated within it keeps only its last row.
+            self._retire_rows(retired)
+            if len(self._delta_feat) >= _MERGE_THRESHOLD:
+                self._merge_delta()
+        return len(new_ids)
+
+    def remove_many(self, entry_ids: Iterable[int]) -> int:
+        if np is None:
+            return 0
+        with self._lock:
+            rows = [self._row_by_id.pop(int(entry_id)) for entry_id in entry_ids if int(entry_id) in self._row_by_id]
+            self._retire_rows(rows)
+        return len(rows)
+
+    def query(
+        self,
+        text: str,
+        translation: str = "",
+        k: int = 10,
+        exclude_ids: Iterable[int] = (),
+        min_score: float = 0.1,
+    ) -> List[Dict[str, Any]]:
+        if np is None or k <= 0:
+            return []
+        counts = _features(text, translation)
+        if not counts:
+            return []
+        with self._lock:
+            n_docs = len(self._doc_ids)
+            if n_docs == 0:
+                return []
+            idf, norms = self._weights()
+            q_feat = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+            q_tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+            q_weight = q_tf * idf[q_feat]
+            q_norm = float(np.sqrt(np.dot(q_weight, q_weight)))
+            if q_norm == 0.0:
+                return []
+
+            scores = np.zeros(n_docs, dtype=np.float64)
+            self._score_postings(scores, q_feat, q_weight * idf[q_feat])
+            self._score_delta(scores, q_feat, q_weight * idf[q_feat])
+            scores /= np.where(norms > 0, norms, 1.0) * q_norm
+            scores[~self._alive] = 0.0
+            for entry_id in exclude_ids:
+                row = self._row_by_id.get(entry_id) if isinstance(entry_id, int) else None
+                if row is not None:
+                    scores[row] = 0.0
+            k = min(k, n_docs)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                {"id": int(self._doc_ids[row]), "score": float(scores[row])}
+                for row in top
+                if scores[row] >= min_score
+            ]
+
+    def _score_postings(self, scores, q_feat, q_weight) -> None:
+        q_feat = q_feat.astype(self._feat.dtype)
+        lefts = np.searchsorted(self._feat, q_feat, side="left")
+        rights = np.searchsorted(self._feat, q_feat, side="right")
+        lengths = rights - lefts
+        total = int(lengths.sum())
+        if total == 0:
+            return
+        offsets = np.repeat(lefts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+        scores += np.bincount(
+            self._row[offsets],
+            weights=self._tf[offsets] * np.repeat(q_weight, lengths),
+            minlength=len(scores),
+        )
+
+    def _score_delta(self, scores, q_feat, q_weight) -> None:
+        if not self._delta_feat:
+            return
+        delta_feat = np.array(self._delta_feat, dtype=np.int64)
+        hits = np.isin(delta_feat, q_feat)
+        if not hits.any():
+            return
+        lookup = dict(zip(q_feat.tolist(), q_weight.tolist()))
+        weights = np.array([lookup[f] for f in delta_feat[hits].tolist()])
+        rows = np.array(self._delta_row, dtype=np.int64)[hits]
+        tf = np.array(self._delta_tf, dtype=np.float64)[hits]
+        scores += np.bincount(rows, weights=tf * weights, minlength=len(scores))
+
+    def _retire_rows(self, rows: List[int]) -> None:
+        if not rows:
+            return
+        rows = np.array(rows, dtype=np.int32)
+        self._alive[rows] = False
+        np.subtract.at(self._df, self._feat[np.isin(self._row, rows)], 1)
+        if self._delta_row:
+            delta_row = np.array(self._delta_row, dtype=np.int32)
+            delta_feat = np.array(self._delta_feat, dtype=np.int32)
+            np.subtract.at(self._df, delta_feat[np.isin(delta_row, rows)], 1)
+
+    def _merge_delta(self) -> None:
+        if not self._delta_feat:
+            return
+        feat = np.concatenate([self._feat, np.array(self._delta_feat, dtype=np.int32)])
+        row = np.concatenate([self._row, np.array(self._delta_row, dtype=np.int32)])
+        tf = np.concatenate([self._tf, np.array(self._delta_tf, dtype=np.uint8)])
+        order = np.argsort(feat, kind="stable")
+        self._feat, self._row, self._tf = feat[order], row[order], tf[order]
+        self._delta_feat, self._delta_row, self._delta_tf = [], [], []
+
+    def _weights(self) -> Tuple[Any, Any]:
+        n_docs = len(self._doc_ids)
+        alive = int(self._alive.sum())
+        if self._idf is None or alive > self._idf_docs * (1.0 + _IDF_REFRESH_RATIO):
+            # IDF is refreshed in steps; rows added in between are normalized
+            # against the current snapshot.
+            self._idf = (np.log((1.0 + alive) / (1.0 + self._df)) + 1.0).astype(np.float32)
+            self._idf_docs = max(1, alive)
+            self._norms = self._row_norms(
+                np.concatenate([self._feat, np.array(self._delta_feat, dtype=np.int32)]),
+                np.concatenate([self._row, np.array(self._delta_row, dtype=np.int32)]),
+                np.concatenate([self._tf, np.array(self._delta_tf, dtype=np.uint8)]),
+                n_docs,
+            )
+        elif len(self._norms) < n_docs:
+            # New rows may already have been merged into the sorted postings (save()
+            # merges), so their features are gathered from both places.
+            start = len(self._norms)
+            merged = self._row >= start
+            delta_row = np.array(self._delta_row, dtype=np.int32)
+            fresh = delta_row >= start
+            norms = self._row_norms(
+                np.concatenate([self._feat[merged], np.array(self._delta_feat, dtype=np.int32)[fresh]]),
+                np.concatenate([self._row[merged], delta_row[fresh]]) - start,
+                np.concatenate([self._tf[merged], np.array(self._delta_tf, dtype=np.uint8)[fresh]]),
+                n_docs - start,
+            )
+            self._norms = np.concatenate([self._norms, norms])
+        return self._idf, self._norms
+
+    def _row_norms(self, feat, row, tf, n_docs: int):
+        weights = tf.astype(np.float32) * self._idf[feat]
+        return np.sqrt(np.bincount(row, weights=weights * weights, minlength=n_docs))
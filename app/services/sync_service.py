@@ -0,0 +1,70 @@
+import json
+import time
+import urllib.request
+from typing import Any, Callable, Dict, Optional
+
+from app.data.change_repo import ChangeRepo
+
+
+class SyncError(Exception):
+    pass
+
+
+class SyncService:
+    def __init__(self, change_repo: ChangeRepo, base_url: str, device: str = "desktop", timeout: float = 30.0) -> None:
+        self._change_repo = change_repo
+        self._base_url = base_url.rstrip("/")
+        self._device = device
+        self._timeout = timeout
+
+    @property
+    def cursor(self) -> int:
+        return self._change_repo.get_cursor(self._base_url)
+
+    def push(self, batch_size: int = 500, progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        stats = {"batches": 0, "changes": 0, "cursor": self.cursor, "elapsed": 0.0, "reset": False}
+        started = time.perf_counter()
+        snapshot = stats["cursor"] == 0
+        while True:
+            batch = self._change_repo.changes_since(stats["cursor"], batch_size, snapshot)
+            if batch["reset"]:
+                # The log was compacted past our cursor: clear the server, then resend every
+                # live row as a snapshot read from 0.
+                stats["reset"] = True
+                self._post("/reset", {"device": self._device})
+                stats["cursor"] = 0
+                self._change_repo.set_cursor(self._base_url, 0)
+                snapshot = True
+                batch = self._change_repo.changes_since(0, batch_size, snapshot)
+            if not batch["changes"] and batch["cursor"] == stats["cursor"]:
+                break
+            response = self._post(
+                "/changes",
+                {"device": self._device, "cursor": batch["cursor"], "changes": batch["changes"]},
+            )
+            if int(response.get("ack", -1)) != batch["cursor"]:
+                raise SyncError(f"server acknowledged {response.get('ack')} instead of {batch['cursor']}")
+            self._change_repo.set_cursor(self._base_url, batch["cursor"])
+            stats["cursor"] = batch["cursor"]
+            stats["batches"] += 1
+            stats["changes"] += len(batch["changes"])
+            if progress:
+                progress(stats)
+            if not batch["more"]:
+                break
+        stats["elapsed"] = time.perf_counter() - started
+        return stats
+
+    def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        request = urllib.request.Request(
+            self._base_url + path,
+            data=data,
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self._timeout) as response:
+                return json.loads(response.read() or b"{}")
+        except OSError as exc:
+            raise SyncError(f"{path}: {exc}") from exc
@@ -0,0 +1,256 @@
+import os
+import pickle
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.data.entry_repo import EntryRepo
+
+
+_TOKEN_RE = re.compile(r"[A-Za-z]+(?:['’-][A-Za-z]+)*")
+_SHIFT = 32
+_MERGE_THRESHOLD = 2048
+_FORMAT = 2
+_STOPWORDS = frozenset(
+    """
+    a about above after again against all also am an and any are as at be because been before being
+    below between both but by can could did do does doing down during each few for from further had
+    has have having he her here hers herself him himself his how i if in into is it its itself just
+    me more most my myself no nor not now of off on once only or other our ours ourselves out over own
+    same she should so some such than that the their theirs them themselves then there these they this
+    those through to too under until up very was we were what when where which while who whom why will
+    with would you your yours yourself yourselves shall may might must let us one two three many much
+    """.split()
+)
+_SUFFIXES = (("ies", "y"), ("ied", "y"), ("ing", ""), ("ing", "e"), ("ed", ""), ("ed", "e"), ("es", ""), ("s", ""), ("ly", ""))
+
+
+def vocabulary_path_for(db_path: str) -> str:
+    return os.path.splitext(db_path)[0] + ".vocabulary.pickle"
+
+
+def tokenize(text: str) -> List[Tuple[str, int, int]]:
+    return [(m.group().lower().replace("’", "'"), m.start(), m.end()) for m in _TOKEN_RE.finditer(text)]
+
+
+class VocabularyIndex:
+    def __init__(self, path: str = "") -> None:
+        self._path = path
+        self._lock = threading.Lock()
+        self._reset()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _reset(self) -> None:
+        self._tokens: Dict[str, int] = {}
+        # Token-level trie: node 0 is the root, edges live in one flat dict keyed
+        # by (node << 32 | token) so the whole automaton pickles as a few arrays.
+        self._goto: Dict[int, int] = {}
+        self._parent: List[int] = [0]
+        self._edge: List[int] = [0]
+        self._depth: List[int] = [0]
+        self._out: List[int] = [0]
+        self._fail: List[int] = [0]
+        self._link: List[int] = [0]
+        self._ids: Dict[int, Tuple[int, ...]] = {}
+        self._words: Set[str] = set()
+        self._pending: Dict[Tuple[int, ...], int] = {}
+        self._pending_sizes: Dict[int, Set[int]] = {}
+        self._max_entry_id = 0
+
+    def load(self) -> bool:
+        if not self._path or not os.path.exists(self._path):
+            return False
+        try:
+            with open(self._path, "rb") as handle:
+                state = pickle.load(handle)
+        except Exception:
+            return False
+        if not isinstance(state, dict) or state.get("format") != _FORMAT:
+            return False
+        with self._lock:
+            self._reset()
+            for key in ("tokens", "goto", "parent", "edge", "depth", "out", "fail", "link", "ids", "words"):
+                setattr(self, "_" + key, state[key])
+            self._max_entry_id = state["max_entry_id"]
+            self._pending = state["pending"]
+            for pattern in self._pending:
+                self._pending_sizes.setdefault(pattern[0], set()).add(len(pattern))
+        return True
+
+    def save(self) -> None:
+        if not self._path:
+            return
+        with self._lock:
+            # Pending patterns are stored as they are; they join the automaton (and pay
+            # for a relink) only once sync() sees _MERGE_THRESHOLD of them.
+            state = {
+                "format": _FORMAT,
+                "tokens": self._tokens,
+                "goto": self._goto,
+                "parent": self._parent,
+                "edge": self._edge,
+                "depth": self._depth,
+                "out": self._out,
+                "fail": self._fail,
+                "link": self._link,
+                "ids": self._ids,
+                "words": self._words,
+                "pending": self._pending,
+                "max_entry_id": self._max_entry_id,
+            }
+            tmp_path = self._path + ".tmp"
+            with open(tmp_path, "wb") as handle:
+                pickle.dump(state, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._path)
+
+    def sync(self, entry_repo: "EntryRepo", save: bool = True) -> int:
+        counts = entry_repo.count_by_type()
+        stored = counts.get("word", 0) + counts.get("phrase", 0)
+        if stored < len(self._ids):
+            # Entries were deleted; patterns cannot be removed from the trie in place.
+            with self._lock:
+                self._reset()
+        added = self.add_many((row["id"], row["text"]) for row in entry_repo.list_vocabulary_since(self._max_entry_id))
+        if added and len(self._pending) >= _MERGE_THRESHOLD:
+            with self._lock:
+                self._merge_pending()
+        if added and save:
+            self.save()
+        return added
+
+    def add_many(self, rows: Iterable[Tuple[int, str]]) -> int:
+        added = 0
+        with self._lock:
+            for entry_id, text in rows:
+                entry_id = int(entry_id)
+                self._max_entry_id = max(self._max_entry_id, entry_id)
+                tokens = [token for token, _, _ in tokenize(text)]
+                if not tokens or entry_id in self._ids:
+                    continue
+                pattern = tuple(self._token_id(token) for token in tokens)
+                self._ids[entry_id] = pattern
+                if len(tokens) == 1:
+                    self._words.add(tokens[0])
+                self._pending.setdefault(pattern, entry_id)
+                self._pending_sizes.setdefault(pattern[0], set()).add(len(pattern))
+                added += 1
+        return added
+
+    def scan(self, text: str, limit: int = 50) -> Dict[str, Any]:
+        tokens = tokenize(text)
+        with self._lock:
+            matches = self._select(self._match(tokens), tokens)
+        covered = set()
+        for match in matches:
+            covered.update(range(match["first"], match["last"] + 1))
+        counts: Counter = Counter()
+        for i, (token, _, _) in enumerate(tokens):
+            if i in covered or len(token) < 3 or "'" in token or token in _STOPWORDS or _is_known(token, self._words):
+                continue
+            counts[token] += 1
+        return {
+            "matches": [{"start": m["start"], "end": m["end"], "id": m["id"]} for m in matches],
+            "candidates": [token for token, _ in counts.most_common(limit)],
+            "tokens": len(tokens),
+        }
+
+    def _token_id(self, token: str) -> int:
+        token_id = self._tokens.get(token)
+        if token_id is None:
+            token_id = len(self._tokens) + 1
+            self._tokens[token] = token_id
+        return token_id
+
+    def _match(self, tokens: List[Tuple[str, int, int]]) -> List[Tuple[int, int, int]]:
+        found: List[Tuple[int, int, int]] = []
+        vocab, goto, fail, out, link, depth = self._tokens, self._goto, self._fail, self._out, self._link, self._depth
+        ids: List[int] = [vocab.get(token, 0) for token, _, _ in tokens]
+        state = 0
+        for i, token_id in enumerate(ids):
+            if not token_id:
+                state = 0
+                continue
+            while state and (state << _SHIFT | token_id) not in goto:
+                state = fail[state]
+            state = goto.get(state << _SHIFT | token_id, 0)
+            node = state if out[state] else link[state]
+            while node:
+                found.append((i - depth[node] + 1, i, out[node]))
+                node = link[node]
+        if self._pending:
+            # Patterns added since the last merge are matched by direct lookup.
+            pending, sizes = self._pending, self._pending_sizes
+            total = len(ids)
+            for start, token_id in enumerate(ids):
+                for size in sizes.get(token_id, ()):
+                    if start + size > total:
+                        continue
+                    entry_id = pending.get(tuple(ids[start:start + size]))
+                    if entry_id:
+                        found.append((start, start + size - 1, entry_id))
+        return found
+
+    def _select(self, found: List[Tuple[int, int, int]], tokens: List[Tuple[str, int, int]]) -> List[Dict[str, int]]:
+        # Leftmost-longest, non-overlapping.
+        selected = []
+        end = -1
+        for first, last, entry_id in sorted(found, key=lambda item: (item[0], item[0] - item[1])):
+            if first <= end:
+                continue
+            selected.append({"first": first, "last": last, "start": tokens[first][1], "end": tokens[last][2], "id": entry_id})
+            end = last
+        return selected
+
+    def _merge_pending(self) -> None:
+        if not self._pending:
+            return
+        goto, parent, edge, depth, out = self._goto, self._parent, self._edge, self._depth, self._out
+        for pattern, entry_id in self._pending.items():
+            node = 0
+            for token_id in pattern:
+                key = node << _SHIFT | token_id
+                child = goto.get(key)
+                if child is None:
+                    child = len(parent)
+                    goto[key] = child
+                    parent.append(node)
+                    edge.append(token_id)
+                    depth.append(depth[node] + 1)
+                    out.append(0)
+                node = child
+            if not out[node]:
+                out[node] = entry_id
+        self._pending = {}
+        self._pending_sizes = {}
+        self._relink()
+
+    def _relink(self) -> None:
+        goto, parent, edge, out = self._goto, self._parent, self._edge, self._out
+        size = len(parent)
+        fail = [0] * size
+        link = [0] * size
+        for node in sorted(range(1, size), key=self._depth.__getitem__):
+            up = parent[node]
+            if up:
+                token_id = edge[node]
+                state = fail[up]
+                while state and (state << _SHIFT | token_id) not in goto:
+                    state = fail[state]
+                fail[node] = goto.get(state << _SHIFT | token_id, 0)
+            suffix = fail[node]
+            link[node] = suffix if out[suffix] else link[suffix]
+        self._fail, self._link = fail, link
+
+
+def _is_known(token: str, known: Set[str]) -> bool:
+    if token in known:
+        return True
+    for suffix, replacement in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3 and token[: -len(suffix)] + replacement in known:
+            return True
+    return False
+
@@ -0,0 +1,76 @@
+import json
+from typing import Callable
+
+
+def parse_related_ids(value: str) -> list:
+    try:
+        parsed = json.loads(value) if value else []
+        if isinstance(parsed, list):
+            normalized = []
+            for item in parsed:
+                if isinstance(item, int):
+                    normalized.append(item)
+                elif isinstance(item, str) and item.isdigit():
+                    normalized.append(int(item))
+                else:
+                    normalized.append(item)
+            return normalized
+    except Exception:
+        pass
+    return []
+
+
+def format_detail(entry: dict, format_related: Callable[[list], str]) -> str:
+    entry_type = entry.get("entry_type")
+    def _json_to_text(value: str) -> str:
+        try:
+            parsed = json.loads(value) if value else []
+            if isinstance(parsed, list):
+                return ", ".join(str(item) for item in parsed)
+            return str(parsed)
+        except Exception:
+            return value
+
+    def _format_ipa(value: str) -> str:
+        if not value:
+            return ""
+        lower = value.lower()
+        if "uk:" in lower and "us:" in lower:
+            try:
+                parts = value.replace("UK:", "UK:").replace("US:", "US:").split(";")
+                uk = parts[0].split("UK:")[1].strip()
+                us = parts[1].split("US:")[1].strip()
+                return f"英 [{uk.strip('/')}]\n美 [{us.strip('/')}]"
+            except Exception:
+                return value
+        return value
+
+    lines = [
+        f"Type: {entry_type}",
+        f"Text: {entry.get('text','')}",
+        f"Translation: {entry.get('translation','')}",
+    ]
+    if entry_type == "word":
+        lines.extend(
+            [
+                f"Part of Speech: {entry.get('part_of_speech','')}",
+                f"IPA: {_format_ipa(entry.get('ipa',''))}",
+                f"Phonetic US: {entry.get('phonetic_us','')}",
+                f"Phonetic UK: {entry.get('phonetic_uk','')}",
+                f"Roots: {_json_to_text(entry.get('word_roots',''))}",
+                f"Tense/Form: {_json_to_text(entry.get('tense_form',''))}",
+                f"Common Meanings: {_json_to_text(entry.get('common_meanings',''))}",
+                f"Related Terms: {format_related(parse_related_ids(entry.get('related_entry_ids','')))}",
+                f"Tags: {_json_to_text(entry.get('tags',''))}",
+                f"Definition: {entry.get('definition','')}",
+            ]
+        )
+    else:
+        lines.extend(
+            [
+                f"Structure Breakdown: {_json_to_text(entry.get('structure_breakdown',''))}",
+                f"Grammar Notes: {entry.get('grammar_notes','')}",
+                f"Key Terms: {_json_to_text(entry.get('key_terms',''))}",
+            ]
+        )
+    return "\n".join(lines)
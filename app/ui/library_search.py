@@ -0,0 +1,111 @@
+from typing import Dict
+
+from PySide6 import QtCore, QtWidgets
+
+from app.data.db import Database, ThreadLocalDatabase
+from app.data.entry_repo import EntryRepo
+
+
+class _LibraryWorker(QtCore.QObject):
+    results_ready = QtCore.Signal(int, list)
+    failed = QtCore.Signal(int, str)
+
+    def __init__(self, db_path: str, libraries: Dict[str, str], limit: int) -> None:
+        super().__init__()
+        self._libraries = {alias: path for alias, path in libraries.items() if alias != "main"}
+        self._repos = ThreadLocalDatabase(db_path, self._build_repo)
+        self._limit = limit
+        self.latest_generation = 0
+
+    def _build_repo(self, db: Database) -> EntryRepo:
+        # The search thread has its own connection, so it attaches the same libraries.
+        for alias, path in self._libraries.items():
+            db.attach(path, alias)
+        return EntryRepo(db)
+
+    @QtCore.Slot(int, str)
+    def search(self, generation: int, text: str) -> None:
+        if generation != self.latest_generation:
+            return
+        try:
+            entry_repo = self._repos.get()
+            if text:
+                rows = entry_repo.search_libraries(text, limit=self._limit)
+            else:
+                rows = entry_repo.list_library_entries(limit=500)
+        except Exception as exc:
+            self.failed.emit(generation, str(exc))
+            return
+        self.results_ready.emit(generation, rows)
+
+    @QtCore.Slot()
+    def close(self) -> None:
+        self._repos.close()
+
+
+class LibrarySearchController(QtCore.QObject):
+    failed = QtCore.Signal(str)
+    _search_requested = QtCore.Signal(int, str)
+
+    def __init__(
+        self,
+        db_path: str,
+        libraries: Dict[str, str],
+        list_widget: QtWidgets.QListWidget,
+        debounce_ms: int = 200,
+        limit: int = 200,
+    ) -> None:
+        super().__init__()
+        self._list = list_widget
+        self._generation = 0
+        self._pending_text = ""
+
+        self._debounce = QtCore.QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self._dispatch)
+
+        self._worker = _LibraryWorker(db_path, libraries, limit)
+        self._thread = QtCore.QThread()
+        self._worker.moveToThread(self._thread)
+        self._search_requested.connect(self._worker.search)
+        # finished is emitted on the worker thread, which owns the connection.
+        self._thread.finished.connect(self._worker.close, QtCore.Qt.ConnectionType.DirectConnection)
+        self._worker.results_ready.connect(self._on_results)
+        self._worker.failed.connect(self._on_failed)
+        self._thread.start()
+
+    def request(self, text: str, immediate: bool = False) -> None:
+        self._pending_text = text.strip()
+        if immediate:
+            self._debounce.stop()
+            self._dispatch()
+        else:
+            self._debounce.start()
+
+    def shutdown(self) -> None:
+        self._debounce.stop()
+        self._worker.latest_generation = -1
+        self._thread.quit()
+        self._thread.wait(2000)
+
+    def _dispatch(self) -> None:
+        self._generation += 1
+        self._worker.latest_generation = self._generation
+        self._search_requested.emit(self._generation, self._pending_text)
+
+    def _on_results(self, generation: int, rows: list) -> None:
+        if generation != self._generation:
+            return
+        self._list.blockSignals(True)
+        self._list.clear()
+        for row in rows:
+            item = QtWidgets.QListWidgetItem(f"[{row['library']}] {row['text']}")
+            item.setData(QtCore.Qt.ItemDataRole.UserRole, row["id"])
+            item.setData(QtCore.Qt.ItemDataRole.UserRole + 1, row["library"])
+            self._list.addItem(item)
+        self._list.blockSignals(False)
+
+    def _on_failed(self, generation: int, message: str) -> None:
+        if generation == self._generation:
+            self.failed.emit(message)
@@ -1,56 +1,108 @@
 import json
+import time
+from typing import Optional
 from PySide6 import QtCore, QtGui, QtWidgets
 
 from app.data.entry_repo import EntryRepo
+from app.data.grammar_repo import GrammarRepo
+from app.data.metrics_repo import MetricsRepo
 from app.services.clipboard_service import ClipboardService
 from app.services.selection_service import SelectionService
 from app.services.grammar_service import GrammarService
+from app.services.capture_service import CaptureService
+from app.services.enrichment_queue import EnrichmentQueue
 from app.services.llm_service import LlmService
-from app.utils.text_detect import detect_entry_type, is_english
-from app.utils.auto_tags import build_auto_tags
+from app.ui.formatting import format_detail, parse_related_ids
+from app.ui.library_search import LibrarySearchController
+from app.ui.related_search import RelatedSearchController
+from app.ui.vocabulary_highlight import VocabularyHighlighter
+from app.utils.tracing import Tracer
 
 
-class _LlmWorker(QtCore.QObject):
-    finished = QtCore.Signal(str, str, dict)
-    failed = QtCore.Signal(str)
+class _GrammarWorker(QtCore.QObject):
+    chunk_ready = QtCore.Signal(int, str)
+    finished = QtCore.Signal(int, int, str, dict)
 
-    def __init__(self, llm_service: LlmService, text: str, entry_type: str) -> None:
+    def __init__(
+        self,
+        grammar_service: GrammarService,
+        chunk_sentences: int = 8,
+        chunk_interval: float = 0.05,
+    ) -> None:
         super().__init__()
-        self._llm_service = llm_service
-        self._text = text
-        self._entry_type = entry_type
+        self._grammar_service = grammar_service
+        self._chunk_sentences = chunk_sentences
+        self._chunk_interval = chunk_interval
+        self.latest_generation = 0
 
-    def run(self) -> None:
-        try:
-            result = self._llm_service.enrich(self._text, self._entry_type)
-            self.finished.emit(self._text, self._entry_type, result)
-        except Exception as exc:
-            self.failed.emit(str(exc))
+    @QtCore.Slot(int, int, str)
+    def run(self, generation: int, entry_id: int, text: str) -> None:
+        if generation != self.latest_generation:
+            return
+        collected = []
+        buffer = []
+        last_emit = time.perf_counter()
+        for item in self._grammar_service.iter_sentence_analyses(text):
+            if generation != self.latest_generation:
+                return
+            collected.append(item)
+            buffer.append(item["html"])
+            now = time.perf_counter()
+            if (
+                len(collected) == 1
+                or len(buffer) >= self._chunk_sentences
+                or now - last_emit >= self._chunk_interval
+            ):
+                self.chunk_ready.emit(generation, "".join(buffer))
+                buffer = []
+                last_emit = now
+        if buffer:
+            self.chunk_ready.emit(generation, "".join(buffer))
+        self.finished.emit(generation, entry_id, text, self._grammar_service.combine_sentences(collected))
 
 
 class MainWindow(QtWidgets.QMainWindow):
+    _grammar_requested = QtCore.Signal(int, int, str)
+    _enrichment_finished = QtCore.Signal(int, str)
+    first_painted = QtCore.Signal()
+
     def __init__(
         self,
         entry_repo: EntryRepo,
+        grammar_repo: GrammarRepo,
         selection_service: SelectionService,
         clipboard_service: ClipboardService,
         grammar_service: GrammarService,
         llm_service: LlmService,
+        metrics_repo: MetricsRepo,
+        tracer: Tracer,
+        enrichment_queue: EnrichmentQueue,
     ) -> None:
         super().__init__()
         self.setWindowTitle("Desktop Capture + Grammar Analysis (MVP)")
         self._entry_repo = entry_repo
+        self._grammar_repo = grammar_repo
         self._selection_service = selection_service
         self._clipboard_service = clipboard_service
         self._grammar_service = grammar_service
         self._llm_service = llm_service
+        self._metrics_repo = metrics_repo
+        self._tracer = tracer
+        self._trace_id = ""
+        self._capture_service = CaptureService(entry_repo, llm_service, tracer)
+        self._enrichment_queue = enrichment_queue
 
+        self._painted = False
         self._setup_ui()
-        self._refresh_entries()
         self._current_entry = None
         self._current_related_ids = []
+        self._new_words: list = []
 
         self._clipboard_service.text_copied.connect(self._on_clipboard_change)
+        self._clipboard_service.text_skipped.connect(self._status_label.setText)
+        # Queue callbacks arrive on worker threads; the signal hops them onto the UI thread.
+        self._enrichment_finished.connect(self._on_enrichment_finished)
+        self._enrichment_queue.add_listener(self._enrichment_finished.emit)
 
     def _setup_ui(self) -> None:
         root = QtWidgets.QWidget()
@@ -66,19 +118,49 @@ class MainWindow(QtWidgets.QMainWindow):
         self._entry_tabs.addTab(self._list_word, "Word")
         self._entry_tabs.addTab(self._list_phrase, "Phrase")
         self._entry_tabs.addTab(self._list_article, "Article")
+        self._list_library: Optional[QtWidgets.QListWidget] = None
+        self._library_controller: Optional[LibrarySearchController] = None
+        if len(self._entry_repo.library_names()) > 1:
+            self._entry_tabs.addTab(self._build_library_tab(), "Libraries")
         layout.addWidget(self._entry_tabs, 2)
 
         self._right_tabs = QtWidgets.QTabWidget()
         self._entry_tab_index = self._right_tabs.addTab(self._build_entry_tab(), "Entry")
         layout.addWidget(self._right_tabs, 3)
+        if self._library_controller is not None:
+            self._library_controller.failed.connect(self._on_library_failed)
 
         self.setCentralWidget(root)
 
         capture_shortcut = QtGui.QShortcut(QtGui.QKeySequence("Ctrl+Shift+C"), self)
         capture_shortcut.activated.connect(self._capture_from_selection)
 
-        self._llm_thread = None
-        self._llm_worker = None
+        self._grammar_generation = 0
+        self._grammar_worker = _GrammarWorker(self._grammar_service)
+        self._grammar_thread = QtCore.QThread()
+        self._grammar_worker.moveToThread(self._grammar_thread)
+        self._grammar_requested.connect(self._grammar_worker.run)
+        self._grammar_worker.chunk_ready.connect(self._on_grammar_chunk)
+        self._grammar_worker.finished.connect(self._on_grammar_finished)
+        self._grammar_thread.start()
+
+    def _build_library_tab(self) -> QtWidgets.QWidget:
+        # Entries of every attached library, newest first; other libraries open read-only.
+        widget = QtWidgets.QWidget()
+        layout = QtWidgets.QVBoxLayout(widget)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self._library_search = QtWidgets.QLineEdit()
+        self._library_search.setPlaceholderText("Search words in all libraries")
+        self._library_search.textChanged.connect(self._refresh_library_entries)
+        self._list_library = QtWidgets.QListWidget()
+        self._list_library.currentItemChanged.connect(self._on_library_entry_selected)
+        # Cross-library LIKE scans run on a worker thread, debounced while typing.
+        self._library_controller = LibrarySearchController(
+            self._entry_repo.db_path, self._entry_repo.libraries(), self._list_library
+        )
+        layout.addWidget(self._library_search)
+        layout.addWidget(self._list_library, 1)
+        return widget
 
     def _build_entry_tab(self) -> QtWidgets.QWidget:
         widget = QtWidgets.QWidget()
@@ -94,7 +176,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self._detail_text.setReadOnly(True)
 
         self._structure_legend = QtWidgets.QLabel(
-            "Structure Highlight: Subject (yellow), Verb (red), Object (green), Clause (blue)"
+            "Structure Highlight: Subject (yellow), Verb (red), Object (green), Clause (blue); "
+            "words and phrases already in the library are underlined"
         )
         self._structure_legend.setWordWrap(True)
         self._structure_view = QtWidgets.QTextEdit()
@@ -102,6 +185,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self._structure_view.setPlaceholderText("Phrase/Article structure will appear here.")
         self._structure_legend.hide()
         self._structure_view.hide()
+        self._vocabulary = VocabularyHighlighter(self._entry_repo.db_path, self._structure_view)
+        self._vocabulary.candidates_ready.connect(self._on_new_words)
+        self._vocabulary.failed.connect(self._on_vocabulary_failed)
+        self._capture_new_button = QtWidgets.QPushButton("Capture New Words")
+        self._capture_new_button.clicked.connect(self._capture_new_words)
+        self._capture_new_button.hide()
 
         self._tags_input = QtWidgets.QLineEdit()
         self._tags_input.setPlaceholderText("Tags (comma separated)")
@@ -113,6 +202,9 @@ class MainWindow(QtWidgets.QMainWindow):
         self._related_search.textChanged.connect(self._update_related_options)
         self._related_combo = QtWidgets.QComboBox()
         self._related_combo.setEditable(False)
+        self._related_controller = RelatedSearchController(self._entry_repo.db_path, self._related_combo)
+        self._related_controller.results_applied.connect(self._on_related_results)
+        self._related_controller.failed.connect(self._on_related_failed)
         add_related_button = QtWidgets.QPushButton("Add Related Word")
         add_related_button.clicked.connect(self._save_related)
         self._related_input = QtWidgets.QLineEdit()
@@ -124,6 +216,7 @@ class MainWindow(QtWidgets.QMainWindow):
         layout.addWidget(self._detail_text, 1)
         layout.addWidget(self._structure_legend)
         layout.addWidget(self._structure_view, 1)
+        layout.addWidget(self._capture_new_button)
         layout.addWidget(self._tags_input)
         layout.addWidget(save_tags_button)
         layout.addWidget(self._related_search)
@@ -132,13 +225,22 @@ class MainWindow(QtWidgets.QMainWindow):
         layout.addWidget(self._related_input)
         return widget
 
+    def load_entries(self) -> None:
+        self._refresh_entries()
+
+    def paintEvent(self, event: QtGui.QPaintEvent) -> None:
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            self.first_painted.emit()
+
     def _refresh_entries(self) -> None:
         self._list_word.clear()
         self._list_phrase.clear()
         self._list_article.clear()
         for entry in self._entry_repo.list_entries():
             item = QtWidgets.QListWidgetItem(entry["text"])
-            item.setData(QtCore.Qt.ItemDataRole.UserRole, entry)
+            item.setData(QtCore.Qt.ItemDataRole.UserRole, entry["id"])
             entry_type = entry.get("entry_type")
             if entry_type == "word":
                 self._list_word.addItem(item)
@@ -146,11 +248,45 @@ class MainWindow(QtWidgets.QMainWindow):
                 self._list_phrase.addItem(item)
             else:
                 self._list_article.addItem(item)
+        self._refresh_library_entries()
+
+    def _refresh_library_entries(self, text: Optional[str] = None) -> None:
+        if self._library_controller is None:
+            return
+        # Typing is debounced; a refresh after a write runs right away.
+        if text is None:
+            self._library_controller.request(self._library_search.text(), immediate=True)
+        else:
+            self._library_controller.request(text)
+
+    def _on_library_entry_selected(self, current: QtWidgets.QListWidgetItem) -> None:
+        if not current:
+            return
+        library = current.data(QtCore.Qt.ItemDataRole.UserRole + 1)
+        if library == "main":
+            self._on_entry_selected(current)
+            return
+        entry = self._entry_repo.get_library_entry(library, current.data(QtCore.Qt.ItemDataRole.UserRole))
+        if not entry:
+            return
+        # Tags, relations and grammar analyses belong to the primary file; nothing here writes to it.
+        self._current_entry = None
+        self._current_related_ids = []
+        # Related ids point into that library, so they are shown as stored.
+        detail = format_detail(entry, lambda items: ", ".join(str(item) for item in items))
+        self._detail_text.setPlainText(f"Library: {library}\n{detail}")
+        self._tags_input.clear()
+        self._related_input.clear()
+        self._related_controller.cancel()
+        self._update_structure_view({})
+        self._status_label.setText(f"Viewing #{entry['id']} from library '{library}' (read-only).")
 
     def _on_entry_selected(self, current: QtWidgets.QListWidgetItem) -> None:
         if not current:
             return
-        entry = current.data(QtCore.Qt.ItemDataRole.UserRole)
+        entry = self._entry_repo.get_entry(current.data(QtCore.Qt.ItemDataRole.UserRole))
+        if not entry:
+            return
         self._current_entry = entry
         detail = self._format_detail(entry)
         self._detail_text.setPlainText(detail)
@@ -166,179 +302,146 @@ class MainWindow(QtWidgets.QMainWindow):
         self._current_related_ids = related_list
         related_text = self._format_related_terms(related_list)
         self._related_input.setText(related_text)
+        self._related_search.blockSignals(True)
         self._related_search.clear()
-        self._update_related_options("")
+        self._related_search.blockSignals(False)
+        self._update_related_options("", immediate=True)
         self._update_structure_view(entry)
 
     def _on_clipboard_change(self, text: str) -> None:
         self._status_label.setText(f"Clipboard updated: {text[:80]}")
 
     def _capture_from_selection(self) -> None:
-        text = self._selection_service.get_selected_text()
-        if not text:
-            text = self._clipboard_service.get_text()
+        trace_id = self._tracer.new_trace()
+        with self._tracer.span(trace_id, "selection"):
+            text = self._selection_service.get_selected_text()
+            if not text:
+                text = self._clipboard_service.get_text()
         if not text:
             self._status_label.setText("No text captured.")
+            self._flush_spans()
+            return
+        if not self._clipboard_service.within_cap(text):
+            self._status_label.setText(f"Captured text exceeds {self._clipboard_service.max_bytes // 1024} KB, not stored.")
+            self._flush_spans()
             return
-        if not is_english(text):
+        entry_type = self._capture_service.classify(text, trace_id)
+        if not entry_type:
             self._status_label.setText("Captured text is not English enough to store.")
+            self._flush_spans()
             return
-
-        entry_type = detect_entry_type(text)
-        self._status_label.setText("Calling LLM for enrichment...")
-        self._capture_button.setEnabled(False)
-        if self._llm_thread and self._llm_thread.isRunning():
-            self._status_label.setText("LLM request already running.")
-            self._capture_button.setEnabled(True)
+        entry_id, created = self._capture_service.store_pending(text, entry_type, trace_id)
+        if not created:
+            hit = self._capture_service.find_elsewhere(text)
+            if hit:
+                self._status_label.setText(f"Already in library '{hit['library']}' as #{hit['id']} ({hit['entry_type']}).")
+            else:
+                self._status_label.setText(f"Duplicate entry #{entry_id} ({entry_type}).")
+            self._flush_spans()
             return
-        worker = _LlmWorker(self._llm_service, text, entry_type)
-        thread = QtCore.QThread()
-        worker.moveToThread(thread)
-        thread.started.connect(worker.run)
-        worker.finished.connect(self._on_llm_finished)
-        worker.failed.connect(self._on_llm_failed)
-        worker.finished.connect(thread.quit)
-        worker.finished.connect(worker.deleteLater)
-        worker.failed.connect(thread.quit)
-        worker.failed.connect(worker.deleteLater)
-        thread.finished.connect(thread.deleteLater)
-        thread.finished.connect(self._on_llm_thread_finished)
-        self._llm_worker = worker
-        self._llm_thread = thread
-        thread.start()
-
-    def _on_llm_finished(self, text: str, entry_type: str, enrich: dict) -> None:
-        def _to_text(value) -> str:
-            if value is None:
-                return ""
-            if isinstance(value, (dict, list)):
-                return json.dumps(value, ensure_ascii=True)
-            return str(value)
-
-        auto_tags = []
-        if entry_type == "word":
-            existing_words = self._entry_repo.list_word_entries()
-            auto_tags = build_auto_tags(
-                text,
-                _to_text(enrich.get("translation", "")),
-                existing_words,
-            )
-
-        entry_payload = {
-            "entry_type": entry_type,
-            "text": text,
-            "translation": _to_text(enrich.get("translation", "")),
-            "phonetic_us": _to_text(enrich.get("phonetic_us", "")),
-            "phonetic_uk": _to_text(enrich.get("phonetic_uk", "")),
-            "definition": _to_text(enrich.get("definition", "")),
-            "part_of_speech": _to_text(enrich.get("part_of_speech", "")),
-            "ipa": _to_text(enrich.get("ipa", "")),
-            "word_roots": json.dumps(enrich.get("word_roots", []), ensure_ascii=True),
-            "tense_form": json.dumps(enrich.get("tense_form", []), ensure_ascii=True),
-            "common_meanings": json.dumps(enrich.get("common_meanings", []), ensure_ascii=True),
-            "related_entry_ids": json.dumps(enrich.get("related_terms", []), ensure_ascii=True),
-            "tags": json.dumps(auto_tags, ensure_ascii=True),
-            "grammar_notes": _to_text(enrich.get("grammar_notes", "")),
-            "structure_breakdown": json.dumps(enrich.get("structure_breakdown", []), ensure_ascii=True),
-            "key_terms": json.dumps(enrich.get("key_terms", []), ensure_ascii=True),
-            "raw_llm": _to_text(enrich.get("raw_llm", "")),
-        }
-        entry_id, created = self._entry_repo.add_entry(entry_payload)
-        if created:
-            self._status_label.setText(f"Saved entry #{entry_id} ({entry_type}).")
-        else:
-            self._status_label.setText(f"Duplicate entry #{entry_id} ({entry_type}).")
-        self._capture_button.setEnabled(True)
-        self._refresh_entries()
+        # The entry is on disk before the LLM is called; the queue retries until it is enriched.
+        self._enrichment_queue.submit(entry_id)
+        self._status_label.setText(f"Saved entry #{entry_id} ({entry_type}); enriching...")
+        with self._tracer.span(trace_id, "refresh"):
+            self._refresh_entries()
         self._tags_input.clear()
         self._related_input.clear()
+        self._related_search.blockSignals(True)
         self._related_search.clear()
-        self._related_combo.clear()
-
-    def _on_llm_failed(self, message: str) -> None:
-        self._status_label.setText(f"LLM failed: {message}")
-        self._capture_button.setEnabled(True)
-
-    def _on_llm_thread_finished(self) -> None:
-        self._llm_worker = None
-        self._llm_thread = None
+        self._related_search.blockSignals(False)
+        self._related_controller.cancel()
+        self._flush_spans()
+
+    def _on_enrichment_finished(self, entry_id: int, status: str) -> None:
+        if status == "done":
+            self._status_label.setText(f"Enriched entry #{entry_id}.")
+        elif status == "retry":
+            self._status_label.setText(f"Enrichment of entry #{entry_id} failed; will retry.")
+        elif status == "failed":
+            self._status_label.setText(f"Enrichment of entry #{entry_id} failed; giving up.")
+        if self._current_entry and self._current_entry["id"] == entry_id:
+            entry = self._entry_repo.get_entry(entry_id)
+            if entry:
+                self._current_entry = entry
+                self._detail_text.setPlainText(self._format_detail(entry))
+        self._flush_spans()
+
+    def _flush_spans(self) -> None:
+        spans = self._tracer.drain()
+        if spans:
+            self._metrics_repo.add_spans(spans)
 
     def closeEvent(self, event: QtGui.QCloseEvent) -> None:
-        if self._llm_thread and self._llm_thread.isRunning():
-            self._llm_thread.quit()
-            self._llm_thread.wait(2000)
+        self._grammar_worker.latest_generation = -1
+        self._grammar_thread.quit()
+        self._grammar_thread.wait(2000)
+        self._related_controller.shutdown()
+        if self._library_controller is not None:
+            self._library_controller.shutdown()
+        self._vocabulary.shutdown()
         super().closeEvent(event)
 
     def _format_detail(self, entry: dict) -> str:
-        entry_type = entry.get("entry_type")
-        def _json_to_text(value: str) -> str:
-            try:
-                parsed = json.loads(value) if value else []
-                if isinstance(parsed, list):
-                    return ", ".join(str(item) for item in parsed)
-                return str(parsed)
-            except Exception:
-                return value
-
-        def _format_ipa(value: str) -> str:
-            if not value:
-                return ""
-            lower = value.lower()
-            if "uk:" in lower and "us:" in lower:
-                try:
-                    parts = value.replace("UK:", "UK:").replace("US:", "US:").split(";")
-                    uk = parts[0].split("UK:")[1].strip()
-                    us = parts[1].split("US:")[1].strip()
-                    return f"英 [{uk.strip('/')}]\n美 [{us.strip('/')}]"
-                except Exception:
-                    return value
-            return value
-
-        lines = [
-            f"Type: {entry_type}",
-            f"Text: {entry.get('text','')}",
-            f"Translation: {entry.get('translation','')}",
-        ]
-        if entry_type == "word":
-            lines.extend(
-                [
-                    f"Part of Speech: {entry.get('part_of_speech','')}",
-                    f"IPA: {_format_ipa(entry.get('ipa',''))}",
-                    f"Phonetic US: {entry.get('phonetic_us','')}",
-                    f"Phonetic UK: {entry.get('phonetic_uk','')}",
-                    f"Roots: {_json_to_text(entry.get('word_roots',''))}",
-                    f"Tense/Form: {_json_to_text(entry.get('tense_form',''))}",
-                    f"Common Meanings: {_json_to_text(entry.get('common_meanings',''))}",
-                    f"Related Terms: {self._format_related_terms(self._parse_related_ids(entry.get('related_entry_ids','')))}",
-                    f"Tags: {_json_to_text(entry.get('tags',''))}",
-                    f"Definition: {entry.get('definition','')}",
-                ]
-            )
-        else:
-            lines.extend(
-                [
-                    f"Structure Breakdown: {_json_to_text(entry.get('structure_breakdown',''))}",
-                    f"Grammar Notes: {entry.get('grammar_notes','')}",
-                    f"Key Terms: {_json_to_text(entry.get('key_terms',''))}",
-                ]
-            )
-        return "\n".join(lines)
+        return format_detail(entry, self._format_related_terms)
 
     def _update_structure_view(self, entry: dict) -> None:
+        self._grammar_generation += 1
+        self._grammar_worker.latest_generation = self._grammar_generation
+        self._vocabulary.cancel()
+        self._on_new_words([])
         entry_type = entry.get("entry_type")
         if entry_type not in {"phrase", "article"}:
             self._structure_legend.hide()
             self._structure_view.hide()
             self._structure_view.clear()
             return
-        analysis = self._grammar_service.analyze(entry.get("text", ""))
-        highlighted_html = analysis.get("highlighted_html")
-        if highlighted_html:
-            self._structure_view.setHtml(highlighted_html)
-        else:
-            self._structure_view.setPlainText(entry.get("text", ""))
         self._structure_legend.show()
         self._structure_view.show()
+        text = entry.get("text", "")
+        analysis = self._grammar_repo.get_analysis(entry["id"], text)
+        if analysis and analysis.get("highlighted_html"):
+            self._structure_view.setHtml(analysis["highlighted_html"])
+            self._vocabulary.request()
+            return
+        # Until the background warm-up has loaded spaCy, let the worker thread wait for it.
+        if self._grammar_service.loaded and not self._grammar_service.available:
+            self._structure_view.setPlainText(text)
+            self._vocabulary.request()
+            return
+        self._structure_view.clear()
+        self._grammar_requested.emit(self._grammar_generation, entry["id"], text)
+
+    def _on_grammar_chunk(self, generation: int, chunk_html: str) -> None:
+        if generation != self._grammar_generation:
+            return
+        cursor = self._structure_view.textCursor()
+        cursor.movePosition(QtGui.QTextCursor.MoveOperation.End)
+        cursor.insertHtml(chunk_html)
+
+    def _on_grammar_finished(self, generation: int, entry_id: int, text: str, analysis: dict) -> None:
+        if generation != self._grammar_generation:
+            return
+        self._vocabulary.request()
+        if self._grammar_service.available:
+            self._grammar_repo.save_analysis(entry_id, text, analysis)
+
+    def _on_new_words(self, words: list) -> None:
+        self._new_words = words
+        self._capture_new_button.setText(f"Capture New Words ({len(words)})")
+        self._capture_new_button.setToolTip(", ".join(words))
+        self._capture_new_button.setVisible(bool(words))
+
+    def _on_vocabulary_failed(self, message: str) -> None:
+        self._status_label.setText(f"Vocabulary scan failed: {message}")
+
+    def _capture_new_words(self) -> None:
+        if not self._new_words:
+            return
+        created = self._capture_service.capture_pending(self._new_words)
+        self._status_label.setText(f"Added {created} new words; they are enriched by 'python -m app.cli enrich'.")
+        self._refresh_entries()
+        self._on_new_words([])
+        self._vocabulary.request()
 
     def _save_tags(self) -> None:
         if not self._current_entry:
@@ -364,41 +467,37 @@ class MainWindow(QtWidgets.QMainWindow):
         self._detail_text.setPlainText(self._format_detail(self._current_entry))
         self._related_input.setText(self._format_related_terms(self._current_related_ids))
         self._status_label.setText("Added related word.")
-        self._update_related_options(self._related_search.text())
+        self._update_related_options(self._related_search.text(), immediate=True)
 
-    def _update_related_options(self, text: str) -> None:
+    def _update_related_options(self, text: str, immediate: bool = False) -> None:
         if not self._current_entry:
-            self._related_combo.clear()
+            self._related_controller.cancel()
             return
-        query = text.strip()
-        self._related_combo.clear()
         exclude = [self._current_entry["id"], *self._current_related_ids]
-        if not query:
-            results = self._entry_repo.search_words("", exclude)
-        else:
-            results = self._entry_repo.search_words(query, exclude)
-        if not results:
+        anchor, anchor_translation = "", ""
+        if self._current_entry.get("entry_type") == "word":
+            anchor = self._current_entry.get("text", "")
+            anchor_translation = self._current_entry.get("translation", "")
+        self._related_controller.request(
+            text,
+            exclude,
+            anchor=anchor,
+            anchor_translation=anchor_translation,
+            immediate=immediate,
+        )
+
+    def _on_related_results(self, count: int) -> None:
+        if not count:
             self._status_label.setText("No related word matches.")
-            return
-        for row in results:
-            self._related_combo.addItem(row["text"], row["id"])
+
+    def _on_library_failed(self, message: str) -> None:
+        self._status_label.setText(f"Library search failed: {message}")
+
+    def _on_related_failed(self, message: str) -> None:
+        self._status_label.setText(f"Related word search failed: {message}")
 
     def _parse_related_ids(self, value: str) -> list:
-        try:
-            parsed = json.loads(value) if value else []
-            if isinstance(parsed, list):
-                normalized = []
-                for item in parsed:
-                    if isinstance(item, int):
-                        normalized.append(item)
-                    elif isinstance(item, str) and item.isdigit():
-                        normalized.append(int(item))
-                    else:
-                        normalized.append(item)
-                return normalized
-        except Exception:
-            pass
-        return []
+        return parse_related_ids(value)
 
     def _format_related_terms(self, related_list: list) -> str:
         if not related_list:
@@ -0,0 +1,194 @@
+from collections import OrderedDict
+from typing import Optional, TYPE_CHECKING
+
+from PySide6 import QtCore, QtWidgets
+
+from app.data.db import ThreadLocalDatabase
+from app.data.entry_repo import EntryRepo
+
+if TYPE_CHECKING:
+    from app.services.similarity_service import SimilarityIndex
+
+
+class _SearchWorker(QtCore.QObject):
+    results_ready = QtCore.Signal(int, list)
+    failed = QtCore.Signal(int, str)
+
+    def __init__(self, db_path: str, cache_size: int, limit: int) -> None:
+        super().__init__()
+        self._repos = ThreadLocalDatabase(db_path, EntryRepo)
+        self._cache_size = cache_size
+        self._limit = limit
+        self._cache: "OrderedDict[tuple, list]" = OrderedDict()
+        self._cache_version: Optional[int] = None
+        self._index: Optional["SimilarityIndex"] = None
+        self.latest_generation = 0
+
+    @QtCore.Slot(int, str, list, str, str)
+    def search(self, generation: int, query: str, exclude_ids: list, anchor: str, anchor_translation: str) -> None:
+        if generation != self.latest_generation:
+            return
+        try:
+            entry_repo = self._ensure_repo()
+            version = entry_repo.data_version()
+            if version != self._cache_version:
+                self._cache.clear()
+                self._cache_version = version
+                self._ensure_index(entry_repo).sync(entry_repo)
+            key = (query, tuple(exclude_ids), anchor, anchor_translation)
+            results = self._cache.get(key)
+            if results is None:
+                results = self._ranked(entry_repo, query, exclude_ids, anchor, anchor_translation)
+                self._cache[key] = results
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+            else:
+                self._cache.move_to_end(key)
+        except Exception as exc:
+            self.failed.emit(generation, str(exc))
+            return
+        self.results_ready.emit(generation, results)
+
+    def _ranked(
+        self,
+        entry_repo: EntryRepo,
+        query: str,
+        exclude_ids: list,
+        anchor: str,
+        anchor_translation: str,
+    ) -> list:
+        matches = entry_repo.search_words(query, exclude_ids) if query else []
+        seen = {row["id"] for row in matches}
+        if query:
+            similar = self._index.query(query, k=self._limit, exclude_ids=exclude_ids)
+        elif anchor:
+            similar = self._index.query(anchor, anchor_translation, k=self._limit, exclude_ids=exclude_ids)
+        else:
+            similar = []
+        similar = [item for item in similar if item["id"] not in seen]
+        texts = entry_repo.get_entry_texts([item["id"] for item in similar])
+        for item in similar:
+            if item["id"] in texts:
+                matches.append({"id": item["id"], "text": texts[item["id"]], "score": item["score"]})
+                seen.add(item["id"])
+        if not query:
+            matches.extend(row for row in entry_repo.search_words("", exclude_ids) if row["id"] not in seen)
+        return matches[: self._limit]
+
+    def _ensure_index(self, entry_repo: EntryRepo) -> "SimilarityIndex":
+        if self._index is None:
+            # numpy is imported on the search thread, not on the startup path.
+            from app.services.similarity_service import SimilarityIndex, index_path_for
+
+            self._index = SimilarityIndex(index_path_for(entry_repo.db_path))
+            self._index.load()
+        return self._index
+
+    def _ensure_repo(self) -> EntryRepo:
+        return self._repos.get()
+
+    @QtCore.Slot()
+    def close(self) -> None:
+        self._repos.close()
+
+
+class RelatedSearchController(QtCore.QObject):
+    results_applied = QtCore.Signal(int)
+    failed = QtCore.Signal(str)
+    _search_requested = QtCore.Signal(int, str, list, str, str)
+
+    def __init__(
+        self,
+        db_path: str,
+        combo: QtWidgets.QComboBox,
+        debounce_ms: int = 150,
+        fill_batch: int = 10,
+        cache_size: int = 128,
+        limit: int = 20,
+    ) -> None:
+        super().__init__()
+        self._combo = combo
+        self._fill_batch = fill_batch
+        self._generation = 0
+        self._pending_query = ""
+        self._pending_exclude: list = []
+        self._pending_anchor = ("", "")
+
+        self._debounce = QtCore.QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self._dispatch)
+
+        self._worker = _SearchWorker(db_path, cache_size, limit)
+        self._thread = QtCore.QThread()
+        self._worker.moveToThread(self._thread)
+        self._search_requested.connect(self._worker.search)
+        # finished is emitted on the worker thread, which owns the connection.
+        self._thread.finished.connect(self._worker.close, QtCore.Qt.ConnectionType.DirectConnection)
+        self._worker.results_ready.connect(self._on_results)
+        self._worker.failed.connect(self._on_failed)
+        self._thread.start()
+
+    def request(
+        self,
+        query: str,
+        exclude_ids: list,
+        anchor: str = "",
+        anchor_translation: str = "",
+        immediate: bool = False,
+    ) -> None:
+        self._pending_query = query.strip()
+        self._pending_exclude = list(exclude_ids)
+        self._pending_anchor = (anchor, anchor_translation)
+        if immediate:
+            self._debounce.stop()
+            self._dispatch()
+        else:
+            self._debounce.start()
+
+    def cancel(self) -> None:
+        self._debounce.stop()
+        self._next_generation()
+        self._combo.clear()
+
+    def shutdown(self) -> None:
+        self._debounce.stop()
+        self._worker.latest_generation = -1
+        self._thread.quit()
+        self._thread.wait(2000)
+
+    def _next_generation(self) -> int:
+        self._generation += 1
+        self._worker.latest_generation = self._generation
+        return self._generation
+
+    def _dispatch(self) -> None:
+        generation = self._next_generation()
+        self._search_requested.emit(generation, self._pending_query, self._pending_exclude, *self._pending_anchor)
+
+    def _on_results(self, generation: int, results: list) -> None:
+        if generation != self._generation:
+            return
+        self._combo.clear()
+        if not results:
+            self.results_applied.emit(0)
+            return
+        self._fill(generation, results, 0)
+
+    def _fill(self, generation: int, results: list, start: int) -> None:
+        if generation != self._generation:
+            return
+        end = min(start + self._fill_batch, len(results))
+        for row in results[start:end]:
+            label = row["text"]
+            if "score" in row:
+                label = f"{label}  (similar {row['score']:.2f})"
+            self._combo.addItem(label, row["id"])
+        if end < len(results):
+            QtCore.QTimer.singleShot(0, lambda: self._fill(generation, results, end))
+        else:
+            self.results_applied.emit(len(results))
+
+    def _on_failed(self, generation: int, message: str) -> None:
+        if generation == self._generation:
+            self.failed.emit(message)
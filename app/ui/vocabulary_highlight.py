@@ -0,0 +1,122 @@
+from typing import Optional, TYPE_CHECKING
+
+from PySide6 import QtCore, QtGui, QtWidgets
+
+from app.data.db import ThreadLocalDatabase
+from app.data.entry_repo import EntryRepo
+
+if TYPE_CHECKING:
+    from app.services.vocabulary_service import VocabularyIndex
+
+
+class _ScanWorker(QtCore.QObject):
+    scanned = QtCore.Signal(int, dict)
+    failed = QtCore.Signal(int, str)
+
+    def __init__(self, db_path: str, limit: int) -> None:
+        super().__init__()
+        self._repos = ThreadLocalDatabase(db_path, EntryRepo)
+        self._limit = limit
+        self._index: Optional["VocabularyIndex"] = None
+        self._version: Optional[int] = None
+        self.latest_generation = 0
+
+    @QtCore.Slot(int, str)
+    def scan(self, generation: int, text: str) -> None:
+        if generation != self.latest_generation:
+            return
+        try:
+            entry_repo = self._ensure_repo()
+            index = self._ensure_index(entry_repo)
+            version = entry_repo.data_version()
+            if version != self._version:
+                index.sync(entry_repo)
+                self._version = version
+            result = index.scan(text, self._limit)
+            result["matches"] = _to_utf16(text, result["matches"])
+        except Exception as exc:
+            self.failed.emit(generation, str(exc))
+            return
+        self.scanned.emit(generation, result)
+
+    def _ensure_index(self, entry_repo: EntryRepo) -> "VocabularyIndex":
+        if self._index is None:
+            from app.services.vocabulary_service import VocabularyIndex, vocabulary_path_for
+
+            self._index = VocabularyIndex(vocabulary_path_for(entry_repo.db_path))
+            self._index.load()
+        return self._index
+
+    def _ensure_repo(self) -> EntryRepo:
+        return self._repos.get()
+
+    @QtCore.Slot()
+    def close(self) -> None:
+        self._repos.close()
+
+
+def _to_utf16(text: str, matches: list) -> list:
+    # QTextCursor positions count UTF-16 code units; characters outside the BMP
+    # (emoji and the like) take two, so later offsets shift by one for each.
+    if not matches or all(ord(char) <= 0xFFFF for char in text):
+        return matches
+    shift = [0] * (len(text) + 1)
+    for i, char in enumerate(text):
+        shift[i + 1] = shift[i] + (ord(char) > 0xFFFF)
+    return [{**match, "start": match["start"] + shift[match["start"]], "end": match["end"] + shift[match["end"]]} for match in matches]
+
+
+class VocabularyHighlighter(QtCore.QObject):
+    candidates_ready = QtCore.Signal(list)
+    failed = QtCore.Signal(str)
+    _scan_requested = QtCore.Signal(int, str)
+
+    def __init__(self, db_path: str, view: QtWidgets.QTextEdit, limit: int = 50) -> None:
+        super().__init__()
+        self._view = view
+        self._generation = 0
+        self._format = QtGui.QTextCharFormat()
+        self._format.setFontUnderline(True)
+        self._format.setUnderlineStyle(QtGui.QTextCharFormat.UnderlineStyle.DashUnderline)
+        self._format.setUnderlineColor(QtGui.QColor("#2e7d32"))
+
+        self._worker = _ScanWorker(db_path, limit)
+        self._thread = QtCore.QThread()
+        self._worker.moveToThread(self._thread)
+        self._scan_requested.connect(self._worker.scan)
+        # finished is emitted on the worker thread, which owns the connection.
+        self._thread.finished.connect(self._worker.close, QtCore.Qt.ConnectionType.DirectConnection)
+        self._worker.scanned.connect(self._on_scanned)
+        self._worker.failed.connect(self._on_failed)
+        self._thread.start()
+
+    def request(self) -> None:
+        self._generation += 1
+        self._worker.latest_generation = self._generation
+        self._scan_requested.emit(self._generation, self._view.toPlainText())
+
+    def cancel(self) -> None:
+        self._generation += 1
+        self._worker.latest_generation = self._generation
+
+    def shutdown(self) -> None:
+        self._worker.latest_generation = -1
+        self._thread.quit()
+        self._thread.wait(2000)
+
+    def _on_scanned(self, generation: int, result: dict) -> None:
+        if generation != self._generation:
+            return
+        # Offsets come from the view's plain text in UTF-16 units, as document positions are.
+        cursor = QtGui.QTextCursor(self._view.document())
+        cursor.beginEditBlock()
+        for match in result["matches"]:
+            cursor.setPosition(match["start"])
+            cursor.setPosition(match["end"], QtGui.QTextCursor.MoveMode.KeepAnchor)
+            cursor.mergeCharFormat(self._format)
+        cursor.endEditBlock()
+        self.candidates_ready.emit(result["candidates"])
+
+    def _on_failed(self, generation: int, message: str) -> None:
+        if generation == self._generation:
+            self.failed.emit(message)
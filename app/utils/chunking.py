@@ -0,0 +1,61 @@
+import re
+from typing import List
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_SENTENCE_RE = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"'\u201d\u2019)\]]))\s+|(?<=[\u3002\uff01\uff1f])")
+_CJK_RE = re.compile(r"[\u3000-\u9fff\uff00-\uffef]")
+
+
+def estimate_tokens(text: str) -> int:
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def split_chunks(text: str, max_tokens: int) -> List[str]:
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for paragraph in _PARAGRAPH_RE.split(text.strip()):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        # Paragraph boundaries are kept inside a chunk so the model still sees them.
+        pieces = [paragraph] if estimate_tokens(paragraph) <= max_tokens else _split_long(paragraph, max_tokens)
+        for index, piece in enumerate(pieces):
+            tokens = estimate_tokens(piece)
+            if current and current_tokens + tokens > max_tokens:
+                chunks.append("".join(current).strip())
+                current, current_tokens = [], 0
+            if current:
+                current.append("\n\n" if index == 0 else " ")
+            current.append(piece)
+            current_tokens += tokens
+    if current:
+        chunks.append("".join(current).strip())
+    return chunks
+
+
+def _split_long(paragraph: str, max_tokens: int) -> List[str]:
+    pieces: List[str] = []
+    for sentence in _SENTENCE_RE.split(paragraph):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if estimate_tokens(sentence) <= max_tokens:
+            pieces.append(sentence)
+            continue
+        words: List[str] = []
+        words_tokens = 0
+        for word in sentence.split():
+            tokens = estimate_tokens(word) + 1
+            if words and words_tokens + tokens > max_tokens:
+                pieces.append(" ".join(words))
+                words, words_tokens = [], 0
+            if tokens > max_tokens:
+                pieces.extend(word[start:start + max_tokens] for start in range(0, len(word), max_tokens))
+                continue
+            words.append(word)
+            words_tokens += tokens
+        if words:
+            pieces.append(" ".join(words))
+    return pieces
@@ -0,0 +1,282 @@
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+_EXPLAINABLE = ("select", "with", "insert", "update", "delete", "replace")
+
+
+def normalize_sql(sql: str) -> str:
+    return _SPACE.sub(" ", _LITERALS.sub("?", sql)).strip()
+
+
+class _Statement:
+    __slots__ = ("sql", "params", "active", "ticks")
+
+    def __init__(self, sql: str, params: Any) -> None:
+        self.sql = sql
+        self.params = params
+        self.active = 0.0
+        self.ticks = 0
+
+
+class _Session:
+    # Durations add up only the time spent inside execute/fetch calls, so time the caller
+    # spends between fetches (or before its next statement) is never counted.
+    def __init__(self, profiler: "QueryProfiler", conn: sqlite3.Connection) -> None:
+        self._profiler = profiler
+        self._conn = conn
+        self._open: Dict[int, _Statement] = {}
+        self._running: Optional[_Statement] = None
+        self._explaining = False
+
+    def begin(self, cursor: sqlite3.Cursor, sql: str, params: Any) -> None:
+        self.end(cursor)
+        self._open[id(cursor)] = _Statement(sql, params)
+
+    def run(self, cursor: sqlite3.Cursor, call: Callable[..., Any], *args: Any) -> Any:
+        statement = self._open.get(id(cursor))
+        if statement is None:
+            return call(*args)
+        self._running = statement
+        started = time.perf_counter()
+        try:
+            return call(*args)
+        finally:
+            statement.active += time.perf_counter() - started
+            self._running = None
+
+    def end(self, cursor: sqlite3.Cursor) -> None:
+        statement = self._open.pop(id(cursor), None)
+        if statement is not None:
+            self._record(statement)
+
+    def on_progress(self) -> int:
+        if self._running is not None and not self._explaining:
+            self._running.ticks += 1
+        return 0
+
+    def finish(self) -> None:
+        # Cursors that were neither exhausted nor closed yet (e.g. after a single fetchone).
+        for key in list(self._open):
+            self._record(self._open.pop(key))
+
+    def _record(self, statement: _Statement) -> None:
+        duration_ms = statement.active * 1000.0
+        steps = statement.ticks * self._profiler.progress_ops
+        plan: Optional[List[str]] = None
+        if duration_ms >= self._profiler.threshold_ms:
+            params = statement.params if isinstance(statement.params, (tuple, list, dict)) else ()
+            plan = self.explain(statement.sql, params)
+        self._profiler._record(statement.sql, duration_ms, steps, plan)
+
+    def explain(self, sql: str, params: Any = ()) -> List[str]:
+        if not sql.lstrip().lower().startswith(_EXPLAINABLE):
+            return []
+        self._explaining = True
+        try:
+            # The base class execute returns a plain cursor, so this is not profiled itself.
+            rows = sqlite3.Connection.execute(self._conn, f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+            return [str(row[3]) for row in rows]
+        except sqlite3.Error as exc:
+            return [f"error: {exc}"]
+        finally:
+            self._explaining = False
+
+
+class _ProfiledCursor(sqlite3.Cursor):
+    def execute(self, sql: str, parameters: Any = ()) -> "_ProfiledCursor":
+        session = self.connection._session
+        session.begin(self, sql, parameters)
+        session.run(self, super().execute, sql, parameters)
+        if self.description is None:
+            session.end(self)
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> "_ProfiledCursor":
+        session = self.connection._session
+        session.begin(self, sql, ())
+        session.run(self, super().executemany, sql, seq_of_parameters)
+        session.end(self)
+        return self
+
+    def executescript(self, sql_script: str) -> "_ProfiledCursor":
+        session = self.connection._session
+        session.begin(self, sql_script, ())
+        session.run(self, super().executescript, sql_script)
+        session.end(self)
+        return self
+
+    def fetchone(self) -> Any:
+        row = self.connection._session.run(self, super().fetchone)
+        if row is None:
+            self.connection._session.end(self)
+        return row
+
+    def fetchmany(self, size: int = -1) -> list:
+        size = self.arraysize if size < 0 else size
+        rows = self.connection._session.run(self, super().fetchmany, size)
+        if len(rows) < size:
+            self.connection._session.end(self)
+        return rows
+
+    def fetchall(self) -> list:
+        rows = self.connection._session.run(self, super().fetchall)
+        self.connection._session.end(self)
+        return rows
+
+    def __next__(self) -> Any:
+        try:
+            return self.connection._session.run(self, super().__next__)
+        except StopIteration:
+            self.connection._session.end(self)
+            raise
+
+    def close(self) -> None:
+        self.connection._session.end(self)
+        super().close()
+
+    def __del__(self) -> None:
+        # conn.execute(...).fetchone() drops the cursor right away; record it then.
+        try:
+            self.connection._session.end(self)
+        except Exception:
+            pass
+
+
+class _ProfiledConnection(sqlite3.Connection):
+    _session: _Session
+
+    def cursor(self, factory: Any = _ProfiledCursor) -> sqlite3.Cursor:
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> sqlite3.Cursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script: str) -> sqlite3.Cursor:
+        return self.cursor().executescript(sql_script)
+
+
+class QueryProfiler:
+    def __init__(
+        self,
+        enabled: bool = True,
+        threshold_ms: float = 50.0,
+        progress_ops: int = 1000,
+        output: str = "",
+        max_buffer: int = 200,
+    ) -> None:
+        self._enabled = enabled
+        self.threshold_ms = threshold_ms
+        self.progress_ops = progress_ops
+        self._output = output
+        self._max_buffer = max_buffer
+        self._slow: List[Dict[str, Any]] = []
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "QueryProfiler":
+        threshold = os.environ.get("SQL_SLOW_MS", "")
+        return cls(
+            enabled=threshold != "",
+            threshold_ms=float(threshold or 50.0),
+            progress_ops=int(os.environ.get("SQL_PROGRESS_OPS", "1000")),
+            output=os.environ.get("SQL_SLOW_LOG", "stderr"),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def connect(self, path: str) -> Tuple[sqlite3.Connection, Optional[_Session]]:
+        if not self._enabled:
+            return sqlite3.connect(path), None
+        conn = sqlite3.connect(path, factory=_ProfiledConnection)
+        session = _Session(self, conn)
+        conn._session = session
+        conn.set_progress_handler(session.on_progress, self.progress_ops)
+        return conn, session
+
+    def slow_queries(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._slow)
+
+    def report(self, top: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = [{"sql": sql, **stats} for sql, stats in self._stats.items()]
+        rows.sort(key=lambda item: item["total_ms"], reverse=True)
+        return rows[:top]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._slow = []
+            self._stats = {}
+
+    def dump(self, top: int = 10) -> None:
+        if not self._enabled:
+            return
+        for item in self.report(top):
+            print(
+                f"sql {item['total_ms']:9.1f} ms total {item['max_ms']:8.1f} ms max {item['count']:6d}x  {item['sql'][:160]}",
+                file=sys.stderr,
+            )
+
+    def _record(self, sql: str, duration_ms: float, steps: int, plan: Optional[List[str]]) -> None:
+        key = normalize_sql(sql)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "steps": 0, "slow": 0}
+            stats["count"] += 1
+            stats["total_ms"] += duration_ms
+            stats["max_ms"] = max(stats["max_ms"], duration_ms)
+            stats["steps"] += steps
+            if plan is None:
+                return
+            stats["slow"] += 1
+            record = {
+                "sql": sql,
+                "duration_ms": duration_ms,
+                "steps": steps,
+                "plan": plan,
+                "thread": threading.current_thread().name,
+                "created_at": int(time.time()),
+            }
+            self._slow.append(record)
+            if len(self._slow) > self._max_buffer:
+                del self._slow[: len(self._slow) - self._max_buffer]
+        self._emit(record)
+
+    def _emit(self, record: Dict[str, Any]) -> None:
+        if not self._output or self._output == "0":
+            return
+        if self._output in {"1", "stderr"}:
+            sql = _SPACE.sub(" ", record["sql"]).strip()
+            print(f"slow sql {record['duration_ms']:8.1f} ms  {sql[:200]}", file=sys.stderr)
+            for detail in record["plan"]:
+                print(f"         plan  {detail}", file=sys.stderr)
+            return
+        with open(self._output, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+_default: Optional[QueryProfiler] = None
+_default_lock = threading.Lock()
+
+
+def default_profiler() -> QueryProfiler:
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = QueryProfiler.from_env()
+        return _default
@@ -0,0 +1,157 @@
+import importlib.abc
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+_WATCHED_MODULES = ("PySide6", "numpy", "spacy", "openai")
+
+
+class _TimedLoader:
+    def __init__(self, loader: Any, name: str, profiler: "StartupProfiler") -> None:
+        self._loader = loader
+        self._name = name
+        self._profiler = profiler
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec) -> Any:
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        self._profiler._import_started(self._name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._import_finished(self._name)
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    def __init__(self, profiler: "StartupProfiler") -> None:
+        self._profiler = profiler
+
+    def find_spec(self, fullname: str, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, fullname, self._profiler)
+            return spec
+        return None
+
+
+class StartupProfiler:
+    def __init__(self, enabled: bool = False, output: str = "") -> None:
+        self._enabled = enabled
+        self._output = output
+        self._started = time.perf_counter()
+        self._phases: List[Dict[str, Any]] = []
+        self._marks: Dict[str, float] = {}
+        self._loaded_at: Dict[str, List[str]] = {}
+        self._imports: Dict[str, Dict[str, float]] = {}
+        self._stack: List[List[Any]] = []
+        self._lock = threading.Lock()
+        self._finder: Optional[_ImportTimer] = None
+
+    @classmethod
+    def from_env(cls) -> "StartupProfiler":
+        output = os.environ.get("STARTUP_PROFILE", "")
+        profiler = cls(enabled=bool(output) and output != "0", output=output)
+        if profiler.enabled:
+            profiler.install_import_hook()
+        return profiler
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000.0
+
+    def install_import_hook(self) -> None:
+        if self._finder is None:
+            self._finder = _ImportTimer(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def remove_import_hook(self) -> None:
+        if self._finder is not None and self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self._phases.append(
+                    {
+                        "phase": name,
+                        "start_ms": (started - self._started) * 1000.0,
+                        "duration_ms": (finished - started) * 1000.0,
+                        "thread": threading.current_thread().name,
+                    }
+                )
+
+    def mark(self, name: str) -> None:
+        with self._lock:
+            if name not in self._marks:
+                self._marks[name] = self.elapsed_ms()
+                self._loaded_at[name] = [module for module in _WATCHED_MODULES if module in sys.modules]
+
+    def report(self, top: int = 25) -> Dict[str, Any]:
+        with self._lock:
+            imports = sorted(
+                ({"module": name, **stats} for name, stats in self._imports.items()),
+                key=lambda item: item["self_ms"],
+                reverse=True,
+            )
+            return {
+                "marks": dict(self._marks),
+                "phases": list(self._phases),
+                "imports": imports[:top],
+                "import_total_ms": sum(item["self_ms"] for item in imports),
+                "loaded_at": dict(self._loaded_at),
+            }
+
+    def dump(self) -> None:
+        if not self._enabled:
+            return
+        report = self.report()
+        if self._output not in {"1", "stderr"}:
+            with open(self._output, "w", encoding="utf-8") as handle:
+                json.dump(report, handle, indent=2)
+            return
+        for name, value in sorted(report["marks"].items(), key=lambda item: item[1]):
+            print(f"mark   {name:<28}{value:10.1f} ms", file=sys.stderr)
+        for item in report["phases"]:
+            print(
+                f"phase  {item['phase']:<28}{item['duration_ms']:10.1f} ms  (at {item['start_ms']:.1f}, {item['thread']})",
+                file=sys.stderr,
+            )
+        for item in report["imports"]:
+            print(f"import {item['module']:<28}{item['self_ms']:10.1f} ms  ({item['cumulative_ms']:.1f} cumulative)", file=sys.stderr)
+
+    def _import_started(self, name: str) -> None:
+        if threading.current_thread() is not threading.main_thread():
+            return
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def _import_finished(self, name: str) -> None:
+        if threading.current_thread() is not threading.main_thread() or not self._stack:
+            return
+        _, started, children = self._stack.pop()
+        cumulative = (time.perf_counter() - started) * 1000.0
+        if self._stack:
+            self._stack[-1][2] += cumulative
+        with self._lock:
+            self._imports[name] = {"self_ms": cumulative - children, "cumulative_ms": cumulative}
@@ -1,12 +1,22 @@
 import re
+from itertools import islice
+from typing import Iterator
 
 
 WORD_RE = re.compile(r"^[A-Za-z][A-Za-z\-']*$")
+_TOKEN_RE = re.compile(r"\S+")
+_ASCII_LETTER_RE = re.compile(r"[A-Za-z]")
+_LETTER_RE = re.compile(r"[^\W\d_]")
+
+ENGLISH_RATIO = 0.6
+SAMPLE_CHARS = 2048
+_SAMPLE_WINDOWS = 4
+_STEP_CHARS = 256
 
 
 def detect_entry_type(text: str) -> str:
-    tokens = text.split()
-    if len(tokens) == 1 and WORD_RE.match(tokens[0]):
+    tokens = list(islice(_TOKEN_RE.finditer(text), 7))
+    if len(tokens) == 1 and WORD_RE.match(tokens[0].group()):
         return "word"
     if 2 <= len(tokens) <= 6:
         return "phrase"
@@ -14,8 +24,42 @@ def detect_entry_type(text: str) -> str:
 
 
 def is_english(text: str) -> bool:
-    ascii_letters = sum(1 for c in text if "A" <= c <= "Z" or "a" <= c <= "z")
-    total = sum(1 for c in text if c.isalpha())
+    sample = _sample(text)
+    if sample.isascii():
+        return _ASCII_LETTER_RE.search(sample) is not None
+    ascii_letters = 0
+    total = 0
+    remaining = len(sample)
+    for start in range(0, len(sample), _STEP_CHARS):
+        window = sample[start:start + _STEP_CHARS]
+        remaining -= len(window)
+        ascii_letters += len(_ASCII_LETTER_RE.findall(window))
+        total += len(_LETTER_RE.findall(window))
+        # Stop once the remaining characters can no longer flip the verdict.
+        if ascii_letters and ascii_letters >= ENGLISH_RATIO * (total + remaining):
+            return True
+        if ascii_letters + remaining < ENGLISH_RATIO * (total + remaining):
+            return False
     if total == 0:
         return False
-    return ascii_letters / total >= 0.6
+    return ascii_letters / total >= ENGLISH_RATIO
+
+
+def classify_text(text: str) -> str:
+    if not is_english(text):
+        return ""
+    return detect_entry_type(text)
+
+
+def _sample(text: str) -> str:
+    if len(text) <= SAMPLE_CHARS:
+        return text
+    return "".join(_windows(text))
+
+
+def _windows(text: str) -> Iterator[str]:
+    width = SAMPLE_CHARS // _SAMPLE_WINDOWS
+    stride = (len(text) - width) // (_SAMPLE_WINDOWS - 1)
+    for index in range(_SAMPLE_WINDOWS):
+        start = index * stride
+        yield text[start:start + width]
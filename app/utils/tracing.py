@@ -0,0 +1,55 @@
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+
+class Tracer:
+    def __init__(self, enabled: bool = True, max_buffer: int = 1000) -> None:
+        self._enabled = enabled
+        self._max_buffer = max_buffer
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def new_trace(self) -> str:
+        return uuid.uuid4().hex[:16] if self._enabled else ""
+
+    @contextmanager
+    def span(self, trace_id: str, stage: str) -> Iterator[Dict[str, Any]]:
+        attrs: Dict[str, Any] = {}
+        if not self._enabled:
+            yield attrs
+            return
+        started = time.perf_counter()
+        try:
+            yield attrs
+        finally:
+            self.record(trace_id, stage, (time.perf_counter() - started) * 1000.0, **attrs)
+
+    def record(self, trace_id: str, stage: str, duration_ms: float, **attrs: Any) -> None:
+        if not self._enabled:
+            return
+        span = {
+            "trace_id": trace_id,
+            "stage": stage,
+            "duration_ms": duration_ms,
+            "prompt_tokens": int(attrs.get("prompt_tokens") or 0),
+            "completion_tokens": int(attrs.get("completion_tokens") or 0),
+            "cached_tokens": int(attrs.get("cached_tokens") or 0),
+            "template": str(attrs.get("template") or ""),
+            "created_at": int(time.time()),
+        }
+        with self._lock:
+            self._buffer.append(span)
+            if len(self._buffer) > self._max_buffer:
+                del self._buffer[: len(self._buffer) - self._max_buffer]
+
+    def drain(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            spans, self._buffer = self._buffer, []
+        return spans
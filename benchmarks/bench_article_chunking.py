@@ -0,0 +1,54 @@
+import argparse
+import json
+import os
+import random
+import time
+
+from app.services.llm_service import LlmService
+from app.utils.chunking import estimate_tokens
+from benchmarks.corpus import make_article
+from benchmarks.fake_llm_server import FakeLlmServer
+
+
+def _article(paragraphs: int, sentences: int, seed: int) -> str:
+    rng = random.Random(seed)
+    return "\n\n".join(make_article(rng, sentences) for _ in range(paragraphs))
+
+
+def _timed(llm_service: LlmService, text: str) -> dict:
+    started = time.perf_counter()
+    result = llm_service.enrich(text, "article")
+    return {
+        "wall_sec": time.perf_counter() - started,
+        "failed": str(result.get("raw_llm", "")).startswith("error:"),
+        "key_terms": len(result.get("key_terms") or []),
+        "structure_breakdown": len(result.get("structure_breakdown") or []),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare single-prompt and chunked article enrichment.")
+    parser.add_argument("--paragraphs", type=int, default=12)
+    parser.add_argument("--sentences", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--token-latency", type=float, default=0.002, help="Fake server delay per input token.")
+    parser.add_argument("--chunk-tokens", type=int, default=600)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    text = _article(args.paragraphs, args.sentences, args.seed)
+    report = {"article_tokens": estimate_tokens(text)}
+    with FakeLlmServer(latency=args.latency, token_latency=args.token_latency) as server:
+        for label, chunk_tokens in (("single", 0), ("chunked", args.chunk_tokens)):
+            os.environ["LLM_CHUNK_TOKENS"] = str(chunk_tokens)
+            os.environ["LLM_CHUNK_CONCURRENCY"] = str(args.concurrency)
+            llm_service = LlmService(base_url=server.url, api_key="fake-key", fixture_mode="")
+            report[label] = _timed(llm_service, text)
+        report["server"] = dict(server.stats)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
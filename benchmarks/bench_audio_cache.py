@@ -0,0 +1,78 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import wait
+
+from app.data.db import Database
+from app.data.entry_repo import EntryRepo
+from app.services.audio_cache import AudioCache
+from benchmarks.corpus import SIZES, working_copy
+from benchmarks.fake_audio_server import FakeAudioServer
+
+
+def _schedule_reviews(db: Database, count: int, seed: int) -> None:
+    rng = random.Random(seed)
+    now = int(time.time())
+    ids = [row[0] for row in db.connection.execute("SELECT id FROM entries WHERE entry_type = 'word' LIMIT ?", (count * 2,))]
+    rows = [(entry_id, now + rng.randrange(0, 20 * 3600), now, now) for entry_id in rng.sample(ids, min(count, len(ids)))]
+    with db.connection:
+        db.connection.executemany(
+            "INSERT INTO reviews (entry_id, next_review_at, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Prefetch due pronunciations and compare cold and warm playback.")
+    parser.add_argument("--size", default="10k", help=f"One of {','.join(SIZES)}.")
+    parser.add_argument("--due", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.15)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--max-mb", type=float, default=1.0, help="Cache budget, small enough to force eviction.")
+    args = parser.parse_args(argv)
+
+    report = {"size": args.size, "due": args.due}
+    with tempfile.TemporaryDirectory() as tmp, FakeAudioServer(latency=args.latency) as server:
+        path = working_copy(args.size, tmp)
+        db = Database(path)
+        db.initialize()
+        _schedule_reviews(db, args.due, 5)
+        entry_repo = EntryRepo(db)
+        audio_cache = AudioCache(
+            path,
+            cache_dir=os.path.join(tmp, "audio"),
+            max_bytes=int(args.max_mb * 1024 * 1024),
+            workers=args.workers,
+            url_template=server.template,
+        )
+
+        started = time.perf_counter()
+        futures = audio_cache.prefetch_due(entry_repo)
+        wait(futures)
+        report["prefetch_sec"] = time.perf_counter() - started
+        report["prefetched"] = sum(1 for future in futures if future.result())
+
+        due = entry_repo.list_due_entries(int(time.time() + 86400))
+        urls = [url for entry in due for url in audio_cache.urls_for(entry).values()]
+        started = time.perf_counter()
+        hits = sum(1 for url in urls[-20:] if audio_cache.get(url))
+        report["warm_get_ms"] = (time.perf_counter() - started) * 1000.0 / max(1, min(20, len(urls)))
+        report["warm_hits"] = hits
+
+        cold_url = server.template.format(text="uncached", accent="us")
+        started = time.perf_counter()
+        audio_cache.fetch(cold_url)
+        report["cold_fetch_ms"] = (time.perf_counter() - started) * 1000.0
+        report["cache"] = audio_cache.stats()
+        report["server"] = dict(server.stats)
+        audio_cache.shutdown()
+        db.connection.close()
+    print(json.dumps(report, indent=2))
+    return 0 if report["cache"]["bytes"] <= report["cache"]["max_bytes"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,81 @@
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from app.data.db import Database
+from app.data.entry_repo import EntryRepo
+from app.services.backup_service import BackupService
+from benchmarks.corpus import SIZES, working_copy
+
+
+def _restore_oldest_at_full_retention(path: str, backup_dir: str) -> bool:
+    # Saving the current database before a restore rotates snapshots; the one being
+    # restored must survive that even when it is the oldest.
+    service = BackupService(path, backup_dir=backup_dir, keep=2, step_pause=0.0)
+    oldest = service.backup()["path"]
+    service.backup()
+    try:
+        result = service.restore(oldest)
+    except sqlite3.Error:
+        return False
+    return result["restored"] == oldest and oldest in service.list_snapshots() and len(service.list_snapshots()) == 2
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure capture write latency while a backup runs.")
+    parser.add_argument("--size", default="100k", help=f"One of {','.join(SIZES)}.")
+    parser.add_argument("--pages-per-step", type=int, default=128)
+    parser.add_argument("--step-pause", type=float, default=0.002)
+    parser.add_argument("--write-interval", type=float, default=0.01)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = working_copy(args.size, tmp)
+        backup_service = BackupService(
+            path,
+            backup_dir=os.path.join(tmp, "backups"),
+            pages_per_step=args.pages_per_step,
+            step_pause=args.step_pause,
+        )
+        db = Database(path)
+        db.initialize()
+        entry_repo = EntryRepo(db)
+        result: dict = {}
+        worker = threading.Thread(target=lambda: result.update(backup_service.backup()))
+        latencies = []
+        worker.start()
+        i = 0
+        while worker.is_alive():
+            started = time.perf_counter()
+            entry_repo.add_entry({"entry_type": "phrase", "text": f"backup bench phrase {i}"})
+            latencies.append((time.perf_counter() - started) * 1000.0)
+            i += 1
+            time.sleep(args.write_interval)
+        worker.join()
+        problems = backup_service.verify(result["path"])
+        db.connection.close()
+        restore_ok = _restore_oldest_at_full_retention(path, os.path.join(tmp, "rotation"))
+
+    latencies.sort()
+    report = {
+        "size": args.size,
+        "backup_sec": result["elapsed"],
+        "backup_bytes": result["bytes"],
+        "steps": result["steps"],
+        "writes": len(latencies),
+        "write_p50_ms": latencies[len(latencies) // 2] if latencies else 0.0,
+        "write_p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0,
+        "write_max_ms": latencies[-1] if latencies else 0.0,
+        "snapshot_ok": not problems,
+        "restore_oldest_ok": restore_ok,
+    }
+    print(json.dumps(report, indent=2))
+    return 0 if not problems and restore_ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+
+from app.data.correction_repo import CorrectionRepo
+from app.data.db import Database
+
+ERROR_TYPES = ["structure", "tense", "article", "preposition", "agreement", "word_order", "collocation"]
+RULES = [f"R{i:03d}" for i in range(60)]
+
+
+def make_cards(rng: random.Random, count: int, now: int) -> list:
+    cards = []
+    for i in range(count):
+        cards.append(
+            {
+                "sentence_text": f"Sentence {i} with a mistake that was corrected by the learner.",
+                "source_url": f"https://example.com/article/{i % 400}",
+                "structure_tags": {"subject": "Sentence", "verb": "was corrected"},
+                "hints": ["Check the verb tense.", "Look at the article."],
+                "rule_ids": rng.sample(RULES, rng.randint(0, 3)),
+                "user_paraphrase": "",
+                "error_type": rng.choice(ERROR_TYPES),
+                "created_at": now - rng.randint(0, 90 * 86400),
+            }
+        )
+    return cards
+
+
+def scan_mistakes(db: Database, days: int) -> tuple:
+    since = time.strftime("%Y-%m-%d", time.gmtime(time.time() - days * 86400))
+    types: Counter = Counter()
+    rules: Counter = Counter()
+    for row in db.connection.execute("SELECT error_type, rule_ids, created_at FROM correction_cards"):
+        if time.strftime("%Y-%m-%d", time.gmtime(row["created_at"])) < since:
+            continue
+        types[row["error_type"]] += 1
+        for rule_id in json.loads(row["rule_ids"] or "[]"):
+            rules[rule_id] += 1
+    return types, rules
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Batched correction-card writes and rollup-backed mistake reports.")
+    parser.add_argument("--cards", type=int, default=50_000)
+    parser.add_argument("--single", type=int, default=2_000, help="Cards written one commit at a time.")
+    parser.add_argument("--days", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(44)
+    now = int(time.time())
+    cards = make_cards(rng, args.cards, now)
+    report = {"cards": args.cards}
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "data.sqlite"))
+        db.initialize()
+        repo = CorrectionRepo(db)
+
+        started = time.perf_counter()
+        for card in cards[: args.single]:
+            repo.add_correction(card)
+        report["single_per_sec"] = args.single / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        repo.add_corrections(cards[args.single :])
+        report["batch_per_sec"] = (args.cards - args.single) / (time.perf_counter() - started)
+
+        # Exercise the delete and update triggers before checking the rollups.
+        victims = [row[0] for row in db.connection.execute("SELECT id FROM correction_cards ORDER BY id LIMIT 500")]
+        for card_id in victims[:250]:
+            repo.delete_correction(card_id)
+        with db.connection:
+            db.connection.executemany(
+                "UPDATE correction_cards SET error_type = 'tense', rule_ids = '[\"R001\"]' WHERE id = ?",
+                [(card_id,) for card_id in victims[250:]],
+            )
+
+        started = time.perf_counter()
+        scan_types, scan_rules = scan_mistakes(db, args.days)
+        report["scan_ms"] = (time.perf_counter() - started) * 1000.0
+
+        started = time.perf_counter()
+        mistakes = repo.common_mistakes(args.days, limit=len(ERROR_TYPES))
+        top_rules = repo.common_rules(args.days, limit=len(RULES))
+        report["rollup_ms"] = (time.perf_counter() - started) * 1000.0
+
+        rollup_types = {row["error_type"]: row["total"] for row in mistakes}
+        rollup_rules = {row["rule_id"]: row["total"] for row in top_rules}
+        report["consistent"] = rollup_types == dict(scan_types) and rollup_rules == dict(scan_rules)
+
+        repo.rebuild_rollups()
+        rebuilt = {row["error_type"]: row["total"] for row in repo.common_mistakes(args.days, limit=len(ERROR_TYPES))}
+        report["rebuild_consistent"] = rebuilt == rollup_types
+        report["top"] = mistakes[:3]
+        db.connection.close()
+    print(json.dumps(report, indent=2))
+    return 0 if report["consistent"] and report["rebuild_consistent"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,75 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from app.data.db import Database
+from app.data.entry_repo import EntryRepo
+from app.data.grammar_repo import GrammarRepo
+from app.services.grammar_service import GrammarService
+from benchmarks.corpus import make_article
+
+
+def _seed(path: str, count: int, sentences: int) -> None:
+    db = Database(path)
+    db.initialize()
+    rng = random.Random(42)
+    now = int(time.time())
+    rows = [
+        ("article", f"{i}. {make_article(rng, sentences)}", now, now)
+        for i in range(count)
+    ]
+    with db.connection:
+        db.connection.executemany(
+            "INSERT INTO entries (entry_type, text, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+    db.connection.close()
+
+
+def _run(path: str, grammar_service: GrammarService, n_process: int, batch_size: int) -> dict:
+    db = Database(path)
+    db.initialize()
+    with db.connection:
+        db.connection.execute("DELETE FROM grammar_analyses")
+    stats = grammar_service.backfill(
+        EntryRepo(db),
+        GrammarRepo(db),
+        batch_size=batch_size,
+        n_process=n_process,
+    )
+    db.connection.close()
+    return {"n_process": n_process, **stats}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare single- and multi-process grammar backfill.")
+    parser.add_argument("--articles", type=int, default=3000)
+    parser.add_argument("--sentences", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--n-process", type=int, default=max(2, (os.cpu_count() or 2) // 2))
+    args = parser.parse_args()
+
+    grammar_service = GrammarService()
+    if not grammar_service.available:
+        print("Parser unavailable. Install spaCy and en_core_web_sm.")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sqlite")
+        _seed(path, args.articles, args.sentences)
+        results = [
+            _run(path, grammar_service, 1, args.batch_size),
+            _run(path, grammar_service, args.n_process, args.batch_size),
+        ]
+    print(json.dumps(results, indent=2))
+    single, multi = results
+    if single["docs_per_sec"]:
+        print(f"speedup: {multi['docs_per_sec'] / single['docs_per_sec']:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,71 @@
+import argparse
+import json
+import tempfile
+import time
+
+from app.data.db import Database
+from app.data.entry_repo import EntryRepo
+from app.data.job_repo import JobRepo
+from app.services.capture_service import CaptureService
+from app.services.enrichment_queue import EnrichmentQueue
+from app.services.llm_service import LlmService
+from benchmarks.corpus import SIZES, working_copy
+from benchmarks.fake_llm_server import FakeLlmServer
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Drain a persistent enrichment backlog against a local stand-in LLM.")
+    parser.add_argument("--size", default="10k", help=f"One of {','.join(SIZES)}.")
+    parser.add_argument("--backlog", type=int, default=400, help="Background jobs queued before the drain.")
+    parser.add_argument("--interactive", type=int, default=20)
+    parser.add_argument("--crashed", type=int, default=10, help="Jobs left running by a worker that died.")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    report = {"size": args.size, "workers": args.workers}
+    with tempfile.TemporaryDirectory() as tmp, FakeLlmServer(latency=args.latency, error_rate=args.error_rate) as server:
+        path = working_copy(args.size, tmp)
+        db = Database(path)
+        db.initialize()
+        entry_repo = EntryRepo(db)
+        job_repo = JobRepo(db)
+        llm_service = LlmService(base_url=server.url, api_key="fake-key", fixture_mode="")
+        queue = EnrichmentQueue(path, llm_service, workers=args.workers, lease_seconds=60, retry_base=0.0, max_attempts=8)
+
+        report["backfilled"] = queue.backfill(args.backlog)
+        for _ in range(args.crashed):
+            job_repo.claim("crashed-worker", -1.0)
+
+        capture_service = CaptureService(entry_repo, llm_service)
+        interactive = set()
+        for i in range(args.interactive):
+            entry_id, _ = capture_service.store_pending(f"benchqueue{i}", "word")
+            queue.submit(entry_id)
+            interactive.add(entry_id)
+
+        order = []
+        queue.add_listener(lambda entry_id, status: order.append((entry_id, status)))
+        started = time.perf_counter()
+        counts = queue.drain()
+        elapsed = time.perf_counter() - started
+
+        done = [entry_id for entry_id, status in order if status == "done"]
+        positions = [i for i, entry_id in enumerate(done) if entry_id in interactive]
+        report["drain_sec"] = elapsed
+        report["jobs_per_sec"] = len(done) / elapsed if elapsed > 0 else 0.0
+        report["retries"] = sum(1 for _, status in order if status == "retry")
+        report["last_interactive_done_at"] = max(positions) if positions else -1
+        report["counts"] = counts
+        pending = entry_repo.list_pending_enrichment()
+        report["interactive_unenriched"] = sum(1 for row in pending if row["id"] in interactive)
+        report["server"] = dict(server.stats)
+        db.connection.close()
+    print(json.dumps(report, indent=2))
+    lost = report["counts"]["pending"] + report["counts"]["running"] + report["interactive_unenriched"]
+    return 0 if lost == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,109 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from app.data.db import Database
+from app.data.entry_repo import EntryRepo
+from app.services.capture_service import CaptureService
+from app.services.llm_service import LlmService
+from app.utils.tracing import Tracer
+from benchmarks.corpus import make_article, make_phrase
+from benchmarks.fake_llm_server import FakeLlmServer
+
+
+def _texts(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    texts = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.6:
+            texts.append("".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(9)))
+        elif roll < 0.9:
+            texts.append(make_phrase(rng))
+        else:
+            texts.append(make_article(rng, rng.randint(3, 12)))
+    return texts
+
+
+def run(args: argparse.Namespace, base_url: str) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.sqlite"))
+        db.initialize()
+        llm_service = LlmService(base_url=base_url, api_key="fake-key", fixture_mode=args.fixtures)
+        capture_service = CaptureService(EntryRepo(db), llm_service, Tracer(enabled=False))
+        texts = _texts(args.captures, args.seed)
+
+        latencies = []
+        failures = 0
+
+        def _enrich(text: str) -> tuple:
+            entry_type = capture_service.classify(text)
+            started = time.perf_counter()
+            result = capture_service.enrich(text, entry_type)
+            return text, entry_type, result, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            futures = [pool.submit(_enrich, text) for text in texts]
+            for future in as_completed(futures):
+                text, entry_type, result, elapsed = future.result()
+                latencies.append(elapsed * 1000.0)
+                if str(result.get("raw_llm", "")).startswith("error:"):
+                    failures += 1
+                capture_service.store(text, entry_type, result)
+        wall = time.perf_counter() - started
+        db.connection.close()
+
+    latencies.sort()
+    return {
+        "captures": len(texts),
+        "concurrency": args.concurrency,
+        "wall_sec": wall,
+        "captures_per_sec": len(texts) / wall if wall else 0.0,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "mean_ms": statistics.fmean(latencies),
+        "failures": failures,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the capture pipeline against a local fake LLM.")
+    parser.add_argument("--captures", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument(
+        "--fixtures",
+        choices=["", "record", "replay"],
+        default="",
+        help="Record responses to LLM_FIXTURE_DIR, or replay them without a server.",
+    )
+    args = parser.parse_args(argv)
+
+    if args.fixtures == "replay":
+        report = run(args, "http://127.0.0.1:9/v1")
+    else:
+        with FakeLlmServer(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            rate_limit=args.rate_limit,
+            seed=args.seed,
+        ) as server:
+            report = run(args, server.url)
+            report["server"] = dict(server.stats)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
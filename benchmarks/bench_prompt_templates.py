@@ -0,0 +1,57 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+
+from app.data.db import Database
+from app.data.metrics_repo import MetricsRepo
+from app.services.llm_service import LlmService
+from app.utils.tracing import Tracer
+from benchmarks.corpus import BASE_WORDS, make_phrase
+from benchmarks.fake_llm_server import FakeLlmServer
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare prompt template versions by tokens, cache hits and latency.")
+    parser.add_argument("--entries", type=int, default=60)
+    parser.add_argument("--versions", default="1,2,3")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument(
+        "--cache-min-tokens",
+        type=int,
+        default=1024,
+        help="Provider minimum for prefix caching; templates with a shorter system prompt get no cache hits.",
+    )
+    args = parser.parse_args(argv)
+
+    rng = random.Random(3)
+    items = []
+    for i in range(args.entries):
+        if i % 2:
+            items.append((make_phrase(rng), "phrase"))
+        else:
+            items.append((rng.choice(BASE_WORDS)[0], "word"))
+
+    with tempfile.TemporaryDirectory() as tmp, FakeLlmServer(latency=args.latency, cache_min_tokens=args.cache_min_tokens) as server:
+        db = Database(os.path.join(tmp, "bench.sqlite"))
+        db.initialize()
+        tracer = Tracer()
+        for version in args.versions.split(","):
+            os.environ["LLM_PROMPT_VERSION"] = version.strip()
+            llm_service = LlmService(base_url=server.url, api_key="fake-key", fixture_mode="")
+            for text, entry_type in items:
+                trace_id = tracer.new_trace()
+                with tracer.span(trace_id, "llm") as span:
+                    result = llm_service.enrich(text, entry_type)
+                    span.update(result.get("usage") or {})
+                    span["template"] = result.get("template", "")
+        MetricsRepo(db).add_spans(tracer.drain())
+        report = MetricsRepo(db).template_report()
+        db.connection.close()
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
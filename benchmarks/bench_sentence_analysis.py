@@ -0,0 +1,51 @@
+import argparse
+import json
+import random
+import time
+
+from app.services.grammar_service import GrammarService
+from benchmarks.corpus import make_article
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time-to-first-highlight for long articles.")
+    parser.add_argument("--words", type=int, default=5000)
+    args = parser.parse_args()
+
+    grammar_service = GrammarService()
+    if not grammar_service.available:
+        print("Parser unavailable. Install spaCy and en_core_web_sm.")
+        return 1
+
+    rng = random.Random(7)
+    text = make_article(rng, max(1, args.words // 10))
+    started = time.perf_counter()
+    first = None
+    count = 0
+    for _ in grammar_service.iter_sentence_analyses(text):
+        count += 1
+        if first is None:
+            first = time.perf_counter() - started
+    cold = time.perf_counter() - started
+
+    started = time.perf_counter()
+    grammar_service.analyze_text(text + " One more sentence was added.")
+    warm = time.perf_counter() - started
+
+    print(
+        json.dumps(
+            {
+                "words": len(text.split()),
+                "sentences": count,
+                "first_highlight_sec": first,
+                "full_cold_sec": cold,
+                "full_after_edit_sec": warm,
+            },
+            indent=2,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import corpus_path
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_DEFERRED = ("spacy", "openai", "numpy")
+
+
+def _launch(workdir: str, report_path: str) -> dict:
+    env = dict(
+        os.environ,
+        STARTUP_PROFILE=report_path,
+        STARTUP_PROFILE_EXIT="1",
+        QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"),
+        PYTHONPATH=_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""),
+    )
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "app.main"],
+        cwd=workdir,
+        env=env,
+        check=True,
+        timeout=120,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000.0
+    with open(report_path, encoding="utf-8") as handle:
+        report = json.load(handle)
+    report["wall_ms"] = wall_ms
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure time to first paint of the desktop app.")
+    parser.add_argument("--size", default="1k", help="Synthetic corpus size to launch against.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=800.0, help="Fail when median first paint exceeds this.")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    source = corpus_path(args.size)
+    reports = []
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copyfile(source, os.path.join(tmp, "data.sqlite"))
+        for run in range(args.runs):
+            reports.append(_launch(tmp, os.path.join(tmp, f"startup-{run}.json")))
+
+    first_paint = statistics.median(report["marks"]["first_paint"] for report in reports)
+    entries_loaded = statistics.median(report["marks"]["entries_loaded"] for report in reports)
+    eager = sorted({module for report in reports for module in report["loaded_at"]["first_paint"] if module in _DEFERRED})
+    summary = {
+        "size": args.size,
+        "runs": args.runs,
+        "first_paint_ms": first_paint,
+        "entries_loaded_ms": entries_loaded,
+        "wall_ms": statistics.median(report["wall_ms"] for report in reports),
+        "eager_modules": eager,
+        "budget_ms": args.budget_ms,
+    }
+    problems = []
+    if first_paint > args.budget_ms:
+        problems.append(f"median first paint {first_paint:.1f} ms exceeds the {args.budget_ms:.0f} ms budget")
+    if eager:
+        problems.append(f"deferred modules imported before first paint: {', '.join(eager)}")
+    summary["ok"] = not problems
+    if args.json:
+        print(json.dumps({"summary": summary, "last": reports[-1]}, indent=2))
+    else:
+        print(f"first paint     {first_paint:8.1f} ms (budget {args.budget_ms:.0f} ms)")
+        print(f"entries loaded  {entries_loaded:8.1f} ms")
+        print(f"process wall    {summary['wall_ms']:8.1f} ms (includes warm-up and exit)")
+        if eager:
+            print(f"loaded before first paint: {', '.join(eager)}")
+    for problem in problems:
+        print(f"FAIL: {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,140 @@
+import argparse
+import json
+import random
+import tempfile
+import time
+from collections import Counter
+
+from app.data.db import Database
+from app.data.entry_repo import EntryRepo
+from app.data.stats_repo import StatsRepo
+from benchmarks.corpus import SIZES, working_copy
+
+STATUSES = ["pending", "learned", "postponed"]
+ACTIONS = ["learn", "postpone", "skip"]
+
+
+def _seed_reviews(db: Database, rng: random.Random) -> None:
+    conn = db.connection
+    now = int(time.time())
+    ids = [row[0] for row in conn.execute("SELECT id FROM entries")]
+    with conn:
+        conn.executemany(
+            "INSERT INTO reviews (entry_id, next_review_at, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            [(entry_id, now + rng.randint(0, 30) * 86400, rng.choice(STATUSES), now, now) for entry_id in ids],
+        )
+        # A run of recent study days ending today plus scattered older sessions.
+        logs = []
+        for day in range(12):
+            for _ in range(rng.randint(5, 40)):
+                logs.append((rng.choice(ids), rng.choice(ACTIONS), now - day * 86400))
+        for _ in range(20_000):
+            logs.append((rng.choice(ids), rng.choice(ACTIONS), now - rng.randint(20, 400) * 86400))
+        conn.executemany("INSERT INTO review_logs (entry_id, action, reviewed_at) VALUES (?, ?, ?)", logs)
+
+
+def _mutate(db: Database, entry_repo: EntryRepo, rng: random.Random) -> dict:
+    conn = db.connection
+    report = {}
+    new_entries = [
+        {"entry_type": rng.choice(["word", "phrase"]), "text": f"statsbench {i}", "tags": json.dumps([f"tag{i % 7}", "new"])}
+        for i in range(2000)
+    ]
+    started = time.perf_counter()
+    entry_repo.add_entries(new_entries)
+    report["insert_2000_ms"] = (time.perf_counter() - started) * 1000.0
+    all_ids = [row[0] for row in conn.execute("SELECT id FROM entries ORDER BY id")]
+    ids = rng.sample(all_ids, min(1500, len(all_ids)))
+    for entry_id in ids[:500]:
+        entry_repo.update_tags(entry_id, json.dumps(["edited", f"tag{entry_id % 3}", "edited"]))
+    with conn:
+        conn.executemany("UPDATE entries SET tags = 'not json' WHERE id = ?", [(entry_id,) for entry_id in ids[500:600]])
+        conn.executemany("DELETE FROM entries WHERE id = ?", [(entry_id,) for entry_id in ids[600:900]])
+        conn.executemany(
+            "UPDATE reviews SET status = ? WHERE entry_id = ?",
+            [(rng.choice(STATUSES), entry_id) for entry_id in ids[900:1500]],
+        )
+        log_ids = [row[0] for row in conn.execute("SELECT id FROM review_logs ORDER BY id")]
+        conn.executemany("DELETE FROM review_logs WHERE id = ?", [(log_id,) for log_id in rng.sample(log_ids, min(500, len(log_ids)))])
+    return report
+
+
+def _scan_dashboard(db: Database) -> dict:
+    conn = db.connection
+    by_type = {row[0]: row[1] for row in conn.execute("SELECT entry_type, COUNT(*) FROM entries GROUP BY entry_type")}
+    statuses = {row[0]: row[1] for row in conn.execute("SELECT status, COUNT(*) FROM reviews GROUP BY status")}
+    daily = {
+        (row[0], row[1]): row[2]
+        for row in conn.execute("SELECT date(created_at, 'unixepoch'), entry_type, COUNT(*) FROM entries GROUP BY 1, 2")
+    }
+    tags: Counter = Counter()
+    for (value,) in conn.execute("SELECT tags FROM entries"):
+        try:
+            parsed = json.loads(value) if value else []
+        except ValueError:
+            continue
+        if isinstance(parsed, list):
+            tags.update({str(item) for item in parsed})
+    reviews = {
+        (row[0], row[1]): row[2]
+        for row in conn.execute("SELECT date(reviewed_at, 'unixepoch'), action, COUNT(*) FROM review_logs GROUP BY 1, 2")
+    }
+    return {"by_type": by_type, "statuses": statuses, "daily": daily, "tags": dict(tags), "reviews": reviews}
+
+
+def _rollup_tables(db: Database) -> dict:
+    conn = db.connection
+    totals = StatsRepo(db).totals()
+    return {
+        "by_type": totals["by_type"],
+        "statuses": totals["review_status"],
+        "daily": {(r[0], r[1]): r[2] for r in conn.execute("SELECT day, entry_type, count FROM stats_capture_daily WHERE count > 0")},
+        "tags": {r[0]: r[1] for r in conn.execute("SELECT tag, count FROM stats_tag_counts WHERE count > 0")},
+        "reviews": {(r[0], r[1]): r[2] for r in conn.execute("SELECT day, action, count FROM stats_review_daily WHERE count > 0")},
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Trigger-maintained library statistics against full scans.")
+    parser.add_argument("--size", default="100k", help=f"One of {','.join(SIZES)}.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(46)
+    report: dict = {"size": args.size}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = working_copy(args.size, tmp)
+        db = Database(path)
+        started = time.perf_counter()
+        db.initialize()
+        report["initialize_sec"] = time.perf_counter() - started
+        entry_repo = EntryRepo(db)
+        stats_repo = StatsRepo(db)
+        _seed_reviews(db, rng)
+        report.update(_mutate(db, entry_repo, rng))
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            scanned = _scan_dashboard(db)
+        report["scan_dashboard_ms"] = (time.perf_counter() - started) * 1000.0 / args.repeat
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            dashboard = stats_repo.dashboard()
+        report["rollup_dashboard_ms"] = (time.perf_counter() - started) * 1000.0 / args.repeat
+
+        report["consistent"] = _rollup_tables(db) == scanned
+        started = time.perf_counter()
+        stats_repo.rebuild()
+        report["rebuild_sec"] = time.perf_counter() - started
+        report["rebuild_consistent"] = _rollup_tables(db) == scanned
+        report["entries"] = dashboard["entries"]
+        report["streaks"] = dashboard["streaks"]
+        report["top_tags"] = dashboard["top_tags"][:5]
+        db.connection.close()
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0 if report["consistent"] and report["rebuild_consistent"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,72 @@
+import argparse
+import json
+import random
+import tempfile
+import time
+
+from app.data.change_repo import ChangeRepo
+from app.data.db import Database
+from app.data.entry_repo import EntryRepo
+from app.services.sync_service import SyncService
+from benchmarks.corpus import SIZES, working_copy
+from benchmarks.fake_sync_server import FakeSyncServer
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure full and delta sync against a local stand-in server.")
+    parser.add_argument("--size", default="100k", help=f"One of {','.join(SIZES)}.")
+    parser.add_argument("--edits", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(11)
+    report = {"size": args.size, "edits": args.edits}
+    with tempfile.TemporaryDirectory() as tmp, FakeSyncServer() as server:
+        path = working_copy(args.size, tmp)
+        started = time.perf_counter()
+        db = Database(path)
+        db.initialize()
+        report["initialize_sec"] = time.perf_counter() - started
+        entry_repo = EntryRepo(db)
+        change_repo = ChangeRepo(db)
+        sync_service = SyncService(change_repo, server.url)
+
+        full = sync_service.push(batch_size=args.batch_size)
+        report["full"] = {key: full[key] for key in ("changes", "batches", "elapsed")}
+
+        all_ids = [row[0] for row in db.connection.execute("SELECT id FROM entries ORDER BY id")]
+        ids = rng.sample(all_ids, min(args.edits, len(all_ids)))
+        started = time.perf_counter()
+        for entry_id in ids:
+            entry_repo.update_tags(entry_id, json.dumps([f"tag{rng.randrange(50)}"]))
+        with db.connection:
+            db.connection.execute("DELETE FROM entries WHERE id = ?", (ids[0],))
+        report["edit_sec"] = time.perf_counter() - started
+
+        delta = sync_service.push(batch_size=args.batch_size)
+        report["delta"] = {key: delta[key] for key in ("changes", "batches", "elapsed")}
+
+        # Deletes the server has not seen yet are compacted away, so the next push is
+        # behind the floor and must reset the server and resend every live row.
+        with db.connection:
+            db.connection.executemany("DELETE FROM entries WHERE id = ?", [(entry_id,) for entry_id in ids[1:11]])
+            # Age the tombstones past the retention window instead of waiting for it.
+            db.connection.execute("UPDATE change_log SET changed_at = changed_at - 86400 WHERE op = 'delete'")
+        report["compact"] = change_repo.compact(tombstone_days=0)
+        resync = sync_service.push(batch_size=args.batch_size)
+        report["resync"] = {key: resync[key] for key in ("changes", "batches", "elapsed", "reset")}
+        report["server_live_entries"] = server.live_count("entries")
+
+        # A device that has never synced starts from cursor 0, below the floor as well.
+        with FakeSyncServer() as fresh:
+            SyncService(change_repo, fresh.url, device="fresh").push(batch_size=args.batch_size)
+            report["fresh_live_entries"] = fresh.live_count("entries")
+        report["local_entries"] = db.connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        db.connection.close()
+    print(json.dumps(report, indent=2))
+    ok = report["resync"]["reset"] and report["server_live_entries"] == report["fresh_live_entries"] == report["local_entries"]
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
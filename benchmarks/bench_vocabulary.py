@@ -0,0 +1,70 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from app.data.db import Database
+from app.data.entry_repo import EntryRepo
+from app.services.vocabulary_service import VocabularyIndex, tokenize, vocabulary_path_for
+from benchmarks.corpus import SIZES, make_article, working_copy
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Build, cache and scan the known-vocabulary automaton.")
+    parser.add_argument("--size", default="100k", help=f"One of {','.join(SIZES)}.")
+    parser.add_argument("--words", type=int, default=10_000, help="Article length in words.")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(41)
+    article = ""
+    while len(tokenize(article)) < args.words:
+        article += make_article(rng, 20) + "\n"
+
+    report = {"size": args.size, "article_tokens": len(tokenize(article))}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = working_copy(args.size, tmp)
+        db = Database(path)
+        db.initialize()
+        entry_repo = EntryRepo(db)
+
+        started = time.perf_counter()
+        index = VocabularyIndex(vocabulary_path_for(path))
+        report["patterns"] = index.sync(entry_repo)
+        report["build_sec"] = time.perf_counter() - started
+        report["cache_mb"] = os.path.getsize(vocabulary_path_for(path)) / 1e6
+
+        started = time.perf_counter()
+        cached = VocabularyIndex(vocabulary_path_for(path))
+        cached.load()
+        cached.sync(entry_repo)
+        report["load_sec"] = time.perf_counter() - started
+
+        added = [(10**9 + i, f"zyx{i} quorble") for i in range(100)]
+        started = time.perf_counter()
+        cached.add_many(added)
+        report["add_100_ms"] = (time.perf_counter() - started) * 1000.0
+
+        samples = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            result = cached.scan(article)
+            samples.append((time.perf_counter() - started) * 1000.0)
+        report["scan_p50_ms"] = statistics.median(samples)
+        report["matches"] = len(result["matches"])
+        report["candidates"] = result["candidates"][:10]
+
+        started = time.perf_counter()
+        db.connection.execute("SELECT COUNT(*) FROM entries WHERE text LIKE ?", (f"%{tokenize(article)[0][0]}%",)).fetchone()
+        report["one_like_query_ms"] = (time.perf_counter() - started) * 1000.0
+        db.connection.close()
+    print(json.dumps(report, indent=2))
+    return 0 if report["scan_p50_ms"] <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,165 @@
+import argparse
+import json
+import os
+import random
+import re
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from app.data.audio_repo import AudioRepo
+from app.data.change_repo import ChangeRepo
+from app.data.correction_repo import CorrectionRepo
+from app.data.db import Database
+from app.data.entry_repo import EntryRepo
+from app.data.job_repo import JobRepo
+from app.utils.query_profiler import QueryProfiler
+from benchmarks.bench_corrections import make_cards
+from benchmarks.corpus import SIZES, build_corpus, working_copy
+
+_PLAN_TABLE = re.compile(r"^(SCAN|SEARCH) ([\w.]+)")
+_ALIAS = re.compile(r"\b(?:FROM|JOIN)\s+([\w.]+)(?:\s+AS)?\s+(?!WHERE|ON|JOIN|LEFT|CROSS|INNER|GROUP|ORDER|LIMIT|USING)(\w+)", re.I)
+
+# Tables that grow with the library; a plain SCAN of one of these is a regression
+# unless the check lists it under "scans".
+LARGE_TABLES = {"entries", "reviews", "review_logs", "jobs", "change_log", "correction_cards", "audio_urls"}
+
+
+def _seed(db: Database, rng: random.Random) -> None:
+    conn = db.connection
+    now = int(time.time())
+    ids = [row[0] for row in conn.execute("SELECT id FROM entries")]
+    with conn:
+        conn.executemany(
+            "INSERT INTO reviews (entry_id, next_review_at, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            [(entry_id, now + rng.randint(-2, 60) * 86400, now, now) for entry_id in ids[::2]],
+        )
+        conn.executemany(
+            "INSERT INTO audio_urls (url, digest, fetched_at) VALUES (?, ?, ?)",
+            [(f"https://audio.example/{entry_id}.mp3", f"{entry_id:040x}", now) for entry_id in ids[::5]],
+        )
+    JobRepo(db).enqueue_backfill()
+    CorrectionRepo(db).add_corrections(make_cards(rng, 50_000, now))
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
+def _checks(db: Database, rng: random.Random) -> List[Dict[str, Any]]:
+    entry_repo = EntryRepo(db, detail_cache_size=0)
+    max_id = int(db.connection.execute("SELECT MAX(id) FROM entries").fetchone()[0])
+    word = db.connection.execute("SELECT text FROM entries WHERE entry_type = 'word' LIMIT 1").fetchone()[0]
+    latest = ChangeRepo(db).latest_seq()
+    return [
+        {"name": "get_entry", "run": lambda: entry_repo.get_entry(rng.randint(1, max_id)), "expect": {"entries": "INTEGER PRIMARY KEY"}},
+        {"name": "dedupe_on_capture", "run": lambda: entry_repo.add_entry({"entry_type": "word", "text": word}), "expect": {"entries": "idx_entries_text"}},
+        {"name": "list_due_entries", "run": lambda: entry_repo.list_due_entries(int(time.time())), "expect": {"reviews": "idx_reviews_next"}},
+        {"name": "vocabulary_since", "run": lambda: entry_repo.list_vocabulary_since(max_id - 100), "expect": {"entries": "INTEGER PRIMARY KEY"}},
+        {"name": "claim_job", "run": lambda: JobRepo(db).claim("plan-check", 60), "expect": {"jobs": "idx_jobs_queue"}},
+        {"name": "changes_since", "run": lambda: ChangeRepo(db).changes_since(max(0, latest - 500)), "expect": {"change_log": "INTEGER PRIMARY KEY"}},
+        {"name": "corrections_by_type", "run": lambda: CorrectionRepo(db).list_corrections("tense", 50), "expect": {"correction_cards": "idx_correction_cards_type"}},
+        {
+            "name": "corrections_next_page",
+            "run": lambda: CorrectionRepo(db).list_corrections("tense", 50, int(time.time()) - 86400, 1 << 62),
+            "expect": {"correction_cards": "idx_correction_cards_type"},
+        },
+        {"name": "common_mistakes", "run": lambda: CorrectionRepo(db).common_mistakes(30), "expect": {"correction_daily": "PRIMARY KEY"}},
+        {"name": "audio_lookup", "run": lambda: AudioRepo(db).lookup("https://audio.example/5.mp3"), "expect": {"audio_urls": "sqlite_autoindex_audio_urls_1"}},
+        # Substring search cannot use a b-tree index; listed so a change in its cost is visible.
+        {"name": "search_words", "run": lambda: entry_repo.search_words("tion", []), "expect": {}, "scans": {"entries"}},
+        {
+            "name": "library_dedupe",
+            "run": lambda: entry_repo.find_in_libraries(word),
+            "expect": {"main.entries": "idx_entries_text", "ref.entries": "idx_entries_text"},
+        },
+        {
+            "name": "library_recent",
+            "run": lambda: entry_repo.list_library_entries(limit=200),
+            "expect": {"main.entries": "idx_entries_created", "ref.entries": "idx_entries_created"},
+        },
+        {
+            "name": "library_search",
+            "run": lambda: entry_repo.search_libraries("tion"),
+            "expect": {"main.entries": "idx_entries_created", "ref.entries": "idx_entries_created"},
+        },
+        {"name": "library_duplicates", "run": lambda: entry_repo.library_duplicates(100), "expect": {"entries": "idx_entries_text"}},
+    ]
+
+
+def _verify(check: Dict[str, Any], plans: List[Dict[str, Any]]) -> List[str]:
+    problems = []
+    seen: Dict[str, List[str]] = {}
+    for record in plans:
+        aliases = {alias.lower(): table for table, alias in _ALIAS.findall(record["sql"])}
+        for detail in record["plan"]:
+            match = _PLAN_TABLE.match(detail)
+            if match:
+                name = aliases.get(match.group(2).lower(), match.group(2))
+                seen.setdefault(name, []).append(detail)
+                if "." in name:
+                    seen.setdefault(name.split(".", 1)[1], []).append(detail)
+    for table, needle in check["expect"].items():
+        details = seen.get(table, [])
+        if not any(needle in detail for detail in details):
+            problems.append(f"{table}: expected {needle!r}, got {details or 'no access'}")
+    allowed = check.get("scans", set())
+    for table, details in seen.items():
+        for detail in details:
+            scanned = detail.startswith("SCAN ") and "USING" not in detail
+            if scanned and table in LARGE_TABLES and table not in allowed:
+                problems.append(f"unexpected full scan: {detail}")
+    return problems
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Assert that the hot queries use their intended indexes.")
+    parser.add_argument("--size", default="100k", help=f"One of {','.join(SIZES)}.")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(45)
+    report: Dict[str, Any] = {"size": args.size, "checks": []}
+    failed = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        path = working_copy(args.size, tmp)
+        seed_db = Database(path)
+        seed_db.initialize()
+        _seed(seed_db, rng)
+        seed_db.connection.close()
+
+        # Threshold 0 explains every statement the repos issue, not only slow ones.
+        ref_path = build_corpus(os.path.join(tmp, "ref.sqlite"), max(1000, SIZES[args.size] // 10), seed=47)
+
+        profiler = QueryProfiler(threshold_ms=0.0, output="")
+        db = Database(path, profiler=profiler)
+        db.attach(ref_path, "ref")
+        for check in _checks(db, rng):
+            db.flush_profile()
+            profiler.threshold_ms = 0.0
+            profiler.reset()
+            check["run"]()
+            db.flush_profile()
+            plans = profiler.slow_queries()
+            problems = _verify(check, plans)
+            profiler.threshold_ms = float("inf")
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                check["run"]()
+            elapsed_ms = (time.perf_counter() - started) * 1000.0 / args.repeat
+            failed += bool(problems)
+            report["checks"].append(
+                {
+                    "name": check["name"],
+                    "ok": not problems,
+                    "mean_ms": elapsed_ms,
+                    "problems": problems,
+                    "plan": sorted({detail for record in plans for detail in record["plan"]}),
+                }
+            )
+        db.connection.close()
+    report["failed"] = failed
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,40 @@
+import argparse
+import json
+
+
+def _index(report: dict) -> dict:
+    return {
+        (item["suite"], item["size"]): item
+        for item in report.get("results", [])
+        if "p50_ms" in item
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Fail when p50 grows by this factor.")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline, encoding="utf-8") as handle:
+        baseline = _index(json.load(handle))
+    with open(args.current, encoding="utf-8") as handle:
+        current = _index(json.load(handle))
+
+    regressions = 0
+    for key in sorted(current):
+        if key not in baseline:
+            continue
+        before, after = baseline[key]["p50_ms"], current[key]["p50_ms"]
+        ratio = after / before if before > 0 else 1.0
+        flag = ""
+        if ratio > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{key[1]:>5} {key[0]:<18} {before:10.3f} -> {after:10.3f} ms  x{ratio:.2f}{flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,200 @@
+import json
+import os
+import random
+import shutil
+import time
+from typing import Iterator, List, Tuple
+
+from app.data.db import Database
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+# (word, part of speech, Chinese meaning)
+BASE_WORDS: List[Tuple[str, str, str]] = [
+    ("ability", "n.", "能力"), ("absorb", "v.", "吸收"), ("abstract", "adj.", "抽象的"),
+    ("accurate", "adj.", "准确的"), ("achieve", "v.", "实现"), ("acquire", "v.", "获得"),
+    ("adapt", "v.", "适应"), ("adequate", "adj.", "足够的"), ("adjust", "v.", "调整"),
+    ("advocate", "v.", "提倡"), ("affect", "v.", "影响"), ("allocate", "v.", "分配"),
+    ("analyze", "v.", "分析"), ("anticipate", "v.", "预期"), ("apparent", "adj.", "明显的"),
+    ("approach", "n.", "方法"), ("appropriate", "adj.", "适当的"), ("assess", "v.", "评估"),
+    ("assume", "v.", "假设"), ("attach", "v.", "附上"), ("attribute", "v.", "归因于"),
+    ("balance", "n.", "平衡"), ("benefit", "n.", "好处"), ("brief", "adj.", "简短的"),
+    ("capacity", "n.", "容量"), ("challenge", "n.", "挑战"), ("clarify", "v.", "澄清"),
+    ("clarity", "n.", "清晰"), ("coherent", "adj.", "连贯的"), ("collapse", "v.", "崩溃"),
+    ("commit", "v.", "承诺"), ("compile", "v.", "汇编"), ("complex", "adj.", "复杂的"),
+    ("component", "n.", "组成部分"), ("concept", "n.", "概念"), ("conclude", "v.", "得出结论"),
+    ("conduct", "v.", "进行"), ("confirm", "v.", "确认"), ("consequence", "n.", "后果"),
+    ("consider", "v.", "考虑"), ("consistent", "adj.", "一致的"), ("constrain", "v.", "限制"),
+    ("construct", "v.", "建造"), ("consume", "v.", "消耗"), ("context", "n.", "语境"),
+    ("contribute", "v.", "贡献"), ("convert", "v.", "转换"), ("crucial", "adj.", "关键的"),
+    ("decline", "v.", "下降"), ("define", "v.", "定义"), ("demonstrate", "v.", "证明"),
+    ("derive", "v.", "获得"), ("design", "n.", "设计"), ("detect", "v.", "检测"),
+    ("determine", "v.", "决定"), ("develop", "v.", "发展"), ("distinct", "adj.", "明显不同的"),
+    ("distribute", "v.", "分发"), ("diverse", "adj.", "多样的"), ("dominate", "v.", "支配"),
+    ("efficient", "adj.", "高效的"), ("emerge", "v.", "出现"), ("emphasis", "n.", "强调"),
+    ("enable", "v.", "使能够"), ("enhance", "v.", "增强"), ("ensure", "v.", "确保"),
+    ("establish", "v.", "建立"), ("estimate", "v.", "估计"), ("evaluate", "v.", "评价"),
+    ("evidence", "n.", "证据"), ("evolve", "v.", "演变"), ("exceed", "v.", "超过"),
+    ("expand", "v.", "扩大"), ("explicit", "adj.", "明确的"), ("expose", "v.", "暴露"),
+    ("factor", "n.", "因素"), ("feature", "n.", "特征"), ("flexible", "adj.", "灵活的"),
+    ("focus", "v.", "集中"), ("framework", "n.", "框架"), ("function", "n.", "功能"),
+    ("generate", "v.", "产生"), ("global", "adj.", "全球的"), ("guarantee", "v.", "保证"),
+    ("highlight", "v.", "强调"), ("identify", "v.", "识别"), ("illustrate", "v.", "说明"),
+    ("impact", "n.", "影响"), ("implement", "v.", "实施"), ("imply", "v.", "暗示"),
+    ("indicate", "v.", "表明"), ("influence", "n.", "影响"), ("initial", "adj.", "最初的"),
+    ("insight", "n.", "洞察"), ("integrate", "v.", "整合"), ("interpret", "v.", "解释"),
+    ("involve", "v.", "涉及"), ("isolate", "v.", "隔离"), ("justify", "v.", "证明合理"),
+    ("maintain", "v.", "维持"), ("measure", "v.", "测量"), ("method", "n.", "方法"),
+    ("modify", "v.", "修改"), ("monitor", "v.", "监控"), ("negotiate", "v.", "谈判"),
+    ("notion", "n.", "观念"), ("objective", "n.", "目标"), ("obtain", "v.", "获得"),
+    ("occur", "v.", "发生"), ("outcome", "n.", "结果"), ("outline", "n.", "大纲"),
+    ("perceive", "v.", "察觉"), ("persist", "v.", "坚持"), ("perspective", "n.", "观点"),
+    ("phenomenon", "n.", "现象"), ("policy", "n.", "政策"), ("potential", "adj.", "潜在的"),
+    ("precise", "adj.", "精确的"), ("predict", "v.", "预测"), ("principle", "n.", "原则"),
+    ("priority", "n.", "优先事项"), ("procedure", "n.", "程序"), ("process", "n.", "过程"),
+    ("promote", "v.", "促进"), ("proportion", "n.", "比例"), ("pursue", "v.", "追求"),
+    ("range", "n.", "范围"), ("rational", "adj.", "理性的"), ("reduce", "v.", "减少"),
+    ("reflect", "v.", "反映"), ("region", "n.", "地区"), ("regulate", "v.", "调节"),
+    ("reinforce", "v.", "加强"), ("relevant", "adj.", "相关的"), ("rely", "v.", "依赖"),
+    ("require", "v.", "需要"), ("resolve", "v.", "解决"), ("resource", "n.", "资源"),
+    ("respond", "v.", "回应"), ("restrict", "v.", "限制"), ("reveal", "v.", "揭示"),
+    ("scope", "n.", "范围"), ("sequence", "n.", "顺序"), ("significant", "adj.", "重要的"),
+    ("simulate", "v.", "模拟"), ("specify", "v.", "具体说明"), ("stable", "adj.", "稳定的"),
+    ("strategy", "n.", "策略"), ("structure", "n.", "结构"), ("sufficient", "adj.", "充足的"),
+    ("summary", "n.", "摘要"), ("sustain", "v.", "维持"), ("target", "n.", "目标"),
+    ("technique", "n.", "技术"), ("tendency", "n.", "趋势"), ("transfer", "v.", "转移"),
+    ("transform", "v.", "转变"), ("trend", "n.", "趋势"), ("undergo", "v.", "经历"),
+    ("underlying", "adj.", "潜在的"), ("uniform", "adj.", "统一的"), ("valid", "adj.", "有效的"),
+    ("vary", "v.", "变化"), ("version", "n.", "版本"), ("visible", "adj.", "可见的"),
+]
+
+_PREFIXES = ["re", "pre", "over", "under", "mis", "non", "inter", "sub", "trans", "anti", "co", "de"]
+_SUFFIXES = ["ness", "ment", "tion", "able", "ity", "ize", "ful", "less", "er", "ly", "ism", "ist"]
+_SYLLABLES = ["ka", "lo", "mi", "ner", "sto", "vel", "tra", "quin", "dor", "pha", "zel", "rum", "bis", "cor"]
+_CN_EXTRA = ["的", "性", "化", "者", "再", "过度", "不", "相互", "反", "共同"]
+
+_PHRASE_TEMPLATES = [
+    "{v} the {n}", "{a} {n}", "in terms of {n}", "{v} a {a} {n}",
+    "take {n} into account", "{v} {n} and {n2}", "a {a} {n} of {n2}",
+]
+_SENTENCE_TEMPLATES = [
+    "The {n} will {v} the {n2} in most cases.",
+    "Researchers {v} that a {a} {n} can {v2} the {n2}.",
+    "Although the {n} was {a}, the team decided to {v} it.",
+    "We need to {v} the {n} before we {v2} any {n2}.",
+    "Many people {v} {n} because it is {a}.",
+    "If the {n} is {a}, the {n2} tends to {v}.",
+    "The report, which was {a}, helped us {v} the {n}.",
+]
+
+
+def _pick(rng: random.Random, pos: str) -> str:
+    while True:
+        word, word_pos, _ = rng.choice(BASE_WORDS)
+        if word_pos == pos:
+            return word
+
+
+def _fill(rng: random.Random, template: str) -> str:
+    return template.format(
+        v=_pick(rng, "v."),
+        v2=_pick(rng, "v."),
+        n=_pick(rng, "n."),
+        n2=_pick(rng, "n."),
+        a=_pick(rng, "adj."),
+    )
+
+
+def _word_stream(rng: random.Random) -> Iterator[Tuple[str, str]]:
+    for word, pos, meaning in BASE_WORDS:
+        yield word, f"{pos} {meaning}"
+    while True:
+        word, pos, meaning = rng.choice(BASE_WORDS)
+        roll = rng.random()
+        if roll < 0.35:
+            yield rng.choice(_PREFIXES) + word, f"{pos} {rng.choice(_CN_EXTRA)}{meaning}"
+        elif roll < 0.7:
+            yield word + rng.choice(_SUFFIXES), f"n. {meaning}{rng.choice(_CN_EXTRA)}"
+        else:
+            stem = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 5)))
+            yield stem + rng.choice(_SUFFIXES), f"{pos} {meaning}{rng.choice(_CN_EXTRA)}"
+
+
+def make_article(rng: random.Random, sentences: int) -> str:
+    return " ".join(_fill(rng, rng.choice(_SENTENCE_TEMPLATES)) for _ in range(sentences))
+
+
+def make_phrase(rng: random.Random) -> str:
+    return _fill(rng, rng.choice(_PHRASE_TEMPLATES))
+
+
+def _rows(size: int, seed: int) -> Iterator[tuple]:
+    rng = random.Random(seed)
+    words = _word_stream(rng)
+    start = 1_700_000_000
+    span = 2 * 365 * 86400
+    i = 0
+    while True:
+        created = start + (span * min(i, size)) // max(1, size)
+        roll = rng.random()
+        if roll < 0.7:
+            text, translation = next(words)
+            tags = json.dumps([f"root:{text[:3]}"], ensure_ascii=True)
+            yield ("word", text, translation, tags, "", "", created)
+        elif roll < 0.9:
+            text = make_phrase(rng) if rng.random() < 0.5 else f"{make_phrase(rng)} {make_phrase(rng)}"
+            breakdown = json.dumps([{"span": text, "role": "phrase"}], ensure_ascii=True)
+            yield ("phrase", text, "短语释义", "[]", breakdown, "语法说明", created)
+        else:
+            text = make_article(rng, rng.randint(5, 40))
+            breakdown = json.dumps([{"span": text[:40], "role": "main clause"}], ensure_ascii=True)
+            yield ("article", text, "文章译文", "[]", breakdown, "长难句分析", created)
+        i += 1
+
+
+def build_corpus(path: str, size: int, seed: int = 1234) -> str:
+    if os.path.exists(path):
+        os.remove(path)
+    db = Database(path)
+    db.initialize()
+    conn = db.connection
+    rows = _rows(size, seed)
+    total = 0
+    while total < size:
+        batch = [next(rows) for _ in range(min(5000, size - total))]
+        with conn:
+            cursor = conn.executemany(
+                """
+                INSERT OR IGNORE INTO entries (
+                  entry_type, text, translation, tags, structure_breakdown, grammar_notes,
+                  created_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [row + (row[-1],) for row in batch],
+            )
+        # rowcount, not total_changes: the change-log and stats triggers write rows too.
+        total += cursor.rowcount
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def corpus_path(size_name: str, seed: int = 1234) -> str:
+    size = SIZES[size_name]
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, f"corpus-{size_name}-{seed}.sqlite")
+    if not os.path.exists(path):
+        started = time.perf_counter()
+        build_corpus(path + ".tmp", size, seed)
+        os.replace(path + ".tmp", path)
+        print(f"built {size_name} corpus in {time.perf_counter() - started:.1f}s", flush=True)
+    return path
+
+
+def working_copy(size_name: str, directory: str, seed: int = 1234) -> str:
+    target = os.path.join(directory, f"bench-{size_name}.sqlite")
+    shutil.copyfile(corpus_path(size_name, seed), target)
+    return target
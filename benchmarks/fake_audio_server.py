@@ -0,0 +1,99 @@
+import argparse
+import hashlib
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+
+class FakeAudioServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, clip_bytes: int = 16 * 1024) -> None:
+        self.latency = latency
+        self.clip_bytes = clip_bytes
+        self.stats = {"requests": 0, "bytes": 0}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def template(self) -> str:
+        return self.url + "/audio/{text}/{accent}.mp3"
+
+    def start(self) -> "FakeAudioServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeAudioServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def clip(self, path: str) -> bytes:
+        seed = hashlib.sha256(path.encode("utf-8")).digest()
+        size = self.clip_bytes // 2 + int.from_bytes(seed[:2], "big") % self.clip_bytes
+        return b"ID3" + (seed * (size // len(seed) + 1))[: size - 3]
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: Any) -> None:
+                return
+
+            def do_GET(self) -> None:
+                path = urllib.parse.urlparse(self.path).path
+                if not path.startswith("/audio/"):
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if server.latency:
+                    time.sleep(server.latency)
+                data = server.clip(urllib.parse.unquote(path))
+                with server._lock:
+                    server.stats["requests"] += 1
+                    server.stats["bytes"] += len(data)
+                self.send_response(200)
+                self.send_header("Content-Type", "audio/mpeg")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Local stand-in for a pronunciation audio endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--latency", type=float, default=0.15)
+    args = parser.parse_args(argv)
+
+    server = FakeAudioServer(host=args.host, port=args.port, latency=args.latency)
+    print(f"Serving clips; set AUDIO_URL_TEMPLATE={server.template}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
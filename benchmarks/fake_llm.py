@@ -0,0 +1,37 @@
+import hashlib
+import json
+import time
+from typing import Any, Dict
+
+
+class FakeLlmService:
+    def __init__(self, latency: float = 0.0) -> None:
+        self._latency = latency
+
+    def enrich(self, text: str, entry_type: str) -> Dict[str, Any]:
+        if self._latency:
+            time.sleep(self._latency)
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:6]
+        if entry_type == "word":
+            data = {
+                "translation": f"n. 释义{digest}\nv. 动作{digest}",
+                "part_of_speech": "noun",
+                "ipa": f"UK: /{text}/; US: /{text}/",
+                "phonetic_us": f"/{text}/",
+                "phonetic_uk": f"/{text}/",
+                "word_roots": [text[:3]],
+                "tense_form": [f"复数: {text}s"],
+                "common_meanings": [f"meaning {digest}"],
+                "related_terms": [],
+                "definition": f"Definition of {text}.",
+            }
+        else:
+            data = {
+                "translation": f"译文{digest}",
+                "structure_breakdown": [{"span": text[:40], "role": "main clause"}],
+                "grammar_notes": "Subject + verb + object.",
+                "key_terms": [{"term": word, "definition": "term"} for word in text.split()[:3]],
+            }
+        data["raw_llm"] = json.dumps(data, ensure_ascii=False)
+        data["usage"] = {"prompt_tokens": 200 + len(text) // 4, "completion_tokens": 120}
+        return data
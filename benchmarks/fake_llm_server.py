@@ -0,0 +1,254 @@
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+from benchmarks.fake_llm import FakeLlmService
+
+_TEXT_RE = re.compile(r"Entry type:\s*(\w+)\.\s*Text:\s*(.*)", re.S)
+
+
+class FakeLlmServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: float = 0.0,
+        stream_chunk: int = 16,
+        seed: int = 7,
+        token_latency: float = 0.0,
+        cache_min_tokens: int = 1024,
+        cache_step_tokens: int = 128,
+    ) -> None:
+        self.latency = latency
+        self.token_latency = token_latency
+        self.cache_min_tokens = cache_min_tokens
+        self.cache_step_tokens = cache_step_tokens
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.stream_chunk = stream_chunk
+        self.stats = {"requests": 0, "errors": 0, "throttled": 0, "streamed": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = rate_limit
+        self._refilled = time.monotonic()
+        self._fake = FakeLlmService()
+        self._prefixes: set = set()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeLlmServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeLlmServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _admit(self) -> str:
+        with self._lock:
+            self.stats["requests"] += 1
+            if self.rate_limit > 0:
+                now = time.monotonic()
+                self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit)
+                self._refilled = now
+                if self._tokens < 1.0:
+                    self.stats["throttled"] += 1
+                    return "throttled"
+                self._tokens -= 1.0
+            if self.error_rate > 0 and self._rng.random() < self.error_rate:
+                self.stats["errors"] += 1
+                return "error"
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        return "ok"
+
+    def _completion(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        prompt = "\n".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for message in body.get("messages", [])
+            for part in (message.get("content") if isinstance(message.get("content"), list) else [message.get("content") or ""])
+        )
+        match = _TEXT_RE.search(prompt)
+        entry_type, text = (match.group(1), match.group(2).strip()) if match else ("word", prompt[-40:])
+        if self.token_latency:
+            # Output length of a real model grows with the input, and so does its latency.
+            time.sleep(self.token_latency * len(text) / 4)
+        data = self._fake.enrich(text, entry_type)
+        usage = data.pop("usage")
+        data.pop("raw_llm", None)
+        # Mimic provider prefix caching: only prompts of at least cache_min_tokens are
+        # cached, and a repeated system message is billed as cached in cache_step_tokens
+        # increments from that minimum. Shorter prefixes never hit.
+        messages = body.get("messages") or [{}]
+        system = messages[0].get("content") if messages[0].get("role") == "system" else None
+        prompt_tokens = max(1, len(prompt) // 4)
+        cached = 0
+        if isinstance(system, str) and prompt_tokens >= self.cache_min_tokens:
+            with self._lock:
+                seen = system in self._prefixes
+                self._prefixes.add(system)
+            prefix_tokens = len(system) // 4
+            if seen and prefix_tokens >= self.cache_min_tokens:
+                step = max(1, self.cache_step_tokens)
+                cached = self.cache_min_tokens + (prefix_tokens - self.cache_min_tokens) // step * step
+        return {
+            "content": json.dumps(data, ensure_ascii=False),
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": usage["completion_tokens"],
+                "total_tokens": prompt_tokens + usage["completion_tokens"],
+                "prompt_tokens_details": {"cached_tokens": cached},
+            },
+            "model": body.get("model", "fake"),
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: Any) -> None:
+                return
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except Exception:
+                    self._json(400, {"error": {"message": "invalid json"}})
+                    return
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._json(404, {"error": {"message": f"unknown path {self.path}"}})
+                    return
+                verdict = server._admit()
+                if verdict == "throttled":
+                    self._json(429, {"error": {"message": "rate limited", "type": "rate_limit"}}, {"Retry-After": "1"})
+                    return
+                if verdict == "error":
+                    self._json(500, {"error": {"message": "injected failure", "type": "server_error"}})
+                    return
+                result = server._completion(body)
+                if body.get("stream"):
+                    self._stream(result, bool((body.get("stream_options") or {}).get("include_usage")))
+                else:
+                    self._json(200, self._payload(result))
+
+            def _payload(self, result: Dict[str, Any]) -> Dict[str, Any]:
+                return {
+                    "id": f"chatcmpl-fake-{int(time.time() * 1000)}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": result["model"],
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": result["content"]},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": result["usage"],
+                }
+
+            def _stream(self, result: Dict[str, Any], include_usage: bool) -> None:
+                with server._lock:
+                    server.stats["streamed"] += 1
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                content = result["content"]
+                base = {
+                    "id": f"chatcmpl-fake-{int(time.time() * 1000)}",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": result["model"],
+                }
+                step = max(1, server.stream_chunk)
+                for start in range(0, len(content), step):
+                    delta = {"content": content[start:start + step]}
+                    if start == 0:
+                        delta["role"] = "assistant"
+                    self._event({**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+                self._event({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+                if include_usage:
+                    self._event({**base, "choices": [], "usage": result["usage"]})
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+            def _event(self, payload: Dict[str, Any]) -> None:
+                self.wfile.write(b"data: " + json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n\n")
+                self.wfile.flush()
+
+            def _json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible chat completions stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="Base response delay in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay up to this many seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500.")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests per second before 429 (0 = off).")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Extra delay per input token in seconds.")
+    parser.add_argument("--cache-min-tokens", type=int, default=1024, help="Shortest prompt the provider caches.")
+    args = parser.parse_args(argv)
+
+    server = FakeLlmServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        token_latency=args.token_latency,
+        cache_min_tokens=args.cache_min_tokens,
+    )
+    print(f"Serving on {server.url} (set LLM_BASE_URL to this and LLM_API_KEY to any value)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,116 @@
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+
+class FakeSyncServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.rows: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        self.stats = {"requests": 0, "changes": 0, "bytes": 0, "resets": 0}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeSyncServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeSyncServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def live_count(self, entity: str) -> int:
+        with self._lock:
+            return sum(1 for (name, _), item in self.rows.items() if name == entity and not item["deleted"])
+
+    def _apply(self, body: Dict[str, Any], size: int) -> Dict[str, Any]:
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["bytes"] += size
+            for change in body.get("changes", []):
+                key = (change["entity"], int(change["id"]))
+                current = self.rows.get(key)
+                # Highest row version wins, matching the local conflict rule.
+                if current is not None and current["version"] >= change["version"]:
+                    continue
+                self.rows[key] = {
+                    "version": change["version"],
+                    "deleted": change["op"] == "delete",
+                    "row": change.get("row"),
+                }
+                self.stats["changes"] += 1
+        return {"ack": body.get("cursor")}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: Any) -> None:
+                return
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length)
+                try:
+                    body = json.loads(raw or b"{}")
+                except Exception:
+                    self._json(400, {"error": "invalid json"})
+                    return
+                path = self.path.rstrip("/")
+                if path.endswith("/changes"):
+                    self._json(200, server._apply(body, len(raw)))
+                elif path.endswith("/reset"):
+                    with server._lock:
+                        server.rows.clear()
+                        server.stats["resets"] += 1
+                    self._json(200, {"ok": True})
+                else:
+                    self._json(404, {"error": f"unknown path {self.path}"})
+
+            def _json(self, status: int, payload: Dict[str, Any]) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Local stand-in for the cloud sync endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args(argv)
+
+    server = FakeSyncServer(host=args.host, port=args.port)
+    print(f"Serving on {server.url} (pass it to 'python -m app.cli sync --url')")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,209 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from app.data.db import Database
+from app.data.entry_repo import EntryRepo
+from app.services.capture_service import CaptureService
+from app.services.grammar_service import GrammarService
+from app.ui.formatting import format_detail
+from app.utils.auto_tags import build_auto_tags
+from benchmarks.corpus import SIZES, make_article, make_phrase, working_copy
+from benchmarks.fake_llm import FakeLlmService
+
+
+def measure(fn: Callable[[int], Any], iterations: int, warmup: int = 1) -> Dict[str, float]:
+    for i in range(warmup):
+        fn(i)
+    samples = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - started) * 1000.0)
+    samples.sort()
+    return {
+        "iterations": iterations,
+        "mean_ms": statistics.fmean(samples),
+        "p50_ms": samples[len(samples) // 2],
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "min_ms": samples[0],
+        "ops_per_sec": 1000.0 / statistics.fmean(samples) if samples[0] > 0 else 0.0,
+    }
+
+
+class Context:
+    def __init__(self, path: str, size_name: str) -> None:
+        self.size_name = size_name
+        self.db = Database(path)
+        self.db.initialize()
+        self.entry_repo = EntryRepo(self.db)
+        self.rng = random.Random(99)
+        self._grammar_service = None
+        # Sampled with the seeded rng so every run (and every compared build) sees the same rows.
+        ids = [row[0] for row in self.db.connection.execute("SELECT id FROM entries ORDER BY id")]
+        picked = sorted(self.rng.sample(ids, min(500, len(ids))))
+        placeholders = ",".join("?" for _ in picked)
+        rows = self.db.connection.execute(
+            f"SELECT * FROM entries WHERE id IN ({placeholders}) ORDER BY id", picked
+        ).fetchall() if picked else []
+        self.sample = [dict(row) for row in rows]
+        self.sample_words = [row for row in self.sample if row["entry_type"] == "word"] or self.sample
+
+    @property
+    def grammar_service(self) -> GrammarService:
+        if self._grammar_service is None:
+            self._grammar_service = GrammarService()
+        return self._grammar_service
+
+    def fresh_text(self, i: int) -> str:
+        return f"{make_phrase(self.rng)} bench{self.size_name}x{i}x{self.rng.randrange(10**9)}"
+
+    def fresh_word(self, i: int) -> str:
+        return "bench" + "".join(self.rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(10))
+
+
+def suite_list_entries(ctx: Context) -> Dict[str, Any]:
+    return measure(lambda _: ctx.entry_repo.list_entries(), 3)
+
+
+def suite_get_entry(ctx: Context) -> Dict[str, Any]:
+    ids = [row["id"] for row in ctx.sample]
+    return measure(lambda i: ctx.entry_repo.get_entry(ids[(i * 7919) % len(ids)]), 500)
+
+
+def suite_list_word_entries(ctx: Context) -> Dict[str, Any]:
+    return measure(lambda _: ctx.entry_repo.list_word_entries(), 3)
+
+
+def suite_search_words(ctx: Context) -> Dict[str, Any]:
+    queries = [row["text"][:3] for row in ctx.sample_words[:50]]
+    return measure(lambda i: ctx.entry_repo.search_words(queries[i % len(queries)], [1, 2, 3]), 50)
+
+
+def suite_insert(ctx: Context) -> Dict[str, Any]:
+    def _insert(i: int) -> None:
+        ctx.entry_repo.add_entry({"entry_type": "phrase", "text": ctx.fresh_text(i)})
+
+    return measure(_insert, 200)
+
+
+def suite_auto_tags(ctx: Context) -> Dict[str, Any]:
+    words = ctx.sample_words[:20]
+
+    def _tags(i: int) -> None:
+        row = words[i % len(words)]
+        build_auto_tags(row["text"], row["translation"], ctx.entry_repo.list_word_entries())
+
+    return measure(_tags, 20)
+
+
+def suite_grammar_analyze(ctx: Context) -> Dict[str, Any]:
+    grammar_service = ctx.grammar_service
+    if not grammar_service.available:
+        return {"skipped": "parser unavailable"}
+    texts = [make_article(ctx.rng, 10) for _ in range(20)]
+    return measure(lambda i: grammar_service.analyze_text(texts[i % len(texts)]), 20)
+
+
+def suite_format_detail(ctx: Context) -> Dict[str, Any]:
+    rows = ctx.sample
+    return measure(lambda i: format_detail(rows[i % len(rows)], lambda ids: ""), 500)
+
+
+def suite_capture_e2e(ctx: Context) -> Dict[str, Any]:
+    capture_service = CaptureService(ctx.entry_repo, FakeLlmService())
+    return measure(
+        lambda i: capture_service.capture(ctx.fresh_word(i) if i % 2 else ctx.fresh_text(i)),
+        50,
+    )
+
+
+SUITES: Dict[str, Callable[[Context], Dict[str, Any]]] = {
+    "list_entries": suite_list_entries,
+    "get_entry": suite_get_entry,
+    "list_word_entries": suite_list_word_entries,
+    "search_words": suite_search_words,
+    "insert": suite_insert,
+    "auto_tags": suite_auto_tags,
+    "grammar_analyze": suite_grammar_analyze,
+    "format_detail": suite_format_detail,
+    "capture_e2e": suite_capture_e2e,
+}
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def run(sizes: List[str], suites: List[str]) -> Dict[str, Any]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_name in sizes:
+            ctx = Context(working_copy(size_name, tmp), size_name)
+            for name in suites:
+                stats = SUITES[name](ctx)
+                results.append({"suite": name, "size": size_name, **stats})
+                print(f"{size_name:>5} {name:<18} {_summary(stats)}", file=sys.stderr, flush=True)
+            ctx.db.connection.close()
+    return {
+        "meta": {
+            "timestamp": int(time.time()),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def _summary(stats: Dict[str, Any]) -> str:
+    if "skipped" in stats:
+        return f"skipped ({stats['skipped']})"
+    return f"p50 {stats['p50_ms']:.3f} ms  p95 {stats['p95_ms']:.3f} ms"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the benchmark suite against synthetic corpora.")
+    parser.add_argument("--sizes", default="1k,10k", help=f"Comma separated, from {','.join(SIZES)}.")
+    parser.add_argument("--suites", default=",".join(SUITES), help="Comma separated suite names.")
+    parser.add_argument("--output", default="", help="Write JSON results to this file.")
+    parser.add_argument("--append", default="", help="Append one JSON line per run to this history file.")
+    args = parser.parse_args(argv)
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES] + [s for s in suites if s not in SUITES]
+    if unknown:
+        parser.error(f"unknown size or suite: {', '.join(unknown)}")
+
+    report = run(sizes, suites)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    if args.append:
+        os.makedirs(os.path.dirname(os.path.abspath(args.append)), exist_ok=True)
+        with open(args.append, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(report) + "\n")
+    if not args.output and not args.append:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())